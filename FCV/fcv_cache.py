@@ -0,0 +1,168 @@
+# fcv_cache.py
+# Persistent on-disk cache of parsed FCV files.
+# Entries are keyed by the file's content hash, its endianness and a fingerprint of the decoder
+# source, so editing the decoder invalidates every old entry. A small per-path stat record
+# (size + mtime) lets warm runs skip re-hashing unchanged files.
+
+import os
+import json
+import pickle
+import hashlib
+from functools import lru_cache
+
+# Bump when the cached state layout changes.
+CACHE_FORMAT_VERSION = 2
+
+# Modules whose code decides what a parse produces.
+_DECODER_MODULES = ("fcv_parser.py", "fcv_encoding_types.py", "fcv_tracks.py", "fcv_transform.py")
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def decoder_fingerprint():
+    """
+    Short hash of the cache format version and the decoder modules' source (computed once per process).
+    """
+    digest = hashlib.sha1(str(CACHE_FORMAT_VERSION).encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _DECODER_MODULES:
+        with open(os.path.join(here, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ParseCache:
+    """
+    Directory of pickled parse results with size-bounded LRU eviction.
+    Safe to share between worker processes: every file is written to a temp name and renamed.
+    Build one per process or batch and reuse it: the folder size is scanned once and then tracked as entries
+    are stored, so the folder is only listed again when the tracked size passes max_bytes. (Entries other
+    processes store are only seen at that rescan, so a shared folder can briefly run over the limit.)
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = decoder_fingerprint()
+        self._entries = os.path.join(directory, "entries")
+        self._stats = os.path.join(directory, "stats")
+        os.makedirs(self._entries, exist_ok=True)
+        os.makedirs(self._stats, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._tracked_bytes = None  # Folder size as of the last scan plus what this object stored since
+
+    # Content hash of a file, reusing the stored one while its size and mtime are unchanged.
+    # 'data' hashes in-memory contents instead (e.g. an archive member); nothing is stat'ed or stored then.
+    def content_hash(self, filepath, data=None):
+        if data is not None:
+            return hashlib.sha1(data).hexdigest()
+        st = os.stat(filepath)
+        stat_path = os.path.join(self._stats, hashlib.sha1(os.path.abspath(filepath).encode()).hexdigest())
+        try:
+            with open(stat_path, "r", encoding="utf-8") as f:
+                size, mtime_ns, digest = json.load(f)
+            if size == st.st_size and mtime_ns == st.st_mtime_ns:
+                return digest
+        except (OSError, ValueError):
+            pass
+
+        digest = hashlib.sha1()
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        self._atomic_write(stat_path, json.dumps([st.st_size, st.st_mtime_ns, digest]).encode())
+        return digest
+
+    # Path of the cache entry for a file parsed with the given endianness.
+    # 'variant' names a different parse of the same file (e.g. a TrackTransform key); it is hashed into the name.
+    def entry_path(self, filepath, endianness, data=None, variant=None):
+        tag = "le" if endianness == "<" else "be"
+        if variant:
+            tag += "_" + hashlib.sha1(variant.encode()).hexdigest()[:12]
+        return os.path.join(self._entries, f"{self.content_hash(filepath, data)}_{tag}_{self.fingerprint}.pkl")
+
+    # Returns the cached parse state, or None on a miss.
+    # An entry that cannot be unpickled (truncated, or written by an incompatible version, which can raise
+    # almost anything from pickle.load) is deleted and counts as a miss, so the file is simply re-parsed.
+    def load(self, filepath, endianness, data=None, variant=None):
+        path = self.entry_path(filepath, endianness, data, variant)
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            self._remove(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for LRU eviction
+        except OSError:
+            pass
+        self.hits += 1
+        return state
+
+    # Counts an entry load() returned but the caller could not use (e.g. it lacks raw keys) as a miss.
+    def reject(self):
+        self.hits -= 1
+        self.misses += 1
+
+    # Stores a parse state and evicts old entries once the tracked size passes max_bytes.
+    def store(self, filepath, endianness, state, data=None, variant=None):
+        blob = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        self._atomic_write(self.entry_path(filepath, endianness, data, variant), blob)
+        if self._tracked_bytes is None:
+            self.evict()  # First store: one scan sets the baseline (and drops entries of other decoders)
+        else:
+            self._tracked_bytes += len(blob)
+            if self._tracked_bytes > self.max_bytes:
+                self.evict()
+
+    # Removes entries of other decoder versions, then least recently used ones until under max_bytes.
+    # Lists the whole folder; store() only calls it when the tracked size runs over.
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self._entries):
+            if not entry.name.endswith(".pkl"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if not entry.name.endswith(f"_{self.fingerprint}.pkl"):
+                self._remove(entry.path)
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._tracked_bytes = total
+
+    # Deletes every entry and stat record.
+    def clear(self):
+        for folder in (self._entries, self._stats):
+            for entry in os.scandir(folder):
+                self._remove(entry.path)
+        self._tracked_bytes = 0
+
+    def _atomic_write(self, path, data):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
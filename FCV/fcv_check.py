@@ -0,0 +1,163 @@
+# fcv_check.py
+# Structural validation of FCV files without decoding keyframe values: header padding, pointer bounds,
+# block sizes and overlaps, frame ID order and range, camera joint IDs and the stored file size.
+# Only key counts and frame IDs are read, so a check costs a fraction of a parse.
+
+import struct
+
+import numpy as np
+
+from .fcv_camera_roles import detect_camera_roles
+from .fcv_encoding_types import get_encoding_info
+from .fcv_probe import probe_header
+from .fcv_tracks import AXES
+
+
+def _align4(offset):
+    return (offset + 3) & ~0x03
+
+
+def _check_frames(data, runs, frame_dtype, max_time, error):
+    # Frame IDs must rise strictly within each axis and stay within max_time.
+    # All axes are checked in one vectorized pass; only a file with a problem is walked axis by axis.
+    frames = np.frombuffer(b"".join(data[start:start + 2 * count] for start, count, _, _ in runs), dtype=frame_dtype)
+    rising = frames[1:] > frames[:-1]
+    ends = np.cumsum([count for _, count, _, _ in runs])
+    rising[ends[:-1] - 1] = True  # The first key of an axis does not follow the previous axis' last one
+    if rising.all() and int(frames.max()) <= max_time:
+        return
+
+    for (start, count, joint, axis), end in zip(runs, ends):
+        axis_frames = frames[end - count:end]
+        if count > 1 and not np.all(axis_frames[1:] > axis_frames[:-1]):
+            at = int(np.argmax(axis_frames[1:] <= axis_frames[:-1])) + 1
+            error("frame_order", f"{axis}: frame {int(axis_frames[at])} at key {at} does not follow "
+                  f"frame {int(axis_frames[at - 1])}", joint=joint, offset=start + 2 * at)
+        if int(axis_frames.max()) > max_time:
+            error("frame_range", f"{axis}: frame {int(axis_frames.max())} is past max_time {max_time}",
+                  joint=joint, offset=start)
+
+
+def check_buffer(data, endianness):
+    """
+    Checks the structure of an FCV file held in 'data' (bytes or memoryview) in the given endianness.
+
+    Returns:
+        tuple: (list of errors, list of warnings); each one is {"check", "message"} plus "joint" / "offset"
+               where it applies. A file is valid when there are no errors.
+    """
+    errors = []
+    warnings = []
+
+    def error(check, message, **where):
+        errors.append({"check": check, "message": message, **where})
+
+    real_size = len(data)
+    if real_size < 3:
+        error("header", f"File is {real_size} byte(s), too small for a header")
+        return errors, warnings
+
+    max_time, node_count = struct.unpack_from(endianness + "HB", data, 0)
+    ids_end = 3 + node_count * 3
+    header_end = _align4(ids_end)
+    table_end = header_end + 4 + 4 * node_count
+    if table_end > real_size:
+        error("header", f"Header and pointer table need {table_end} bytes, file has {real_size}")
+        return errors, warnings
+
+    pairs = bytes(data[3:3 + node_count * 2])
+    if endianness == "<":
+        node_types, data_types = pairs[0::2], pairs[1::2]
+    else:
+        data_types, node_types = pairs[0::2], pairs[1::2]
+    node_ids = bytes(data[3 + node_count * 2:ids_end])
+
+    # Alignment padding after the node IDs must be zero
+    if any(data[ids_end:header_end]):
+        error("padding", f"Non-zero alignment padding at 0x{ids_end:04X}", offset=ids_end)
+
+    # Stored file size (0 = not filled in, which the game accepts)
+    file_size = struct.unpack_from(endianness + "I", data, header_end)[0]
+    if file_size not in (0, real_size):
+        error("file_size", f"Header file_size {file_size} != real size {real_size}", offset=header_end)
+
+    # Camera joints need a valid camera role
+    try:
+        detect_camera_roles(node_ids, data_types)
+    except ValueError as e:
+        error("camera_role", str(e).replace("[ERROR] ", ""))
+
+    pointers = struct.unpack_from(f"{endianness}{node_count}I", data, header_end + 4)
+    u16 = struct.Struct(endianness + "H")
+    frame_dtype = np.dtype(endianness + "u2")
+    blocks = []  # (start, end, joint) of blocks that could be measured
+    frame_runs = []  # (offset, key count, joint, axis) of every axis' frame IDs
+
+    for joint, (ptr, data_type) in enumerate(zip(pointers, data_types)):
+        enc = get_encoding_info(data_type)
+        if enc is None:
+            error("encoding", f"Unknown encoding 0x{data_type & 0xF0:02X} (data type 0x{data_type:02X})", joint=joint)
+            continue
+        if not table_end <= ptr < real_size:
+            error("pointer", f"Pointer 0x{ptr:08X} outside 0x{table_end:04X}..0x{real_size:04X}", joint=joint)
+            continue
+
+        # Walk the X/Y/Z sub-blocks: key count, frame IDs, then count * encoded key size
+        offset = ptr
+        for axis in AXES:
+            if offset + 2 > real_size:
+                error("block_length", f"{axis} key count at 0x{offset:04X} is past the end of the file",
+                      joint=joint, offset=offset)
+                break
+            count = u16.unpack_from(data, offset)[0]
+            frames_end = offset + 2 + 2 * count
+            axis_end = frames_end + count * enc["total_bytes"]
+            if axis_end > real_size:
+                error("block_length", f"{axis}: {count} keys of {2 + enc['total_bytes']} bytes run "
+                      f"{axis_end - real_size} byte(s) past the end of the file", joint=joint, offset=offset)
+                break
+            if count:
+                frame_runs.append((offset + 2, count, joint, axis))
+            offset = axis_end
+        else:
+            blocks.append((ptr, offset, joint))
+
+    if frame_runs:
+        _check_frames(data, frame_runs, frame_dtype, max_time, error)
+
+    # Blocks must not overlap (joints may share one identical block); unexplained gaps are only warned about
+    previous = None
+    for start, end, joint in sorted(blocks):
+        if previous is not None:
+            p_start, p_end, p_joint = previous
+            if start == p_start and end == p_end:
+                continue
+            if start < p_end:
+                error("overlap", f"Block of joint {joint} at 0x{start:04X} overlaps joint {p_joint}'s "
+                      f"(ends at 0x{p_end:04X})", joint=joint, offset=start)
+            elif start - _align4(p_end) > 0:
+                warnings.append({"check": "gap", "message": f"{start - p_end} unused byte(s) before joint {joint}'s block",
+                                 "joint": joint, "offset": p_end})
+        previous = (start, end, joint)
+
+    return errors, warnings
+
+
+def check_fcv(filepath, data=None, endianness=None):
+    """
+    Checks one file (or its contents in 'data', e.g. an archive member) with the endianness the header probe
+    picks, or the forced one.
+
+    Returns:
+        dict: {"file", "valid", "endianness", "size", "errors", "warnings"} (plain JSON data).
+    """
+    result = {"file": filepath, "valid": False, "endianness": None, "size": None, "errors": [], "warnings": []}
+    try:
+        with probe_header(filepath, data=data) as probe:
+            result["endianness"] = "little" if (endianness or probe.endianness) == "<" else "big"
+            result["size"] = probe.real_size
+            result["errors"], result["warnings"] = check_buffer(probe.buffer, endianness or probe.endianness)
+    except OSError as e:
+        result["errors"].append({"check": "read", "message": str(e)})
+    result["valid"] = not result["errors"]
+    return result
@@ -0,0 +1,111 @@
+# fcv_curves.py
+# Hermite curve evaluation for parsed FCV tracks.
+# Each segment between two keys is a cubic Hermite spline built from the keys' values and
+# tangents (out tangent of the left key, in tangent of the right key, both in value units per frame).
+# For the shared-tangent encoding (0xF0) the decoder already gives in == out, as produced by
+# decode_hermite_tangent, so no special case is needed here.
+
+from collections import OrderedDict
+
+import numpy as np
+
+from .fcv_tracks import AXES
+
+
+class _SegmentCoefficients:
+    """
+    Per-segment cubic coefficients of one axis: value(s) = ((a*s + b)*s + c)*s + d, s in [0, 1].
+    """
+    __slots__ = ("frames", "a", "b", "c", "d", "first", "last")
+
+    def __init__(self, track):
+        count = min(len(track.frames), len(track.values))
+        frames = track.frames[:count].astype(np.float64)
+        values = track.values[:count]
+        self.frames = frames
+        self.first = values[0] if count else np.nan
+        self.last = values[-1] if count else np.nan
+
+        p0, p1 = values[:-1], values[1:]
+        dt = np.diff(frames)
+        m0 = track.outs[:count][:-1] * dt
+        m1 = track.ins[:count][1:] * dt
+        self.a = 2.0 * p0 - 2.0 * p1 + m0 + m1
+        self.b = -3.0 * p0 + 3.0 * p1 - 2.0 * m0 - m1
+        self.c = m0
+        self.d = p0
+
+    def evaluate(self, times):
+        times = np.asarray(times, dtype=np.float64)
+        frames = self.frames
+        if len(frames) < 2:
+            return np.full(times.shape, self.first)
+
+        # Binary search for the segment holding each time.
+        seg = np.clip(np.searchsorted(frames, times, side="right") - 1, 0, len(frames) - 2)
+        span = frames[seg + 1] - frames[seg]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            s = np.where(span > 0, (times - frames[seg]) / span, 1.0)
+        result = ((self.a[seg] * s + self.b[seg]) * s + self.c[seg]) * s + self.d[seg]
+
+        # Hold the first/last key outside the animated range.
+        result = np.where(times <= frames[0], self.first, result)
+        return np.where(times >= frames[-1], self.last, result)
+
+
+class CurveEvaluator:
+    """
+    Samples the curves of a parsed FCV model (FCVParser or anything with keyframe_blocks / node_count).
+    Segment coefficients are built once per joint/axis and kept; recently evaluated poses are kept
+    in an LRU cache of 'pose_cache_size' frames.
+    """
+
+    def __init__(self, model, pose_cache_size=64):
+        self.model = model
+        self.pose_cache_size = pose_cache_size
+        self._coefficients = {}
+        self._poses = OrderedDict()
+
+    # Returns (building on first use) the segment coefficients of one joint axis.
+    def _segments(self, joint, axis):
+        key = (joint, axis)
+        segments = self._coefficients.get(key)
+        if segments is None:
+            track = self.model.keyframe_blocks[joint].axis(axis)
+            if track is None:
+                raise KeyError(f"Joint {joint} has no decoded {axis} axis")
+            segments = self._coefficients[key] = _SegmentCoefficients(track)
+        return segments
+
+    # Drops cached coefficients and poses (call after editing the model's tracks).
+    def invalidate(self):
+        self._coefficients.clear()
+        self._poses.clear()
+
+    # Value of one joint axis at time 't' (frames, may be fractional).
+    def sample(self, joint, axis, t):
+        return float(self._segments(joint, axis).evaluate(t))
+
+    # Values of one joint axis at many times in one call.
+    def sample_many(self, joint, axis, times):
+        return self._segments(joint, axis).evaluate(times)
+
+    # Every joint's X/Y/Z value at one frame, as a read-only (node_count, 3) array.
+    # Axes without keys give NaN.
+    def evaluate_pose(self, frame):
+        frame = float(frame)
+        pose = self._poses.get(frame)
+        if pose is not None:
+            self._poses.move_to_end(frame)
+            return pose
+
+        pose = np.full((self.model.node_count, len(AXES)), np.nan)
+        for joint in range(self.model.node_count):
+            for column, axis in enumerate(AXES):
+                pose[joint, column] = self._segments(joint, axis).evaluate(frame)
+        pose.setflags(write=False)
+
+        self._poses[frame] = pose
+        if len(self._poses) > self.pose_cache_size:
+            self._poses.popitem(last=False)
+        return pose
@@ -0,0 +1,155 @@
+# fcv_dedup.py
+# Content-addressed deduplication of axis blocks across a corpus.
+# An axis block is keyed by a hash of its data type, byte order, frame IDs and encoded payload.
+# Parsers sharing a BlockStore decode each unique block once and reuse the same AxisTrack object for
+# every later copy (bind-pose-only axes, shared idle layers, copied clips, ...).
+# Shared tracks are read-only: edit a block by replacing the AxisTrack (as fcv_reduce does), not its arrays.
+
+import hashlib
+
+from .fcv_parser import FCVParser
+from .fcv_probe import probe_header
+from .fcv_tracks import AxisTrack
+
+# Shared blocks listed by name in dedup_report, most bytes saved first.
+REPORT_TOP_BLOCKS = 20
+
+
+def block_key(data_type, endianness, block, variant=""):
+    """
+    Content key of one axis block: 'block' is its frame IDs plus encoded keys, exactly as stored in the file.
+    'variant' tells apart decodes of the same bytes that give different tracks (e.g. under a TrackTransform).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(bytes((data_type, 0 if endianness == "<" else 1)))
+    digest.update(block)
+    if variant:
+        digest.update(variant.encode())
+    return digest.hexdigest()
+
+
+class BlockStore:
+    """
+    Decoded axis blocks by content key (see block_key), shared by every parser given this store
+    (FCVParser(block_store=...)). The store holds every unique block it has seen.
+    """
+
+    def __init__(self):
+        self._tracks = {}
+        self.hits = 0
+        self.misses = 0
+        self.hit_bytes = 0
+
+    def __len__(self):
+        return len(self._tracks)
+
+    # Looks up an axis block by content. Returns (key, shared track or None on a miss);
+    # 'need_raw' treats a stored track without raw keys as a miss.
+    def lookup(self, data_type, endianness, block, need_raw=False, variant=""):
+        key = block_key(data_type, endianness, block, variant)
+        track = self._tracks.get(key)
+        if track is None or (need_raw and track.raw is None):
+            self.misses += 1
+            return key, None
+        self.hits += 1
+        self.hit_bytes += len(block)
+        return key, track
+
+    # Stores a freshly decoded track and returns the shared, read-only copy to use instead.
+    def add(self, key, track):
+        # Own the arrays: frame IDs and raw keys of lazy parses are views into the mapped file.
+        track = AxisTrack(
+            track.frames.copy(), track.values, track.ins, track.outs, track.int_values,
+            track.raw.copy() if track.raw is not None else None
+        )
+        for array in (track.frames, track.values, track.ins, track.outs, track.raw):
+            if array is not None:
+                array.setflags(write=False)
+        self._tracks[key] = track
+        return track
+
+    # Resident bytes of the stored tracks.
+    @property
+    def nbytes(self):
+        return sum(track.nbytes for track in self._tracks.values())
+
+
+def dedup_report(file_refs, top=REPORT_TOP_BLOCKS):
+    """
+    Summarizes how much of a corpus is duplicated, from the block references of every parsed file.
+
+    Args:
+        file_refs (iterable): (file path, [(block key, block bytes, key count), ...]) per file,
+                              e.g. (parser.filepath, parser.block_refs).
+        top (int): Number of most-shared blocks listed.
+
+    Returns:
+        dict: files, axis_blocks, unique_blocks, total_bytes, unique_bytes, duplicated_bytes, duplicated_keys,
+              cross_file_blocks / cross_file_bytes (duplicates whose copies are in other files), and
+              "top": [{"key", "bytes", "keys", "references", "files"}] sorted by bytes saved.
+    """
+    blocks = {}  # key -> [bytes, keys, references, set of files]
+    files = 0
+    for path, refs in file_refs:
+        files += 1
+        for key, size, keys in refs:
+            entry = blocks.get(key)
+            if entry is None:
+                entry = blocks[key] = [size, keys, 0, set()]
+            entry[2] += 1
+            entry[3].add(path)
+
+    total_bytes = sum(size * refs for size, _, refs, _ in blocks.values())
+    unique_bytes = sum(size for size, _, _, _ in blocks.values())
+    shared = sorted(
+        ((key, entry) for key, entry in blocks.items() if entry[2] > 1),
+        key=lambda item: (-item[1][0] * (item[1][2] - 1), item[0])
+    )
+    return {
+        "files": files,
+        "axis_blocks": sum(entry[2] for entry in blocks.values()),
+        "unique_blocks": len(blocks),
+        "total_bytes": total_bytes,
+        "unique_bytes": unique_bytes,
+        "duplicated_bytes": total_bytes - unique_bytes,
+        "duplicated_keys": sum(keys * (refs - 1) for _, keys, refs, _ in blocks.values()),
+        "cross_file_blocks": sum(1 for _, _, _, paths in blocks.values() if len(paths) > 1),
+        "cross_file_bytes": sum(size * (len(paths) - 1) for size, _, _, paths in blocks.values()),
+        "top": [
+            {"key": key, "bytes": size, "keys": keys, "references": refs, "files": sorted(paths)}
+            for key, (size, keys, refs, paths) in shared[:top]
+        ],
+    }
+
+
+def parse_corpus(paths, store=None, **parser_options):
+    """
+    Parses every file with one shared BlockStore, for whole-corpus analysis: identical axis blocks are
+    decoded once and held once. Files that fail to parse are skipped.
+
+    Args:
+        paths (iterable): FCV file paths.
+        store (BlockStore or None): Store to share (a new one by default).
+        parser_options: Extra FCVParser arguments (log_level defaults to "none" and keep_raw to False;
+                        endianness is probed per file).
+
+    Returns:
+        tuple: (list of parsed FCVParsers, BlockStore, list of (path, error message))
+    """
+    store = store if store is not None else BlockStore()
+    parser_options.setdefault("log_level", "none")
+    parser_options.setdefault("keep_raw", False)
+    parsers = []
+    errors = []
+    for path in paths:
+        try:
+            with probe_header(path) as probe:
+                endianness = parser_options.get("endianness") or probe.endianness
+            options = dict(parser_options, endianness=endianness)
+            parser = FCVParser(path, block_store=store, **options)
+            parser.parse()
+            parsers.append(parser)
+        except Exception as e:
+            errors.append((path, str(e)))
+    return parsers, store, errors
+
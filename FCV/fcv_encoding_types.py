@@ -1,5 +1,10 @@
 import struct
 import math
+from functools import lru_cache
+
+import numpy as np
+
+from .fcv_tracks import AxisTrack
 
 
 # FCV_ENCODING_TYPES dictionary defines various formats for keyframe encoding.
@@ -172,7 +177,17 @@ def decode_axis_keyframes(data: bytes, encoding_byte: int, frame_ids: list, endi
 def convert_degrees_to_radians(keyframe_block):
     """
     Converts 'value' fields in a keyframe block from degrees to radians for each axis.
+    Accepts a columnar JointTrack or a legacy block dict.
+    FCVParser(transform=TrackTransform(rotation_units=...)) converts while decoding instead (tangents too).
     """
+    if hasattr(keyframe_block, "axes"):
+        # Replace the AxisTracks instead of editing them: tracks may be shared (see fcv_dedup.BlockStore).
+        # The encoded keys no longer match the values, so the new tracks have none.
+        for axis, track in keyframe_block.axes.items():
+            keyframe_block.axes[axis] = AxisTrack(
+                track.frames, round_array(np.radians(track.values), 6), track.ins, track.outs
+            )
+        return
     for axis in ['X', 'Y', 'Z']:
         for kf in keyframe_block["axis_data"][axis]["values"]:
             kf["value"] = round(math.radians(kf["value"]), 6)
@@ -180,7 +195,17 @@ def convert_degrees_to_radians(keyframe_block):
 def convert_radians_to_degrees(keyframe_block):
     """
     Converts 'value' fields in a keyframe block from radians to degrees for each axis.
+    Accepts a columnar JointTrack or a legacy block dict.
+    FCVParser(transform=TrackTransform(rotation_units=...)) converts while decoding instead (tangents too).
     """
+    if hasattr(keyframe_block, "axes"):
+        # Replace the AxisTracks instead of editing them: tracks may be shared (see fcv_dedup.BlockStore).
+        # The encoded keys no longer match the values, so the new tracks have none.
+        for axis, track in keyframe_block.axes.items():
+            keyframe_block.axes[axis] = AxisTrack(
+                track.frames, round_array(np.degrees(track.values), 6), track.ins, track.outs
+            )
+        return
 
     for axis in ['X', 'Y', 'Z']:
         for kf in keyframe_block["axis_data"][axis]["values"]:
@@ -222,3 +247,160 @@ def is_clamped_slope(val, slope_range=10.0, epsilon=1e-3):
     Used to detect 'clamped' tangents for debugging or validation.
     """
     return abs(abs(val) - slope_range) < epsilon  
+
+
+# numpy type codes for each component width (all components are signed, matching _fmt above).
+_NP_FIELD_CODES = {4: "f4", 2: "i2", 1: "i1"}
+
+
+@lru_cache(maxsize=None)
+def get_keyframe_dtype(encoding_byte, endianness="<"):
+    """
+    Builds the numpy structured dtype for one encoded keyframe (value, in, out).
+    The shared-tangent layout (0xF0) has no 'out' field; its 'in' field is reused as both tangents.
+    """
+    enc = get_encoding_info(encoding_byte)
+    if not enc:
+        raise ValueError(f"Invalid encoding byte: 0x{encoding_byte:02X}")
+
+    fields = [
+        ("value", endianness + _NP_FIELD_CODES[enc["value_bytes"]]),
+        ("in", endianness + _NP_FIELD_CODES[enc["tangent_in_bytes"]]),
+    ]
+    if enc["tangent_out_bytes"] > 0:
+        fields.append(("out", endianness + _NP_FIELD_CODES[enc["tangent_out_bytes"]]))
+    return np.dtype(fields)
+
+
+def round_array(values, ndigits):
+    """
+    Rounds a float64 array exactly like Python's round(x, ndigits) does for each element.
+    np.round() rounds the scaled product, which can fall on the other side of a tie than the
+    correctly rounded decimal; those few elements (and non-finite/huge ones) are redone with round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** ndigits
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = values * scale
+        rounded = np.rint(scaled)
+        result = rounded / scale
+        suspect = (
+            ~np.isfinite(scaled)
+            | (np.abs(scaled) >= 2.0 ** 52)
+            | (np.abs(np.abs(scaled - rounded) - 0.5) <= 2 * np.spacing(scaled))
+        )
+    if suspect.any():
+        result[suspect] = [round(float(v), ndigits) for v in values[suspect]]
+    return result
+
+
+# Every possible 1-byte tangent, decoded (and rounded) by the scalar reference path.
+_TANGENT_LUT_1 = np.array([round(decode_hermite_tangent(raw, 1), 4) for raw in range(-128, 128)])
+
+
+def _decode_component(raw, size, is_tangent, exact=False):
+    """
+    Decodes one raw component column (value or tangent) to rounded float64,
+    following the same rules as decode_axis_keyframes / decode_hermite_tangent.
+    exact=True skips the rounding (full float32 precision, unrounded 1-byte tangent slopes).
+    """
+    if size == 4:
+        with np.errstate(invalid="ignore"):  # signalling NaNs in float payloads are kept as NaN
+            values = raw.astype(np.float64)
+        return values if exact else round_array(values, 4)
+    if size == 2:
+        # raw / 10000 already has at most 4 decimals, so round(..., 4) leaves it untouched.
+        return raw.astype(np.float64) / 10000.0
+    if is_tangent:
+        if exact:
+            return raw.astype(np.float64) / 255.0 * 0.001
+        return _TANGENT_LUT_1[raw.astype(np.int64) + 128]
+    return raw.astype(np.float64)  # 1-byte values are used as-is
+
+
+def read_raw_keyframes(data, encoding_byte, frame_count, endianness="<"):
+    """
+    Returns the encoded keys of an axis payload as a structured array (a view over 'data', no copy).
+    Keys that do not fit in 'data' are dropped, like the scalar decoder does.
+    """
+    dtype = get_keyframe_dtype(encoding_byte, endianness)
+    count = min(frame_count, len(data) // dtype.itemsize)
+    return np.frombuffer(data, dtype=dtype, count=count)
+
+
+def decode_raw_keyframes(raw, encoding_byte, exact=False):
+    """
+    Decodes a structured array from read_raw_keyframes into (values, in_tangents, out_tangents).
+    exact=True returns the unrounded values (see _decode_component).
+    """
+    enc = get_encoding_info(encoding_byte)
+    if not enc:
+        raise ValueError(f"Invalid encoding byte: 0x{encoding_byte:02X}")
+
+    values = _decode_component(raw["value"], enc["value_bytes"], is_tangent=False, exact=exact)
+    ins = _decode_component(raw["in"], enc["tangent_in_bytes"], is_tangent=True, exact=exact)
+    if enc["tangent_out_bytes"] > 0:
+        outs = _decode_component(raw["out"], enc["tangent_out_bytes"], is_tangent=True, exact=exact)
+    else:
+        outs = ins.copy()  # Shared tangent
+    return values, ins, outs
+
+
+def decode_axis_arrays(data, encoding_byte, frame_count, endianness="<"):
+    """
+    Vectorized counterpart of decode_axis_keyframes.
+    Decodes a whole axis payload in one pass and returns (values, in_tangents, out_tangents)
+    as float64 arrays. Keys that do not fit in 'data' are dropped, like the scalar decoder does.
+    """
+    if not get_encoding_info(encoding_byte):
+        raise ValueError(f"Invalid encoding byte: 0x{encoding_byte:02X}")
+    return decode_raw_keyframes(read_raw_keyframes(data, encoding_byte, frame_count, endianness), encoding_byte)
+
+
+def _encode_component(decoded, size, is_tangent):
+    """
+    Inverse of _decode_component: quantizes decoded floats back to raw component values.
+    Out-of-range values are clamped (the round-trip error shows how much was lost).
+    """
+    decoded = np.asarray(decoded, dtype=np.float64)
+    if size == 4:
+        return decoded.astype(np.float32)
+    if size == 2:
+        return np.clip(np.rint(decoded * 10000.0), -32768, 32767).astype(np.int16)
+    if is_tangent:
+        # Pick the raw byte whose decoded slope is nearest (the lookup table is monotonic).
+        idx = np.clip(np.searchsorted(_TANGENT_LUT_1, decoded), 1, 255)
+        lower_closer = np.abs(decoded - _TANGENT_LUT_1[idx - 1]) <= np.abs(_TANGENT_LUT_1[idx] - decoded)
+        return (np.where(lower_closer, idx - 1, idx) - 128).astype(np.int8)
+    return np.clip(np.rint(decoded), -128, 127).astype(np.int8)
+
+
+def encode_axis_arrays(values, ins, outs, encoding_byte, endianness="<"):
+    """
+    Encodes decoded values / in / out tangents into a structured array of raw keys
+    for the given encoding (see get_keyframe_dtype). The shared-tangent layout only stores 'in'.
+    """
+    enc = get_encoding_info(encoding_byte)
+    if not enc:
+        raise ValueError(f"Invalid encoding byte: 0x{encoding_byte:02X}")
+
+    raw = np.empty(len(values), dtype=get_keyframe_dtype(encoding_byte, endianness))
+    raw["value"] = _encode_component(values, enc["value_bytes"], is_tangent=False)
+    raw["in"] = _encode_component(ins, enc["tangent_in_bytes"], is_tangent=True)
+    if enc["tangent_out_bytes"] > 0:
+        raw["out"] = _encode_component(outs, enc["tangent_out_bytes"], is_tangent=True)
+    return raw
+
+
+def decode_axis_keyframes_batch(data: bytes, encoding_byte: int, frame_ids: list, endianness: str = "<") -> list:
+    """
+    Same result as decode_axis_keyframes (which stays the reference implementation),
+    but decodes the payload with decode_axis_arrays instead of one key at a time.
+    """
+    values, ins, outs = decode_axis_arrays(data, encoding_byte, len(frame_ids), endianness)
+    if get_encoding_info(encoding_byte)["value_bytes"] == 1:
+        values = values.astype(np.int64)  # The scalar decoder keeps 1-byte values as ints
+    return [
+        {"frame": fid, "value": v, "in": i, "out": o}
+        for fid, v, i, o in zip(frame_ids, values.tolist(), ins.tolist(), outs.tolist())
+    ]
@@ -0,0 +1,274 @@
+# fcv_index.py
+# SQLite index of a FCV corpus: per-file headers, joint tables (node IDs, node-type flags, encodings,
+# data and camera roles) and per-axis key counts and frame ranges. Once a folder is indexed, corpus-wide
+# questions are answered from the database without opening a single .fcv file.
+# Updates are incremental: files whose size and mtime (or, failing that, content hash) are unchanged
+# are skipped, and files that disappeared are removed.
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from .fcv_parser import FCVParser
+from .fcv_probe import probe_header
+from .fcv_watch import file_hash
+
+# Bump when the schema changes; an index of another version is rebuilt from scratch.
+INDEX_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    endianness TEXT,
+    max_time INTEGER,
+    node_count INTEGER,
+    file_size INTEGER,
+    padding INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS joints (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    joint INTEGER NOT NULL,
+    node_id INTEGER NOT NULL,
+    node_type INTEGER NOT NULL,
+    data_type INTEGER NOT NULL,
+    encoding INTEGER NOT NULL,
+    data_role TEXT NOT NULL,
+    camera_role TEXT,
+    key_count INTEGER NOT NULL,
+    PRIMARY KEY (file_id, joint)
+);
+CREATE TABLE IF NOT EXISTS joint_flags (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    joint INTEGER NOT NULL,
+    flag TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS axes (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    joint INTEGER NOT NULL,
+    axis TEXT NOT NULL,
+    key_count INTEGER NOT NULL,
+    first_frame INTEGER,
+    last_frame INTEGER
+);
+CREATE INDEX IF NOT EXISTS joints_node_id ON joints(node_id);
+CREATE INDEX IF NOT EXISTS joints_encoding ON joints(encoding);
+CREATE INDEX IF NOT EXISTS joints_camera_role ON joints(camera_role);
+CREATE INDEX IF NOT EXISTS joint_flags_flag ON joint_flags(flag, file_id, joint);
+CREATE INDEX IF NOT EXISTS joint_flags_joint ON joint_flags(file_id, joint);
+CREATE INDEX IF NOT EXISTS axes_joint ON axes(file_id, joint);
+"""
+
+
+def index_record(path, endianness=None):
+    """
+    Parses one file and returns everything the index stores about it.
+    Parse errors are recorded (header fields that were read are kept) instead of raised.
+
+    Returns:
+        dict: {"path", "mtime_ns", "size", "hash", "endianness", "max_time", "node_count", "file_size",
+               "padding", "error", "joints": [row tuples], "flags": [...], "axes": [...]}
+    """
+    st = os.stat(path)
+    record = {
+        "path": path, "mtime_ns": st.st_mtime_ns, "size": st.st_size, "hash": file_hash(path),
+        "endianness": None, "max_time": None, "node_count": None, "file_size": None, "padding": None,
+        "error": None, "joints": [], "flags": [], "axes": [],
+    }
+    with probe_header(path) as probe:
+        record["endianness"] = endianness or probe.endianness
+        parser = FCVParser(
+            path, endianness=record["endianness"], log_level="none", keep_raw=False, buffer=probe.buffer
+        )
+        try:
+            parser.parse()
+        except Exception as e:
+            record["error"] = str(e)
+        finally:
+            parser.close()
+
+    for name in ("max_time", "node_count", "file_size"):
+        record[name] = getattr(parser, name)
+    record["padding"] = getattr(parser, "padding", None)
+    if record["error"]:
+        return record
+
+    for joint, block in enumerate(parser.keyframe_blocks):
+        data_type = parser.data_types[joint]
+        record["joints"].append((
+            joint, parser.node_ids[joint], parser.node_types[joint], data_type, data_type & 0xF0,
+            parser.data_type_roles[joint], parser.camera_roles.get(joint), block.count
+        ))
+        record["flags"].extend((joint, flag.strip()) for flag in parser.node_type_flags[joint])
+        for axis, track in block.axes.items():
+            frames = track.frames
+            record["axes"].append((
+                joint, axis, len(frames),
+                int(frames.min()) if len(frames) else None, int(frames.max()) if len(frames) else None
+            ))
+    return record
+
+
+class CorpusIndex:
+    """
+    SQLite index of parsed FCV files. Use update() to (re)index files and the find_* / query methods
+    to ask questions; the .fcv files are only read by update().
+
+    Args:
+        path (str): Database file (created if missing; ":memory:" for a throwaway index).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            for table in ("axes", "joint_flags", "joints", "files"):
+                self.db.execute(f"DROP TABLE IF EXISTS {table}")
+            self.db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def update(self, paths, jobs=1, force_endian=None, prune=True):
+        """
+        Indexes new and modified files among 'paths' and, with 'prune', drops indexed files that are not
+        among them any more. A file is re-parsed only when its size/mtime changed and its content hash
+        differs from the indexed one.
+
+        Args:
+            paths (iterable): FCV file paths (e.g. from scan_fcv); they are indexed as absolute paths.
+            jobs (int): Worker processes used to parse changed files.
+            force_endian (str or None): '<' or '>' instead of auto-detecting.
+            prune (bool): Remove indexed files missing from 'paths'.
+
+        Returns:
+            dict: {"indexed", "unchanged", "removed", "failed"} file counts.
+        """
+        known = {
+            path: (mtime_ns, size, digest)
+            for path, mtime_ns, size, digest in self.db.execute("SELECT path, mtime_ns, size, hash FROM files")
+        }
+        seen = set()
+        changed = []
+        unchanged = 0
+        for path in paths:
+            path = os.path.abspath(path)  # Same key whatever folder the update runs from
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = known.get(path)
+            if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+                unchanged += 1
+                continue
+            if entry is not None and entry[2] == file_hash(path):
+                # Touched but identical: just refresh the stat
+                self.db.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?", (st.st_mtime_ns, st.st_size, path)
+                )
+                unchanged += 1
+                continue
+            changed.append(path)
+
+        counts = {"indexed": 0, "unchanged": unchanged, "removed": 0, "failed": 0}
+        if jobs > 1 and len(changed) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                records = pool.map(index_record, changed, [force_endian] * len(changed), chunksize=8)
+                for record in records:
+                    self._store(record, counts)
+        else:
+            for path in changed:
+                self._store(index_record(path, force_endian), counts)
+
+        if prune:
+            for path in known.keys() - seen:
+                self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+                counts["removed"] += 1
+        self.db.commit()
+        return counts
+
+    def _store(self, record, counts):
+        db = self.db
+        db.execute("DELETE FROM files WHERE path = ?", (record["path"],))  # Cascades to the joint rows
+        file_id = db.execute(
+            "INSERT INTO files (path, mtime_ns, size, hash, endianness, max_time, node_count, file_size, padding, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            tuple(record[name] for name in (
+                "path", "mtime_ns", "size", "hash", "endianness", "max_time", "node_count", "file_size",
+                "padding", "error"
+            ))
+        ).lastrowid
+        db.executemany("INSERT INTO joints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                       ((file_id,) + row for row in record["joints"]))
+        db.executemany("INSERT INTO joint_flags VALUES (?, ?, ?)", ((file_id,) + row for row in record["flags"]))
+        db.executemany("INSERT INTO axes VALUES (?, ?, ?, ?, ?, ?)", ((file_id,) + row for row in record["axes"]))
+        counts["failed" if record["error"] else "indexed"] += 1
+
+    def find_joints(self, node_id=None, node_flag=None, encoding=None, data_role=None, camera_role=None,
+                    longer_than=None):
+        """
+        Joints matching every given condition, as (path, joint index, node ID, data type, camera role) rows
+        ordered by path and joint.
+
+        Args:
+            node_id (int): Joint/node ID byte.
+            node_flag (str): Node-type flag label as returned by get_node_type_flags (case-insensitive).
+            encoding (int): Encoding byte (upper nibble of the data type, e.g. 0x60).
+            data_role (str): Data role label (e.g. "CAMERA").
+            camera_role (str): Camera role label (e.g. "Camera FOV").
+            longer_than (int): Some axis has keys spanning more than this many frames.
+        """
+        where = []
+        params = []
+        if node_id is not None:
+            where.append("j.node_id = ?")
+            params.append(node_id)
+        if node_flag is not None:
+            where.append("EXISTS (SELECT 1 FROM joint_flags f WHERE f.file_id = j.file_id AND f.joint = j.joint "
+                         "AND f.flag = ? COLLATE NOCASE)")
+            params.append(node_flag.strip())
+        if encoding is not None:
+            where.append("j.encoding = ?")
+            params.append(encoding & 0xF0)
+        if data_role is not None:
+            where.append("j.data_role = ? COLLATE NOCASE")
+            params.append(data_role)
+        if camera_role is not None:
+            where.append("j.camera_role = ? COLLATE NOCASE")
+            params.append(camera_role)
+        if longer_than is not None:
+            where.append("EXISTS (SELECT 1 FROM axes a WHERE a.file_id = j.file_id AND a.joint = j.joint "
+                         "AND a.last_frame - a.first_frame > ?)")
+            params.append(longer_than)
+        sql = ("SELECT files.path, j.joint, j.node_id, j.data_type, j.camera_role "
+               "FROM joints j JOIN files ON files.id = j.file_id")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY files.path, j.joint"
+        return self.db.execute(sql, params).fetchall()
+
+    # Runs a read-only SQL query against the index. Returns (column names, rows).
+    def query(self, sql, params=()):
+        self.db.execute("PRAGMA query_only = ON")
+        try:
+            cursor = self.db.execute(sql, params)
+            return [d[0] for d in cursor.description or ()], cursor.fetchall()
+        finally:
+            self.db.execute("PRAGMA query_only = OFF")
+
+    # Number of indexed files, and of those that failed to parse.
+    def stats(self):
+        return self.db.execute("SELECT COUNT(*), COUNT(error) FROM files").fetchone()
@@ -0,0 +1,171 @@
+# fcv_json.py
+# Streaming JSON export of a parsed FCV file. Joints are serialized one at a time as they are decoded and
+# their keyframe lists are written in chunks, so a lazy parse never holds more than one decoded joint
+# (and never its whole JSON text) in memory.
+# "pretty" output is byte-identical to json.dump(parser.to_dict(), f, indent=2).
+
+import os
+import json
+
+from .fcv_tracks import AXES
+
+# Output variants: indented like the old export, compact (no whitespace), or newline-delimited records.
+JSON_MODES = ("pretty", "compact", "ndjson")
+
+# NDJSON record size: one line per joint, or one line per joint axis.
+NDJSON_RECORDS = ("joint", "axis")
+
+_COMPACT = (",", ":")
+
+# Keys serialized per write when streaming an axis' frame and value lists.
+CHUNK_KEYS = 4096
+
+
+def _list_token(lists, chunks):
+    # Placeholder string for a list that is streamed in chunks instead of being built in memory.
+    lists.append(chunks)
+    return f"\x00FCV{len(lists) - 1}"
+
+
+def _track_stub(track, lists):
+    # AxisTrack.as_dict() with its two lists replaced by placeholders.
+    count = len(track.frames)
+    return {
+        "frames": _list_token(lists, (track.frames[a:a + CHUNK_KEYS].tolist() for a in range(0, count, CHUNK_KEYS))),
+        "values": _list_token(lists, (track.value_dicts(a, a + CHUNK_KEYS) for a in range(0, count, CHUNK_KEYS))),
+    }
+
+
+def _block_stub(block, lists):
+    # JointTrack.as_dict() with every axis list replaced by placeholders.
+    return {
+        "count": block.count,
+        "encoding": block.encoding,
+        "axis_data": {axis: _track_stub(track, lists) for axis, track in block.axes.items()},
+    }
+
+
+def _write_streamed(stream, obj, lists, pretty, indent=""):
+    # Dumps 'obj' like json.dumps(indent=2) (re-indented by 'indent') or compactly, writing each
+    # placeholder's list chunk by chunk in its place.
+    if pretty:
+        text = json.dumps(obj, indent=2).replace("\n", "\n" + indent)
+    else:
+        text = json.dumps(obj, separators=_COMPACT)
+
+    pos = 0
+    for n, chunks in enumerate(lists):
+        at = text.index(json.dumps(f"\x00FCV{n}"), pos)
+        stream.write(text[pos:at])
+        pos = at + len(json.dumps(f"\x00FCV{n}"))
+
+        line = text[text.rfind("\n", 0, at) + 1:at]
+        line_indent = line[:len(line) - len(line.lstrip(" "))]
+        stream.write("[")
+        written = False
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if pretty:
+                inner = json.dumps(chunk, indent=2)[2:-2].replace("\n", "\n" + line_indent)
+                stream.write(("," if written else "") + "\n" + line_indent + inner)
+            else:
+                stream.write(("," if written else "") + json.dumps(chunk, separators=_COMPACT)[1:-1])
+            written = True
+        stream.write(("\n" + line_indent + "]") if written and pretty else "]")
+    stream.write(text[pos:])
+
+
+def _write_document(parser, stream, pretty):
+    # The to_dict() document, written header first and then one node at a time.
+    header = parser.header_dict()
+    header["nodes"] = []
+    if pretty:
+        text = json.dumps(header, indent=2)
+        indent, last_line = "    ", "\n  "
+    else:
+        text = json.dumps(header, separators=_COMPACT)
+        indent, last_line = "", ""
+    # Split the dump around the empty nodes list: "...nodes": [" + nodes + "]" + "}".
+    cut = text.rindex("[]")
+    stream.write(text[:cut + 1])
+
+    count = 0
+    for i, block in parser.iter_joints():
+        lists = []
+        node = parser.node_dict(i, None)
+        node["keyframes"] = _block_stub(block, lists)
+        stream.write("," if count else "")
+        if pretty:
+            stream.write("\n" + indent)
+        _write_streamed(stream, node, lists, pretty, indent)
+        count += 1
+
+    # An empty list stays "[]", like json.dump writes it.
+    stream.write((last_line if count else "") + text[cut + 1:])
+
+
+def _write_ndjson(parser, stream, source, records):
+    # One "file" record with the header, then one record per joint (or per joint axis).
+    header = {"record": "file", "file": source}
+    header.update(parser.header_dict())
+    stream.write(json.dumps(header, separators=_COMPACT) + "\n")
+
+    for i, block in parser.iter_joints():
+        node = parser.node_dict(i, None)
+        del node["keyframes"]
+        if records == "joint":
+            lists = []
+            record = {"record": "joint", "file": source, "joint": i}
+            record.update(node)
+            record["keyframes"] = _block_stub(block, lists)
+            _write_streamed(stream, record, lists, False)
+            stream.write("\n")
+            continue
+        for axis in AXES:
+            track = block.axis(axis)
+            if track is None:
+                continue
+            lists = []
+            record = {"record": "axis", "file": source, "joint": i, "axis": axis}
+            record.update(node)
+            record.update(_track_stub(track, lists))
+            _write_streamed(stream, record, lists, False)
+            stream.write("\n")
+
+
+def write_json(parser, stream, mode="pretty", records="joint", source=None):
+    """
+    Streams a parsed file as JSON into an open text stream.
+
+    Args:
+        parser (FCVParser): A parsed file (a lazy parse keeps memory to one joint at a time).
+        stream (file-like): Text stream to write to (e.g. a combined batch NDJSON file).
+        mode (str): "pretty" (same bytes as json.dump(to_dict(), indent=2)), "compact" or "ndjson".
+        records (str): For "ndjson": one line per "joint" or per "axis".
+        source (str or None): File name stored in every NDJSON record (default: the parser's file path).
+    """
+    if mode not in JSON_MODES:
+        raise ValueError(f"Unknown JSON mode '{mode}' (expected one of: {', '.join(JSON_MODES)})")
+    if mode == "ndjson":
+        if records not in NDJSON_RECORDS:
+            raise ValueError(f"Unknown NDJSON record type '{records}' (expected 'joint' or 'axis')")
+        _write_ndjson(parser, stream, parser.filepath if source is None else source, records)
+    else:
+        _write_document(parser, stream, mode == "pretty")
+
+
+def export_json(parser, path, mode="pretty", records="joint"):
+    """
+    Writes a parsed file to 'path' as JSON (see write_json) and returns the path.
+    """
+    with open(path, "w", encoding="utf-8", buffering=1 << 16) as f:
+        write_json(parser, f, mode=mode, records=records)
+    return path
+
+
+def json_export_path(filepath, mode="pretty"):
+    """
+    Output path for a file's JSON export: next to the .fcv, ".ndjson" for NDJSON and ".json" otherwise.
+    """
+    return os.path.splitext(filepath)[0] + (".ndjson" if mode == "ndjson" else ".json")
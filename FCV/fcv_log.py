@@ -0,0 +1,98 @@
+# fcv_log.py
+# Level-aware, buffered debug log used by FCVParser.
+# Messages can be passed as callables so expensive text (like the per-keyframe dump) is only
+# formatted when its level is enabled. Nothing is opened or written at level "none".
+
+LOG_NONE = 0
+LOG_ERROR = 1
+LOG_INFO = 2
+LOG_DEBUG = 3
+
+LOG_LEVELS = {
+    "none": LOG_NONE,
+    "error": LOG_ERROR,
+    "info": LOG_INFO,     # Header, joint table and pointer table
+    "debug": LOG_DEBUG,   # Everything, including every keyframe of every axis
+}
+
+
+def get_log_level(level):
+    # Accepts a level name or number.
+    if isinstance(level, str):
+        if level.lower() not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {level} (expected one of {', '.join(LOG_LEVELS)})")
+        return LOG_LEVELS[level.lower()]
+    return int(level)
+
+
+class FCVLog:
+    """
+    Writes log lines to a file path (opened on first write) or to an already open stream,
+    without flushing after every line.
+
+    Args:
+        path (str or None): Log file to create.
+        stream (file-like or None): Shared destination instead of 'path' (e.g. a batch log); not closed here.
+        level (str or int): Highest level written.
+        echo (bool): Also print written lines to the console (verbose mode).
+        buffer_size (int): Write buffer of the log file.
+    """
+
+    def __init__(self, path=None, stream=None, level="debug", echo=False, buffer_size=1 << 16):
+        self.path = path
+        self.level = get_log_level(level)
+        self.echo = echo
+        self.buffer_size = buffer_size
+        self._stream = stream
+        self._owns_stream = False
+        self._opened = False
+
+    # True when messages of 'level' would be written somewhere.
+    def enabled(self, level):
+        return level <= self.level and (self.path is not None or self._stream is not None or self.echo)
+
+    # Writes a message (str, or a callable returning one) if 'level' is enabled.
+    def write(self, level, msg):
+        if not self.enabled(level):
+            return
+        if callable(msg):
+            msg = msg()
+        stream = self._open()
+        if stream is not None:
+            stream.write(msg + "\n")
+        if self.echo:
+            print(msg)
+
+    def error(self, msg):
+        self.write(LOG_ERROR, msg)
+
+    def info(self, msg):
+        self.write(LOG_INFO, msg)
+
+    def debug(self, msg):
+        self.write(LOG_DEBUG, msg)
+
+    def flush(self):
+        if self._stream is not None:
+            self._stream.flush()
+
+    # Closes the log file (shared streams are only flushed).
+    def close(self):
+        if self._stream is None:
+            return
+        if self._owns_stream:
+            self._stream.close()
+            self._stream = None
+            self._owns_stream = False
+        else:
+            self._stream.flush()
+
+    def _open(self):
+        if self._stream is None and self.path is not None:
+            # Append if the file was already written and closed once (e.g. lazy decoding after parse()).
+            mode = "a" if self._opened else "w"
+            self._stream = open(self.path, mode, encoding="utf-8", buffering=self.buffer_size)
+            self._owns_stream = True
+            self._opened = True
+        return self._stream
+
@@ -0,0 +1,174 @@
+# fcv_npz.py
+# Columnar NumPy (.npz) export of decoded FCV tracks for analysis tools.
+# One layout covers a single file and a stacked archive of many files: per-joint metadata arrays,
+# one concatenated column per axis and component, and offset indexes to slice out a file, joint or axis.
+#
+# Archive arrays (F = files, J = joints over all files, K = keys of one axis over all joints):
+#   format_version          ()      NPZ_FORMAT_VERSION
+#   files                   (F,)    source file names
+#   file_joints             (F+1,)  joints of file f are rows file_joints[f]:file_joints[f+1]
+#   max_time, file_size, padding (F,) header fields; endianness (F,) '<' or '>'
+#   node_types, data_types, node_ids (J,) uint8; camera_roles, data_roles (J,) str ('' = none)
+#   exact                   (J,)    True when the joint's values are unrounded (decoded from the encoded keys)
+#   {X,Y,Z}_offsets         (J+1,)  keys of joint j on that axis are {axis}_*[offsets[j]:offsets[j+1]]
+#   {X,Y,Z}_frames          (K,)    uint16 frame IDs
+#   {X,Y,Z}_values, _ins, _outs (K,) float64 values and in/out tangents
+
+import numpy as np
+
+from .fcv_encoding_types import decode_raw_keyframes
+from .fcv_tracks import AXES
+
+NPZ_FORMAT_VERSION = 1
+
+_COMPONENTS = ("frames", "values", "ins", "outs")
+
+
+def track_columns(track, data_type, exact=True):
+    """
+    Frame IDs, values and tangents of one axis as typed arrays.
+    With exact=True they are decoded again from the encoded keys without the round(..., 4) of the
+    regular decoder (only possible while the track still has its raw keys).
+
+    Returns:
+        tuple: (frames, values, ins, outs, exact flag actually applied)
+    """
+    if exact and track.raw is not None:
+        values, ins, outs = decode_raw_keyframes(track.raw, data_type, exact=True)
+        return track.frames, values, ins, outs, True
+    return track.frames, track.values, track.ins, track.outs, False
+
+
+def file_columns(parser, exact=True):
+    """
+    Columns of one parsed file, in the archive layout but without the per-file arrays.
+    Workers return this (plain arrays, cheap to pickle); NPZArchive.add_columns stacks it.
+
+    Returns:
+        dict: {"header": {...}, "joints": {...}, "axes": {axis: {"counts", "frames", "values", "ins", "outs"}}}
+    """
+    node_count = parser.node_count
+    joints = {
+        "node_types": np.asarray(parser.node_types, dtype=np.uint8),
+        "data_types": np.asarray(parser.data_types, dtype=np.uint8),
+        "node_ids": np.asarray(parser.node_ids, dtype=np.uint8),
+        "camera_roles": np.asarray([parser.camera_roles.get(i) or "" for i in range(node_count)], dtype=str),
+        "data_roles": np.asarray([parser.data_type_roles[i] or "" for i in range(node_count)], dtype=str),
+        "exact": np.zeros(node_count, dtype=bool),
+    }
+    axes = {axis: {"counts": np.zeros(node_count, dtype=np.int64), **{c: [] for c in _COMPONENTS}} for axis in AXES}
+
+    for i, block in parser.iter_joints():
+        joint_exact = exact
+        for axis in AXES:
+            track = block.axis(axis)
+            if track is None:
+                continue
+            frames, values, ins, outs, applied = track_columns(track, parser.data_types[i], exact)
+            joint_exact = joint_exact and applied
+            # Truncated payloads decode fewer keys than frame IDs; keep the columns the same length.
+            count = min(len(frames), len(values))
+            columns = axes[axis]
+            columns["counts"][i] = count
+            for name, column in zip(_COMPONENTS, (frames, values, ins, outs)):
+                columns[name].append(np.array(column[:count]))
+        joints["exact"][i] = joint_exact
+
+    for columns in axes.values():
+        columns["frames"] = np.concatenate(columns["frames"] or [np.zeros(0)]).astype(np.uint16)
+        for name in _COMPONENTS[1:]:
+            columns[name] = np.concatenate(columns[name] or [np.zeros(0)]).astype(np.float64)
+
+    header = {
+        "max_time": parser.max_time,
+        "file_size": parser.file_size,
+        "padding": getattr(parser, "padding", 0),
+        "endianness": parser.endianness,
+    }
+    return {"header": header, "joints": joints, "axes": axes}
+
+
+class NPZArchive:
+    """
+    Collects the columns of one or more files and saves them as one .npz archive.
+    """
+
+    def __init__(self):
+        self.files = []
+        self._entries = []
+
+    def add(self, parser, name=None, exact=True):
+        self.add_columns(parser.filepath if name is None else name, file_columns(parser, exact))
+
+    def add_columns(self, name, columns):
+        self.files.append(name)
+        self._entries.append(columns)
+
+    def arrays(self):
+        """
+        Stacks everything added so far into the archive arrays (see the module header).
+        """
+        entries = self._entries
+        data = {
+            "format_version": np.asarray(NPZ_FORMAT_VERSION),
+            "files": np.asarray(self.files, dtype=str),
+            "file_joints": np.concatenate(
+                ([0], np.cumsum([len(e["joints"]["node_types"]) for e in entries], dtype=np.int64))
+            ).astype(np.int64),
+            "max_time": np.asarray([e["header"]["max_time"] for e in entries], dtype=np.uint16),
+            "file_size": np.asarray([e["header"]["file_size"] for e in entries], dtype=np.uint32),
+            "padding": np.asarray([e["header"]["padding"] for e in entries], dtype=np.uint8),
+            "endianness": np.asarray([e["header"]["endianness"] for e in entries], dtype=str),
+        }
+        for name, dtype in (("node_types", np.uint8), ("data_types", np.uint8), ("node_ids", np.uint8),
+                            ("camera_roles", str), ("data_roles", str), ("exact", bool)):
+            data[name] = np.concatenate([np.zeros(0, dtype)] + [e["joints"][name] for e in entries]).astype(dtype)
+
+        for axis in AXES:
+            counts = np.concatenate([np.zeros(0, np.int64)] + [e["axes"][axis]["counts"] for e in entries])
+            data[f"{axis}_offsets"] = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+            data[f"{axis}_frames"] = np.concatenate(
+                [np.zeros(0, np.uint16)] + [e["axes"][axis]["frames"] for e in entries]
+            )
+            for name in _COMPONENTS[1:]:
+                data[f"{axis}_{name}"] = np.concatenate(
+                    [np.zeros(0, np.float64)] + [e["axes"][axis][name] for e in entries]
+                )
+        return data
+
+    def save(self, path, compress=False):
+        # Returns the path written (numpy adds ".npz" when it is missing).
+        (np.savez_compressed if compress else np.savez)(path, **self.arrays())
+        return path if str(path).endswith(".npz") else f"{path}.npz"
+
+
+def export_npz(parser, path, exact=True, compress=False):
+    """
+    Writes one parsed file as a single-file archive and returns the path.
+    """
+    archive = NPZArchive()
+    archive.add(parser, exact=exact)
+    return archive.save(path, compress=compress)
+
+
+def npz_axis(archive, joint, axis, file=0):
+    """
+    Slices one joint axis out of a loaded archive (np.load result or the dict from NPZArchive.arrays).
+    np.load re-reads a member on every access, so for many lookups load it once: dict(np.load(path)).
+
+    Args:
+        joint (int): Joint index inside its file.
+        axis (str): 'X', 'Y' or 'Z'.
+        file (int or str): File index or name inside a stacked archive.
+
+    Returns:
+        dict: {"frames", "values", "ins", "outs"} arrays.
+    """
+    if isinstance(file, str):
+        file = int(np.flatnonzero(archive["files"] == file)[0])
+    row = int(archive["file_joints"][file]) + joint
+    if row >= int(archive["file_joints"][file + 1]):
+        raise IndexError(f"Joint {joint} out of range for file {file}")
+    offsets = archive[f"{axis}_offsets"]
+    start, stop = int(offsets[row]), int(offsets[row + 1])
+    return {name: archive[f"{axis}_{name}"][start:stop] for name in _COMPONENTS}
@@ -0,0 +1,314 @@
+# fcv_pack.py
+# Packed corpus: a whole folder of FCV files decoded once into a single file that is memory-mapped on load.
+# The arrays are those of the stacked .npz layout (see fcv_npz), stored raw, little-endian and 64-byte aligned
+# behind a fixed section directory, so opening a corpus costs the same for ten files or ten thousand and every
+# file's or joint's tracks come back as zero-copy views into the mapping.
+#
+# File layout:
+#   header                  PACK_MAGIC, u32 PACK_VERSION, u32 section count
+#   section directory       per section: 16-byte name, u64 offset, u64 byte size
+#   sections (F = files, J = joints over all files, K = keys of one axis over all joints):
+#     names                 UTF-8 file names, back to back; name_offsets (F+1) int64 slices them
+#     name_order            (F,)    uint32 file indices sorted by name (binary search in find())
+#     file_joints           (F+1,)  joints of file f are rows file_joints[f]:file_joints[f+1]
+#     max_time (F,) uint16, file_size (F,) uint32, padding (F,) uint8, big_endian (F,) uint8
+#     node_types, data_types, node_ids (J,) uint8; exact (J,) bool
+#     camera_roles, data_roles (J,) uint8 codes into the "strings" section (JSON list, 0 = none)
+#     {X,Y,Z}_offsets       (J+1,)  int64 key offsets; {X,Y,Z}_frames (K,) uint16; _values, _ins, _outs (K,) float64
+
+import json
+import mmap
+import struct
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .fcv_encoding_types import get_encoding_info
+from .fcv_npz import NPZArchive, file_columns
+from .fcv_parser import FCVParser, LazyKeyframeBlocks
+from .fcv_probe import probe_header
+from .fcv_tracks import AXES, AxisTrack, JointTrack
+
+PACK_MAGIC = b"FCVPACK\x00"
+PACK_VERSION = 1
+
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<16sQQ")
+_ALIGN = 64
+
+# Section name -> stored dtype (all little-endian); names/strings are raw bytes.
+_SECTIONS = {
+    "names": None,
+    "name_offsets": "<i8",
+    "name_order": "<u4",
+    "file_joints": "<i8",
+    "max_time": "<u2",
+    "file_size": "<u4",
+    "padding": "u1",
+    "big_endian": "u1",
+    "node_types": "u1",
+    "data_types": "u1",
+    "node_ids": "u1",
+    "exact": "?",
+    "camera_roles": "u1",
+    "data_roles": "u1",
+    "strings": None,
+}
+for _axis in AXES:
+    _SECTIONS[f"{_axis}_offsets"] = "<i8"
+    _SECTIONS[f"{_axis}_frames"] = "<u2"
+    for _name in ("values", "ins", "outs"):
+        _SECTIONS[f"{_axis}_{_name}"] = "<f8"
+
+
+def _pack_columns(path, endianness=None, exact=True):
+    # Worker: decodes one file into NPZ-layout columns. Returns (path, columns or None, error or None).
+    try:
+        with probe_header(path) as probe:
+            parser = FCVParser(
+                path, endianness=endianness or probe.endianness, log_level="none", buffer=probe.buffer
+            )
+            try:
+                parser.parse()
+            finally:
+                parser.close()
+        return path, file_columns(parser, exact), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def _role_codes(roles, strings):
+    # Replaces role names by their index in 'strings' (extended as needed; "" stays 0).
+    codes = np.zeros(len(roles), dtype=np.uint8)
+    for i, role in enumerate(roles.tolist()):
+        if role not in strings:
+            strings.append(role)
+        codes[i] = strings.index(role)
+    return codes
+
+
+def pack_corpus(paths, out_path, jobs=1, force_endian=None, exact=True, names=None):
+    """
+    Decodes every file once and writes them as one packed corpus. Files that fail to parse are left out.
+
+    Args:
+        paths (iterable): FCV file paths (e.g. from scan_fcv).
+        out_path (str): Packed corpus file to write.
+        jobs (int): Worker processes used to decode files.
+        force_endian (str or None): '<' or '>' instead of auto-detecting.
+        exact (bool): Store unrounded values (see fcv_npz.track_columns).
+        names (callable or None): Maps a path to the name it is stored under (default: the path itself).
+
+    Returns:
+        dict: {"files", "joints", "keys", "bytes", "failed": [(path, error message)]}
+    """
+    paths = list(paths)
+    archive = NPZArchive()
+    failed = []
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(
+                _pack_columns, paths, [force_endian] * len(paths), [exact] * len(paths), chunksize=8
+            ))
+    else:
+        results = [_pack_columns(path, force_endian, exact) for path in paths]
+    for path, columns, error in results:
+        if columns is None:
+            failed.append((path, error))
+        else:
+            archive.add_columns(names(path) if names else path, columns)
+
+    data = archive.arrays()
+    encoded = [name.encode("utf-8") for name in data["files"].tolist()]
+    strings = [""]
+    sections = {
+        "names": b"".join(encoded),
+        "name_offsets": np.concatenate(([0], np.cumsum([len(n) for n in encoded], dtype=np.int64))),
+        "name_order": np.asarray(sorted(range(len(encoded)), key=encoded.__getitem__), dtype=np.uint32),
+        "big_endian": (data["endianness"] == ">").astype(np.uint8),
+        "camera_roles": _role_codes(data["camera_roles"], strings),
+        "data_roles": _role_codes(data["data_roles"], strings),
+    }
+    for name in _SECTIONS:
+        if name not in sections and name != "strings":
+            sections[name] = data[name]
+    sections["strings"] = json.dumps(strings).encode("utf-8")
+
+    # Directory first, then every section at an aligned offset
+    offset = _HEADER.size + _SECTION.size * len(_SECTIONS)
+    directory = []
+    blobs = []
+    for name, dtype in _SECTIONS.items():
+        blob = sections[name] if dtype is None else np.ascontiguousarray(sections[name], dtype=dtype).tobytes()
+        offset = (offset + _ALIGN - 1) & ~(_ALIGN - 1)
+        directory.append(_SECTION.pack(name.encode("ascii"), offset, len(blob)))
+        blobs.append((offset, blob))
+        offset += len(blob)
+
+    with open(out_path, "wb") as f:
+        f.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(_SECTIONS)))
+        f.write(b"".join(directory))
+        for start, blob in blobs:
+            f.write(b"\x00" * (start - f.tell()))
+            f.write(blob)
+        size = f.tell()
+
+    return {
+        "files": len(encoded),
+        "joints": len(data["node_types"]),
+        "keys": sum(len(data[f"{axis}_frames"]) for axis in AXES),
+        "bytes": size,
+        "failed": failed,
+    }
+
+
+class PackedFile:
+    """
+    One file of a packed corpus with the parser fields models are read through (node_count, node_types,
+    data_types, node_ids, camera_roles, data_type_roles, keyframe_blocks, iter_joints, ...), so it works with
+    CurveEvaluator, file_columns and the other model consumers. Joints are built on first access.
+    """
+
+    def __init__(self, corpus, index):
+        self.corpus = corpus
+        self.index = index
+        self.filepath = corpus.name(index)
+        header = corpus.header(index)
+        self.endianness = header["endianness"]
+        self.max_time = header["max_time"]
+        self.file_size = header["file_size"]
+        self.padding = header["padding"]
+        self.node_count = header["node_count"]
+        rows = corpus.joint_rows(index)
+        s = corpus.sections
+        self.node_types = s["node_types"][rows].tolist()
+        self.data_types = s["data_types"][rows].tolist()
+        self.node_ids = s["node_ids"][rows].tolist()
+        self.camera_roles = {
+            i: corpus.strings[code] for i, code in enumerate(s["camera_roles"][rows].tolist()) if code
+        }
+        self.data_type_roles = [corpus.strings[code] or None for code in s["data_roles"][rows].tolist()]
+        self.keyframe_blocks = LazyKeyframeBlocks(self)
+
+    def decode_joint(self, index, axes=AXES):
+        return self.corpus.joint(self.index, index, axes)
+
+    def iter_joints(self, axes=AXES):
+        for i in range(self.node_count):
+            yield i, self.keyframe_blocks[i]
+
+
+class PackedCorpus:
+    """
+    Read-only view of a packed corpus (see pack_corpus). Opening maps the file and reads the fixed section
+    directory only; file names, joint tables and tracks are read from the mapping on access.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count = _HEADER.unpack_from(self._mmap, 0)
+            if magic != PACK_MAGIC:
+                raise ValueError(f"{path} is not a packed FCV corpus")
+            if version != PACK_VERSION:
+                raise ValueError(f"{path}: unsupported pack version {version} (expected {PACK_VERSION})")
+            self.sections = {}
+            for i in range(count):
+                raw_name, offset, size = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+                name = raw_name.rstrip(b"\x00").decode("ascii")
+                dtype = _SECTIONS.get(name, None)
+                view = memoryview(self._mmap)[offset:offset + size]
+                self.sections[name] = view if dtype is None else np.frombuffer(view, dtype=dtype)
+            self.strings = json.loads(bytes(self.sections["strings"]))
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Releases the mapping. Arrays still referencing it keep it alive until they are dropped.
+    def close(self):
+        self.sections = {}
+        mapped, self._mmap = self._mmap, None
+        if mapped is not None:
+            try:
+                mapped.close()
+            except BufferError:
+                pass
+
+    def __len__(self):
+        return len(self.sections["max_time"])
+
+    def name(self, index):
+        offsets = self.sections["name_offsets"]
+        return bytes(self.sections["names"][int(offsets[index]):int(offsets[index + 1])]).decode("utf-8")
+
+    def names(self):
+        return (self.name(i) for i in range(len(self)))
+
+    def find(self, name):
+        """
+        Index of the file stored under 'name' (binary search; raises KeyError when it is not in the corpus).
+        """
+        order = self.sections["name_order"]
+        at = bisect_left(order, name, key=lambda i: self.name(int(i)))
+        if at < len(order) and self.name(int(order[at])) == name:
+            return int(order[at])
+        raise KeyError(name)
+
+    def _file_index(self, file):
+        return self.find(file) if isinstance(file, str) else int(file)
+
+    # Slice of the joint rows of one file.
+    def joint_rows(self, file):
+        index = self._file_index(file)
+        file_joints = self.sections["file_joints"]
+        return slice(int(file_joints[index]), int(file_joints[index + 1]))
+
+    def header(self, file):
+        index = self._file_index(file)
+        rows = self.joint_rows(index)
+        s = self.sections
+        return {
+            "max_time": int(s["max_time"][index]),
+            "node_count": rows.stop - rows.start,
+            "file_size": int(s["file_size"][index]),
+            "padding": int(s["padding"][index]),
+            "endianness": ">" if s["big_endian"][index] else "<",
+        }
+
+    def axis(self, file, joint, axis):
+        """
+        One joint axis as an AxisTrack whose arrays are read-only views into the mapping (no copy, no decode).
+        """
+        rows = self.joint_rows(file)
+        row = rows.start + joint
+        if not rows.start <= row < rows.stop:
+            raise IndexError(f"Joint {joint} out of range for file {file}")
+        s = self.sections
+        offsets = s[f"{axis}_offsets"]
+        start, stop = int(offsets[row]), int(offsets[row + 1])
+        encoding = get_encoding_info(int(s["data_types"][row]))
+        int_values = bool(encoding) and encoding["value_bytes"] == 1 and not s["exact"][row]
+        return AxisTrack(
+            s[f"{axis}_frames"][start:stop], s[f"{axis}_values"][start:stop],
+            s[f"{axis}_ins"][start:stop], s[f"{axis}_outs"][start:stop], int_values
+        )
+
+    def joint(self, file, joint, axes=AXES):
+        index = self._file_index(file)
+        data_type = int(self.sections["data_types"][self.joint_rows(index).start + joint])
+        return JointTrack(get_encoding_info(data_type), {axis: self.axis(index, joint, axis) for axis in axes})
+
+    def file(self, file):
+        """
+        One file as a PackedFile model (joints built on access).
+        """
+        return PackedFile(self, self._file_index(file))
@@ -1,19 +1,95 @@
 import os
+import mmap
 import struct
-from .fcv_encoding_types import get_encoding_info, decode_axis_keyframes
+import tempfile
+
+import numpy as np
+
+from .fcv_encoding_types import get_encoding_info, read_raw_keyframes, decode_raw_keyframes
 from .fcv_camera_roles import is_camera_node, get_camera_role
 from .fcv_node_types import get_node_type_flags
 from .fcv_data_roles import get_data_role
+from .fcv_tracks import AXES, AxisTrack, JointTrack, measure_memory, window_bounds
+from .fcv_log import FCVLog, LOG_ERROR, LOG_INFO, LOG_DEBUG
+from .fcv_profile import NULL_PROFILER
+
+
+# Sequence stand-in for keyframe_blocks in lazy mode: decodes a joint on first access and keeps it.
+class LazyKeyframeBlocks:
+    def __init__(self, parser):
+        self._parser = parser
+        self._blocks = [None] * parser.node_count
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._blocks)))]
+        if self._blocks[index] is None:
+            self._blocks[index] = self._parser.decode_joint(index % len(self._blocks))
+        return self._blocks[index]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self._blocks)))
+
+    # Indices of the joints decoded so far.
+    def decoded(self):
+        return [i for i, block in enumerate(self._blocks) if block is not None]
+
 
 class FCVParser:
     # Initializes the parser with file path, logging, and data structures.
-    def __init__(self, filepath, log_path="fcv_debug.log", verbose=False, endianness="<"):
-        self.filepath = filepath
-        base_name = os.path.basename(filepath)
-        self.log_path = f"{base_name}.log"  
+    # 'filepath' may also be the file's contents (bytes, bytearray, memoryview) or an open binary file-like
+    # object (read from its current position, e.g. an archive member); 'name' then labels it in logs/caches.
+    # lazy=True only reads the header and pointer table in parse(); joints are decoded on access.
+    # keep_raw=True keeps each axis' encoded keys next to the decoded ones (needed to write the file back).
+    # cache: optional ParseCache; eager parses load from it when valid and store into it otherwise.
+    # log_path defaults to "<file name>.log" in the working directory; log_stream sends the log to an open
+    # stream instead (e.g. one shared batch log); log_level is "none", "error", "info" or "debug".
+    # buffer: the file's bytes already in memory (e.g. HeaderProbe.buffer), so the file is not opened again.
+    # profiler: optional FCVProfiler collecting stage timings and read counters (see 'profile').
+    # block_store: optional BlockStore shared across parsers; identical axis blocks are decoded once and the
+    # same (read-only) AxisTrack is reused. block_refs lists (key, bytes, keys) of every axis decoded with it.
+    # transform: optional TrackTransform applied to each axis as it is decoded (units, axis swaps, scale,
+    # rounding); transformed axes drop their raw keys, since those no longer match.
+    # frame_window: optional (start, end) frame range; each axis then decodes only the keys covering it
+    # (found by binary search on the frame IDs, plus one boundary key on each side), so the work follows
+    # the window size rather than the clip length.
+    def __init__(self, filepath, log_path=None, verbose=False, endianness="<", lazy=False, keep_raw=True,
+                 cache=None, log_level="debug", log_stream=None, buffer=None, profiler=None, name=None,
+                 block_store=None, transform=None, frame_window=None):
+        self._in_memory = not isinstance(filepath, (str, os.PathLike))
+        if self._in_memory:
+            if hasattr(filepath, "read"):
+                name = name or os.path.basename(str(getattr(filepath, "name", "") or "")) or "stream.fcv"
+                buffer = filepath.read()
+            else:
+                buffer = filepath
+            filepath = name or "memory.fcv"
+        self.filepath = os.fspath(filepath)
+        base_name = os.path.basename(self.filepath)
+        self.log_path = log_path or f"{base_name}.log"
         self.verbose = verbose
         self.endianness = endianness
-        self.log = open(self.log_path, "w", encoding="utf-8")
+        self.lazy = lazy
+        self.keep_raw = keep_raw
+        self.cache = cache
+        self._source_buffer = buffer
+        self.profiler = profiler or NULL_PROFILER
+        self.block_store = block_store
+        self.block_refs = []
+        self.transform = transform if transform is not None and not transform.identity else None
+        self.frame_window = tuple(frame_window) if frame_window is not None else None
+        self._u8 = struct.Struct(endianness + "B")
+        self._u16 = struct.Struct(endianness + "H")
+        self._u32 = struct.Struct(endianness + "I")
+        self.log = FCVLog(
+            path=None if log_stream is not None else self.log_path,
+            stream=log_stream,
+            level=log_level,
+            echo=verbose
+        )
         self.max_time = None
         self.node_count = None
         self.node_types = []
@@ -25,162 +101,445 @@ class FCVParser:
         self.camera_roles = {}
         self.node_type_flags = []
         self.data_type_roles = []
+        self._axis_cache = {}
+        self._axis_offset_cache = {}
+        self._dump_pending = False
+
+    # Writes a message to the log (and console if verbose) when 'level' is enabled.
+    # 'msg' may be a callable, so it is only formatted when it will actually be written.
+    def log_print(self, msg, level=LOG_INFO):
+        self.log.write(level, msg)
 
-    # Writes a message to the log file (and console if verbose).
-    def log_print(self, msg):
-        self.log.write(msg + "\n")  
-        if self.verbose:
-            print(msg)
-        self.log.flush()
+    # Stage timings and counters collected so far ({"stages": {...}, "counters": {...}}; empty without a profiler).
+    @property
+    def profile(self):
+        return self.profiler.as_dict()
 
 
     # Main parsing routine: reads header, node data, pointer table, keyframes.
+    # In lazy mode only the header and pointer table are read here; joints are decoded on first access.
     def parse(self):
-        f = open(self.filepath, "rb")  # Open the binary FCV file for reading.
+        profiler = self.profiler
+        if self.cache is not None and not self.lazy:
+            with profiler.stage("cache_load"):
+                if self._load_from_cache():
+                    return
+
+        self._buffer = self._map_file()  # Map the binary FCV file for reading.
+        self._offset = 0
+        self._file_offset = 0
+        failed = False
         try:
-            # Read the maximum time value in the animation (16-bit unsigned).
-            self.max_time = self.read_u16(f)
-
-            # Read the number of nodes/joints in this file (8-bit unsigned).
-            self.node_count = self.read_u8(f)
-
-            self.node_types = []
-            self.data_types = []
-
-            # Read node type and data type for each joint/node.
-            for _ in range(self.node_count):
-                b1 = self.read_u8(f)
-                b2 = self.read_u8(f)
-
-                # Handle endianness for node_type and data_type ordering.
-                if self.endianness == "<":
-                    node_type, data_type = b1, b2
-                else:
-                    data_type, node_type = b1, b2
-
-                # Store node type and data type for each node.
-                self.node_types.append(node_type)
-                self.data_types.append(data_type)
-
-                # Determine the node type flags and data type roles (e.g. position, rotation).
-                self.node_type_flags.append(get_node_type_flags(node_type))
-                self.data_type_roles.append(get_data_role(data_type))
-
-            # Read all node IDs for each joint.
-            self.node_ids = [self.read_u8(f) for _ in range(self.node_count)]
-
-            # Align the file position to 4 bytes (skip padding bytes if needed).
-            current_offset = f.tell()
-            aligned_offset = self.align4(current_offset)
-            padding = aligned_offset - current_offset
-            if padding > 0:
-                f.read(padding)  # Skip any padding bytes.
-            self.padding = padding  # Save padding info for summary.
-
-            # Read the total file size. While the game doesn't validate this, I included it just for consistency.
-            self.file_size = self.read_u32(f)
+            with profiler.stage("header"):
+                self._parse_header()
 
             # Read the pointer table
-            self.pointer_table = [self.read_u32(f) for _ in range(self.node_count)]
-
-            # Parse each keyframe block by seeking to the pointer and decoding the data.
-            for i, ptr in enumerate(self.pointer_table):
-                f.seek(ptr)  # Seek to the keyframe block position.
-                axis_data = {}
-                encoding_info = get_encoding_info(self.data_types[i])  # Get encoding details.
-
-                for axis in ['X', 'Y', 'Z']:
-                    # Read the number of frames for this axis.
-                    frame_count = self.read_u16(f)
-
-                    # Read each frame ID (time steps).
-                    frame_ids = [self.read_u16(f) for _ in range(frame_count)]
-
-                    if encoding_info:
-                        # Calculate how many bytes to read per keyframe (value + tangents).
-                        per_kf_bytes = (
-                            encoding_info["value_bytes"] +
-                            encoding_info["tangent_in_bytes"] +
-                            encoding_info["tangent_out_bytes"]
-                        )
-                        # Read all keyframe data for this axis at once.
-                        data = f.read(per_kf_bytes * frame_count)
-                    else:
-                        data = b""  # If no encoding info, no data to read.
-
-                    # Decode the raw data into keyframe values and tangents.
-                    decoded = decode_axis_keyframes(
-                        data,
-                        self.data_types[i],
-                        frame_ids,
-                        endianness=self.endianness
-                    )
+            with profiler.stage("pointer_table"):
+                self.pointer_table = list(self.read_struct(struct.Struct(f"{self.endianness}{self.node_count}I")))
 
-                    # Store frames and decoded values for this axis.
-                    axis_data[axis] = {
-                        "frames": frame_ids,
-                        "values": decoded
-                    }
-
-                # Save the keyframe block for this joint.
-                self.keyframe_blocks.append({
-                    "count": max(len(axis_data[a]["frames"]) for a in axis_data),
-                    "encoding": encoding_info,
-                    "axis_data": axis_data
-                })
+            if self.lazy:
+                # Keyframe blocks are decoded (and memoized) the first time each joint is accessed.
+                self.keyframe_blocks = LazyKeyframeBlocks(self)
+            else:
+                # Parse each keyframe block by jumping to the pointer and decoding the data.
+                for i in range(self.node_count):
+                    self.keyframe_blocks.append(self.decode_joint(i))
 
             # Determine camera roles based on data types and node IDs.
-            for i in range(self.node_count):
-                if is_camera_node(self.data_types[i]):
-                    # Check if node ID is within valid camera roles.
-                    if self.node_ids[i] in [0x00, 0x01, 0x02, 0x03, 0x04, 0x05]:
-                        self.camera_roles[i] = get_camera_role(self.node_ids[i])
-                    else:
-                        # Log an error if the camera role is invalid.
-                        error_msg = (
-                            f"[ERROR] Invalid camera joint: "
-                            f"Node ID {self.node_ids[i]} with Data Type 0x{self.data_types[i]:02X}"
-                        )
-                        self.log_print(error_msg)
-                        raise ValueError(error_msg)
+            with profiler.stage("camera_roles"):
+                self._resolve_camera_roles()
 
             # Print a summary of the parsed data to the log.
-            self.dump_summary()
+            with profiler.stage("summary_log"):
+                self.dump_summary(include_keyframes=not self.lazy)
+
+            if self.cache is not None and not self.lazy:
+                with profiler.stage("cache_store"):
+                    self.cache.store(
+                        self.filepath, self.endianness, self.get_state(), data=self._cache_data(),
+                        variant=self._cache_variant()
+                    )
 
         except Exception as e:
             # If an error occurs during parsing, log the offset and dump the summary.
-            current_offset = f.tell()
-            hex_offset = f"0x{current_offset:04X}"
-            self.dump_summary()
-            self.log_print(f"[PARSER ERROR] {str(e)} ({hex_offset})")
+            failed = True
+            hex_offset = f"0x{self._file_offset:04X}"
+            self.dump_summary(include_keyframes=not self.lazy)
+            self.log_print(f"[PARSER ERROR] {str(e)} ({hex_offset})", LOG_ERROR)
             raise
         finally:
-            # Always close the file and log, even if an exception is raised.
-            f.close()
+            # Release the mapping (lazy mode keeps it for later decoding) and always close the log.
+            if failed or not self.lazy:
+                self.close()
             self.log.close()
 
-    # Reads 1 byte from the file and unpacks as unsigned 8-bit integer.
-    def read_u8(self, f):
-        return struct.unpack(self.endianness + "B", f.read(1))[0]
-
-    # Reads 2 bytes from the file and unpacks as unsigned 16-bit integer.
-    def read_u16(self, f):
-        self._file_offset = f.tell()
-        return struct.unpack(self.endianness + "H", f.read(2))[0]
+    # Loads a cached parse of this file. Returns False on a miss (or if it lacks the raw keys or the
+    # block references we need).
+    def _load_from_cache(self):
+        state = self.cache.load(self.filepath, self.endianness, data=self._cache_data(), variant=self._cache_variant())
+        if state is None:
+            return False
+        if (self.keep_raw and not state["has_raw"]) or (self.block_store is not None and state["block_refs"] is None):
+            self.cache.reject()
+            return False
+        self.load_state(state)
+        try:
+            self.dump_summary()
+        finally:
+            self.log.close()
+        return True
+
+    # Contents the parse cache hashes for in-memory input (files on disk are hashed by path).
+    def _cache_data(self):
+        return self._source_buffer if self._in_memory else None
+
+    # Transformed and windowed parses are cached apart from plain ones (and from each other).
+    def _cache_variant(self):
+        parts = []
+        if self.transform is not None:
+            parts.append(self.transform.key)
+        if self.frame_window is not None:
+            parts.append("window:%d-%d" % self.frame_window)
+        return "|".join(parts) or None
+
+    # Plain-data snapshot of everything parse() produces (used by the parse cache).
+    def get_state(self):
+        return {
+            "max_time": self.max_time,
+            "node_count": self.node_count,
+            "node_types": self.node_types,
+            "data_types": self.data_types,
+            "node_ids": self.node_ids,
+            "padding": getattr(self, "padding", 0),
+            "file_size": self.file_size,
+            "real_file_size": self.get_real_file_size(),
+            "pointer_table": self.pointer_table,
+            "camera_roles": self.camera_roles,
+            "has_raw": self.keep_raw,
+            # Block references for -dedup reports (None when the parse did not use a block store)
+            "block_refs": list(self.block_refs) if self.block_store is not None else None,
+            "blocks": [
+                {
+                    axis: (t.frames, t.values, t.ins, t.outs, t.int_values, t.raw)
+                    for axis, t in block.axes.items()
+                }
+                for block in self.keyframe_blocks
+            ]
+        }
 
-    # Reads 4 bytes from the file and unpacks as unsigned 32-bit integer.
-    def read_u32(self, f):
-        return struct.unpack(self.endianness + "I", f.read(4))[0]
+    # Restores a snapshot from get_state().
+    def load_state(self, state):
+        for name in ("max_time", "node_count", "node_types", "data_types", "node_ids", "padding",
+                     "file_size", "pointer_table", "camera_roles"):
+            setattr(self, name, state[name])
+        self._real_file_size = state["real_file_size"]
+        self.block_refs = list(state["block_refs"] or [])
+        self.node_type_flags = [get_node_type_flags(nt) for nt in self.node_types]
+        self.data_type_roles = [get_data_role(dt) for dt in self.data_types]
+        self.keyframe_blocks = [
+            JointTrack(
+                get_encoding_info(data_type),
+                {
+                    axis: AxisTrack(frames, values, ins, outs, int_values, raw if self.keep_raw else None)
+                    for axis, (frames, values, ins, outs, int_values, raw) in axes.items()
+                }
+            )
+            for data_type, axes in zip(self.data_types, state["blocks"])
+        ]
+
+    # Reads the header: max time, node table, node IDs, padding and file size.
+    def _parse_header(self):
+        # Read the maximum time value in the animation (16-bit unsigned).
+        self.max_time = self.read_u16()
+
+        # Read the number of nodes/joints in this file (8-bit unsigned).
+        self.node_count = self.read_u8()
+
+        # Read node type and data type for each joint/node (packed byte pairs).
+        pairs = self.read_bytes(self.node_count * 2)
+
+        # Handle endianness for node_type and data_type ordering.
+        if self.endianness == "<":
+            self.node_types, self.data_types = list(pairs[0::2]), list(pairs[1::2])
+        else:
+            self.data_types, self.node_types = list(pairs[0::2]), list(pairs[1::2])
+
+        # Determine the node type flags and data type roles (e.g. position, rotation).
+        self.node_type_flags = [get_node_type_flags(nt) for nt in self.node_types]
+        self.data_type_roles = [get_data_role(dt) for dt in self.data_types]
+
+        # Read all node IDs for each joint.
+        self.node_ids = list(self.read_bytes(self.node_count))
+
+        # Align the file position to 4 bytes (skip padding bytes if needed).
+        current_offset = self._offset
+        aligned_offset = self.align4(current_offset)
+        padding = aligned_offset - current_offset
+        if padding > 0:
+            self.skip(padding)  # Skip any padding bytes.
+        self.padding = padding  # Save padding info for summary.
+
+        # Read the total file size. While the game doesn't validate this, I included it just for consistency.
+        self.file_size = self.read_u32()
+
+    # Checks camera joints and records their role; raises on an invalid camera joint ID.
+    def _resolve_camera_roles(self):
+        for i in range(self.node_count):
+            if is_camera_node(self.data_types[i]):
+                # Check if node ID is within valid camera roles.
+                if self.node_ids[i] in [0x00, 0x01, 0x02, 0x03, 0x04, 0x05]:
+                    self.camera_roles[i] = get_camera_role(self.node_ids[i])
+                else:
+                    # Log an error if the camera role is invalid.
+                    error_msg = (
+                        f"[ERROR] Invalid camera joint: "
+                        f"Node ID {self.node_ids[i]} with Data Type 0x{self.data_types[i]:02X}"
+                    )
+                    self.log_print(error_msg, LOG_ERROR)
+                    raise ValueError(error_msg)
+
+    # Decodes the keyframe block of one joint. 'axes' limits which axes are decoded (others are skipped).
+    def decode_joint(self, index, axes=AXES):
+        with self.profiler.stage("joint_decode"):
+            encoding_info = get_encoding_info(self.data_types[index])  # Get encoding details.
+            return JointTrack(encoding_info, {axis: self.decode_axis(index, axis) for axis in AXES if axis in axes})
+
+    # Decodes a chosen subset of joints (all by default) and returns {joint index: block}.
+    def decode_joints(self, joints=None, axes=AXES):
+        if joints is None:
+            joints = range(self.node_count)
+        return {i: self.decode_joint(i, axes) for i in joints}
+
+    # Yields (index, block) for every joint. Blocks already decoded are reused; in lazy mode the others
+    # are decoded one at a time and not memoized, so only one joint is held in memory (used by streaming export).
+    # A lazy parse logging at debug level writes its keyframe dump during the first pass: frame IDs go to the
+    # log as each joint is yielded and the values section is spilled to a temp file and appended at the end,
+    # so the log matches an eager parse's without holding every joint.
+    def iter_joints(self, axes=AXES):
+        decoded = (
+            set(self.keyframe_blocks.decoded()) if isinstance(self.keyframe_blocks, LazyKeyframeBlocks)
+            else set(range(len(self.keyframe_blocks)))
+        )
+        spill = tempfile.TemporaryFile("w+", encoding="utf-8") if self._dump_pending else None
+        self._dump_pending = False
+        try:
+            for i in range(self.node_count):
+                if i in decoded:
+                    block = self.keyframe_blocks[i]
+                else:
+                    block = self.decode_joint(i, axes)
+                    for axis in AXES:
+                        self._axis_cache.pop((i, axis), None)
+                if spill is not None:
+                    self.log_print(self._dump_frames(i, block), LOG_DEBUG)
+                    spill.write(self._dump_values(i, block) + "\n")
+                yield i, block
+
+            if spill is not None:
+                self.log_print(f"\n--- Keyframe/Tangent Values ---", LOG_DEBUG)
+                spill.seek(0)
+                for lines in iter(lambda: spill.readlines(1 << 16), []):
+                    self.log_print("".join(lines)[:-1], LOG_DEBUG)
+        finally:
+            if spill is not None:
+                spill.close()
+                self.log.close()
+
+    # Decodes one axis of one joint. Lazy parsers memoize the result.
+    def decode_axis(self, index, axis):
+        key = (index, axis)
+        if key in self._axis_cache:
+            return self._axis_cache[key]
+
+        # With a transform the axis may come from another source axis, scaled by 'factor'.
+        source, factor = axis, 1.0
+        if self.transform is not None:
+            source, factor = self.transform.axis_plan(self.node_types[index], axis)
+        transformed = self.transform is not None and self.transform.changes(factor)
+
+        # Jump to the axis inside the joint's keyframe block.
+        self._offset = self._axis_offsets(index)[AXES.index(source)]
+        self.profiler.count("seeks")
+        encoding_info = get_encoding_info(self.data_types[index])
+
+        # Read the number of frames for this axis.
+        frame_count = self.read_u16()
+
+        # A block already decoded by a parser sharing the block store is reused as is.
+        # (Windowed parses skip the store: hashing the whole block would cost what the window saves.)
+        store_key = None
+        if self.block_store is not None and self.frame_window is None:
+            block_size = frame_count * (2 + (self._per_kf_bytes(encoding_info) if encoding_info else 0))
+            if self._offset + block_size <= len(self._buffer):  # Truncated blocks are decoded (and fail) normally
+                block = self._buffer[self._offset:self._offset + block_size]
+                store_key, shared = self.block_store.lookup(
+                    self.data_types[index], self.endianness, block, need_raw=self.keep_raw and not transformed,
+                    variant=f"{factor!r}/{self.transform.precision}" if transformed else ""
+                )
+                self.block_refs.append((store_key, block_size, frame_count))
+                if shared is not None:
+                    self.profiler.count("dedup_hits")
+                    self._offset += block_size
+                    if self.lazy:
+                        self._axis_cache[key] = shared
+                    return shared
+
+        # Read each frame ID (time steps) straight out of the mapped buffer.
+        # Eager parses copy them out, since the mapping is released once parse() returns.
+        frame_ids = self.read_u16_array(frame_count)
+        first = 0
+        if self.frame_window is not None:
+            # Only the keys covering the window: keys are fixed-size, so their bytes are found by offset.
+            first, stop = window_bounds(frame_ids, *self.frame_window)
+            frame_ids = frame_ids[first:stop]
+            frame_count = stop - first
+        if not self.lazy:
+            frame_ids = frame_ids.astype(np.uint16)
+
+        if encoding_info:
+            # Slice all keyframe data for this axis (or window) at once (no copy).
+            per_kf_bytes = self._per_kf_bytes(encoding_info)
+            self._offset += per_kf_bytes * first
+            data = self.read_view(per_kf_bytes * frame_count)
+        else:
+            data = b""  # If no encoding info, no data to read.
+
+        # Decode the raw data into keyframe values and tangents (whole axis at once).
+        raw = read_raw_keyframes(data, self.data_types[index], frame_count, endianness=self.endianness)
+        values, ins, outs = decode_raw_keyframes(raw, self.data_types[index])
+        self.profiler.count(f"keyframes_0x{self.data_types[index] & 0xF0:02X}", frame_count)
+        if transformed:
+            values, ins, outs = self.transform.apply(factor, values, ins, outs)
+
+        if not self.keep_raw or transformed:
+            raw = None
+        elif not self.lazy:
+            raw = raw.copy()  # The mapping is released after an eager parse
+
+        # Store frames and decoded values for this axis as compact arrays.
+        int_values = bool(encoding_info) and encoding_info["value_bytes"] == 1 and not transformed
+        result = AxisTrack(frame_ids, values, ins, outs, int_values, raw)
+        if store_key is not None:
+            result = self.block_store.add(store_key, result)
+        if self.lazy:
+            self._axis_cache[key] = result
+        return result
+
+    # Returns the start offsets of the X, Y and Z sub-blocks of a joint, reading only the key counts.
+    def _axis_offsets(self, index):
+        offsets = self._axis_offset_cache.get(index)
+        if offsets is None:
+            encoding_info = get_encoding_info(self.data_types[index])
+            per_kf_bytes = self._per_kf_bytes(encoding_info) if encoding_info else 0
+            offsets = []
+            self._offset = self.pointer_table[index]
+            self.profiler.count("seeks")
+            for _ in AXES:
+                offsets.append(self._offset)
+                frame_count = self.read_u16()
+                self.skip(frame_count * (2 + per_kf_bytes))
+            self._axis_offset_cache[index] = offsets
+        return offsets
+
+    # Calculates how many bytes each keyframe uses (value + tangents).
+    def _per_kf_bytes(self, encoding_info):
+        return (
+            encoding_info["value_bytes"] +
+            encoding_info["tangent_in_bytes"] +
+            encoding_info["tangent_out_bytes"]
+        )
+
+    # Context manager support, mainly for lazy parsers that keep the file mapped.
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Memory-maps the FCV file read-only and returns a memoryview over it
+    # (or just wraps the buffer given to the constructor).
+    def _map_file(self):
+        if self._source_buffer is not None:
+            buf = memoryview(self._source_buffer).cast("B")
+            self._real_file_size = buf.nbytes
+            return buf
+        with open(self.filepath, "rb") as f:
+            self._real_file_size = os.fstat(f.fileno()).st_size
+            if self._real_file_size == 0:
+                return memoryview(b"")  # mmap refuses empty files
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    # Releases the mapped file. Views still referencing it keep the mapping alive until they are dropped.
+    def close(self):
+        buf, self._buffer = getattr(self, "_buffer", None), None
+        if buf is not None:
+            buf.release()
+        mapped, self._mmap = getattr(self, "_mmap", None), None
+        if mapped is not None:
+            try:
+                mapped.close()
+            except BufferError:
+                pass
+
+    # Returns 'size' bytes at the cursor as a zero-copy slice and advances the cursor.
+    # Raises struct.error (like a short f.read + unpack did) if the buffer ends first.
+    def read_view(self, size, exact=False):
+        self._file_offset = self._offset
+        end = self._offset + size
+        if exact and end > len(self._buffer):
+            raise struct.error(f"unpack requires a buffer of {size} bytes")
+        view = self._buffer[self._offset:end]
+        self._offset = min(end, len(self._buffer))
+        self.profiler.count("bytes_read", len(view))
+        return view
+
+    # Returns exactly 'size' bytes at the cursor as a zero-copy slice.
+    def read_bytes(self, size):
+        return self.read_view(size, exact=True)
+
+    # Skips 'size' bytes (clamped to the end of the buffer, like f.read would).
+    def skip(self, size):
+        self.read_view(size)
+
+    # Unpacks a precompiled struct at the cursor and advances past it.
+    def read_struct(self, fmt):
+        self._file_offset = self._offset
+        if self._offset + fmt.size > len(self._buffer):
+            raise struct.error(f"unpack requires a buffer of {fmt.size} bytes")
+        values = fmt.unpack_from(self._buffer, self._offset)
+        self._offset += fmt.size
+        self.profiler.count("bytes_read", fmt.size)
+        return values
+
+    # Reads 1 byte and unpacks as unsigned 8-bit integer.
+    def read_u8(self):
+        return self.read_struct(self._u8)[0]
+
+    # Reads 2 bytes and unpacks as unsigned 16-bit integer.
+    def read_u16(self):
+        return self.read_struct(self._u16)[0]
+
+    # Reads 4 bytes and unpacks as unsigned 32-bit integer.
+    def read_u32(self):
+        return self.read_struct(self._u32)[0]
+
+    # Returns 'count' unsigned 16-bit integers as a numpy view over the buffer.
+    def read_u16_array(self, count):
+        data = self.read_bytes(count * 2)
+        return np.frombuffer(data, dtype=self.endianness + "u2", count=count)
 
     # Aligns a given offset to the next multiple of 4 bytes.
     def align4(self, offset):
         return (offset + 3) & ~0x03
 
-    # Returns the actual size of the file on disk.
+    # Returns the actual size of the file (never reopens it).
     def get_real_file_size(self):
-        with open(self.filepath, "rb") as f:
-            f.seek(0, 2)
-            return f.tell()
+        if getattr(self, "_real_file_size", None) is not None:
+            return self._real_file_size  # Already known from mapping the file
+        if self._source_buffer is not None:
+            return memoryview(self._source_buffer).nbytes
+        return os.path.getsize(self.filepath)
 
     # Returns a summary dictionary of the parsed file data.
     def get_summary(self):
@@ -193,58 +552,111 @@ class FCVParser:
         }
 
     # Logs a human-readable summary of the parsed data.
-    def dump_summary(self):
-        self.log_print(f"\n=== FCV HEADER ===")
-        self.log_print(f"Max Time      : {self.max_time}")
-        self.log_print(f"Node Count    : {self.node_count}")
-        self.log_print(f"File Size     : {self.file_size} bytes")
+    # The header/joint/pointer tables are logged at "info", the keyframe dump only at "debug";
+    # nothing is formatted for a level that is disabled.
+    # include_keyframes=False stops after the pointer table (used by lazy parses, which have not decoded anything).
+    def dump_summary(self, include_keyframes=True):
+        if not self.log.enabled(LOG_INFO):
+            return
+
+        lines = [
+            f"\n=== FCV HEADER ===",
+            f"Max Time      : {self.max_time}",
+            f"Node Count    : {self.node_count}",
+            f"File Size     : {self.file_size} bytes",
+        ]
         if hasattr(self, "padding") and self.padding > 0:
-            self.log_print(f"Padding       : {self.padding} byte(s)")
+            lines.append(f"Padding       : {self.padding} byte(s)")
 
-        self.log_print(f"\n--- Joint Table ---")
+        lines.append(f"\n--- Joint Table ---")
         for i in range(len(self.node_types)):
             line = f"  [{i:02}] Type: 0x{self.node_types[i]:02X} | Data: 0x{self.data_types[i]:02X} | ID: {self.node_ids[i]}"
             if i in self.camera_roles:
                 line += f" | Camera Role: {self.camera_roles[i]}"
-            self.log_print(line)
+            lines.append(line)
 
-        self.log_print(f"\n--- Pointer Table ---")
+        lines.append(f"\n--- Pointer Table ---")
         for i, ptr in enumerate(self.pointer_table):
-            self.log_print(f"  Joint {i:02} -> 0x{ptr:08X}")
+            lines.append(f"  Joint {i:02} -> 0x{ptr:08X}")
+
+        lines.append(f"\n--- Keyframe Blocks ---")
+        if not include_keyframes:
+            if self.lazy and self.log.enabled(LOG_DEBUG):
+                self._dump_pending = True  # Written joint by joint by the first iter_joints pass
+            else:
+                lines.append(f"  (lazy: decoded on access)")
+        self.log_print("\n".join(lines))
+
+        if not include_keyframes or not self.log.enabled(LOG_DEBUG):
+            return
 
-        self.log_print(f"\n--- Keyframe Blocks ---")
         for i, block in enumerate(self.keyframe_blocks):
-            enc = block['encoding']['format'] if block['encoding'] else "UNKNOWN"
-            self.log_print(f"  Joint {i:02} | Encoding: {enc}")
-            for axis in ['X', 'Y', 'Z']:
-                frames = block["axis_data"].get(axis, {}).get("frames", [])
-                self.log_print(f"    {axis} Frames: {frames}")
+            self.log_print(self._dump_frames(i, block), LOG_DEBUG)
 
-        self.log_print(f"\n--- Keyframe/Tangent Values ---")
+        self.log_print(f"\n--- Keyframe/Tangent Values ---", LOG_DEBUG)
         for i, block in enumerate(self.keyframe_blocks):
-            self.log_print(f"Joint: {i:02} | ID: {self.node_ids[i]} ")
-            for axis in ['X', 'Y', 'Z']:
-                values = block["axis_data"].get(axis, {}).get("values", [])
-                self.log_print(f"  {axis} Axis:")
-                for v in values:
-                    self.log_print(f"    Frame {v['frame']:>3}: Value={v['value']}, In={v['in']}, Out={v['out']}")
-                    
+            self.log_print(self._dump_values(i, block), LOG_DEBUG)
+
+    # Debug log text of one joint's frame IDs ("Keyframe Blocks" section).
+    def _dump_frames(self, i, block):
+        enc = block.encoding['format'] if block.encoding else "UNKNOWN"
+        lines = [f"  Joint {i:02} | Encoding: {enc}"]
+        for axis in AXES:
+            track = block.axis(axis)
+            frames = track.frames.tolist() if track is not None else []
+            lines.append(f"    {axis} Frames: {frames}")
+        return "\n".join(lines)
+
+    # Debug log text of one joint's keyframe values ("Keyframe/Tangent Values" section).
+    def _dump_values(self, i, block):
+        lines = [f"Joint: {i:02} | ID: {self.node_ids[i]} "]
+        for axis in AXES:
+            lines.append(f"  {axis} Axis:")
+            track = block.axis(axis)
+            if track is None:
+                continue
+            values = track.values.astype(np.int64) if track.int_values else track.values
+            lines.extend(
+                f"    Frame {fid:>3}: Value={v}, In={tin}, Out={tout}"
+                for fid, v, tin, tout in zip(
+                    track.frames.tolist(), values.tolist(), track.ins.tolist(), track.outs.tolist()
+                )
+            )
+        return "\n".join(lines)
+
+    # Returns the keyframe blocks in the legacy list-of-dicts layout.
+    def legacy_blocks(self):
+        return [block.as_dict() for block in self.keyframe_blocks]
+
+    # Compares the memory used by the columnar keyframe blocks with the legacy layout.
+    def memory_report(self):
+        return measure_memory(list(self.keyframe_blocks))
+
     # Serializes the parsed data to a dictionary for external use.
     def to_dict(self):
+        data = self.header_dict()
+        data["nodes"] = [
+            self.node_dict(i, self.keyframe_blocks[i] if i < len(self.keyframe_blocks) else None)
+            for i in range(len(self.node_types))
+        ]
+        return data
+
+    # The header fields of to_dict() (everything but "nodes").
+    def header_dict(self):
         return {
             "max_time": self.max_time,
             "node_count": self.node_count,
             "file_size": self.file_size,
             "padding": getattr(self, "padding", None),
-            "nodes": [
-                {
-                    "node_type": nt,
-                    "data_type": dt,
-                    "id": nid,
-                    "camera_role": self.camera_roles.get(i),
-                    "data_role": self.data_type_roles[i],
-                    "keyframes": self.keyframe_blocks[i] if i < len(self.keyframe_blocks) else {}
-                }
-                for i, (nt, dt, nid) in enumerate(zip(self.node_types, self.data_types, self.node_ids))
-            ]
+        }
+
+    # One entry of to_dict()["nodes"]; 'block' is the joint's decoded keyframe block (None = no keyframes).
+    def node_dict(self, index, block):
+        return {
+            "node_type": self.node_types[index],
+            "data_type": self.data_types[index],
+            "id": self.node_ids[index],
+            "camera_role": self.camera_roles.get(index),
+            "data_role": self.data_type_roles[index],
+            "keyframes": block.as_dict() if block is not None else {}
         }
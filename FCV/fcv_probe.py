@@ -0,0 +1,134 @@
+# fcv_probe.py
+# Single-read header probe: maps the file once, scores both endiannesses against the whole header
+# and pointer table, and hands the mapped buffer on to FCVParser so the file is never re-opened.
+
+import mmap
+import struct
+
+from .fcv_encoding_types import FCV_ENCODING_TYPES
+from .fcv_data_roles import FCV_DATA_ROLES
+
+
+def _align4(offset):
+    return (offset + 3) & ~0x03
+
+
+def score_header(data, endianness, real_size=None):
+    """
+    Scores how well 'data' reads as an FCV header in the given endianness.
+    Every check that passes adds its weight; a header that cannot even hold its own
+    pointer table scores -1.
+
+    Returns:
+        tuple: (score, list of failed check names)
+    """
+    real_size = len(data) if real_size is None else real_size
+    failed = []
+    if len(data) < 3:
+        return -1, ["too small"]
+
+    max_time, node_count = struct.unpack_from(endianness + "HB", data, 0)
+    header_end = _align4(3 + node_count * 3)
+    table_end = header_end + 4 + 4 * node_count
+    if node_count == 0 or table_end > len(data):
+        return -1, ["pointer table out of bounds"]
+
+    score = 0
+
+    def check(name, ok, weight=1):
+        nonlocal score
+        if ok:
+            score += weight
+        else:
+            failed.append(name)
+
+    pairs = data[3:3 + node_count * 2]
+    if endianness == "<":
+        node_types, data_types = pairs[0::2], pairs[1::2]
+    else:
+        data_types, node_types = pairs[0::2], pairs[1::2]
+
+    check("max_time", 1 <= max_time <= 32767)
+    check("node types", all(nt != 0 for nt in node_types))
+    check("encodings", all((dt & 0xF0) in FCV_ENCODING_TYPES for dt in data_types), 2)
+    check("data roles", all(FCV_DATA_ROLES.get(dt & 0x0F) != "INVALID" for dt in data_types), 2)
+    check("padding", not any(data[3 + node_count * 3:header_end]))
+
+    file_size = struct.unpack_from(endianness + "I", data, header_end)[0]
+    check("file_size", file_size in (0, real_size), 2)
+
+    pointers = struct.unpack_from(f"{endianness}{node_count}I", data, header_end + 4)
+    in_bounds = all(table_end <= ptr < real_size for ptr in pointers)
+    check("pointer bounds", in_bounds, 4)
+    check("pointer order", all(a <= b for a, b in zip(pointers, pointers[1:])), 2)
+
+    # The first block's key count must fit in the file along with its frame IDs.
+    if in_bounds and pointers[0] + 2 <= len(data):
+        count = struct.unpack_from(endianness + "H", data, pointers[0])[0]
+        check("first block", pointers[0] + 2 + count * 2 <= real_size, 2)
+    else:
+        failed.append("first block")
+
+    return score, failed
+
+
+class HeaderProbe:
+    """
+    Result of probe_header: the chosen endianness, both scores and the mapped file.
+    Pass 'buffer' to FCVParser(buffer=...) and close the probe (or use it as a context manager)
+    once the parser is done with it.
+    """
+
+    def __init__(self, filepath, buffer, mapping=None):
+        self.filepath = filepath
+        self.buffer = buffer
+        self.real_size = len(buffer)
+        self._mapping = mapping
+        self.scores = {}
+        self.failed_checks = {}
+        for endianness in ("<", ">"):
+            self.scores[endianness], self.failed_checks[endianness] = score_header(buffer, endianness)
+        # Ties go to little endian, like the old detect_endian.
+        self.endianness = max(("<", ">"), key=lambda e: self.scores[e])
+
+    # True when the chosen endianness passed every structural check.
+    @property
+    def valid(self):
+        return not self.failed_checks[self.endianness]
+
+    def close(self):
+        try:
+            self.buffer.release()
+        except BufferError:
+            pass
+        if self._mapping is not None:
+            try:
+                self._mapping.close()
+            except BufferError:
+                pass  # A lazy parser still has views; the mapping goes away with them
+            self._mapping = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def probe_header(filepath, data=None):
+    """
+    Opens and maps 'filepath' once and scores both endiannesses on its header and pointer table.
+    If 'data' (the file's contents, e.g. an archive member) is given it is probed instead and
+    'filepath' only names it.
+
+    Returns:
+        HeaderProbe
+    """
+    if data is not None:
+        return HeaderProbe(filepath, memoryview(data).cast("B"))
+    with open(filepath, "rb") as f:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return HeaderProbe(filepath, memoryview(b""))  # Empty file: mmap refuses it
+    return HeaderProbe(filepath, memoryview(mapping), mapping)
@@ -0,0 +1,102 @@
+# fcv_profile.py
+# Opt-in stage timings and counters for FCVParser and batch runs.
+# Parsers use NULL_PROFILER unless a real FCVProfiler is passed in, so the instrumentation
+# costs one no-op call per stage when it is off.
+
+import time
+from collections import defaultdict
+
+
+class _Stage:
+    # Context manager adding the elapsed time of its block to one stage.
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profiler.add_time(self._name, time.perf_counter() - self._start)
+
+
+class FCVProfiler:
+    """
+    Collects per-stage wall time (seconds and call counts) and named counters.
+    """
+
+    def __init__(self):
+        self.timings = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def add_time(self, name, seconds):
+        self.timings[name] += seconds
+        self.calls[name] += 1
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def as_dict(self):
+        return {
+            "stages": {
+                name: {"seconds": round(self.timings[name], 6), "calls": self.calls[name]}
+                for name in self.timings
+            },
+            "counters": dict(self.counters),
+        }
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class NullProfiler:
+    """
+    Profiler stand-in that records nothing.
+    """
+    _stage = _NullStage()
+
+    def stage(self, name):
+        return self._stage
+
+    def add_time(self, name, seconds):
+        pass
+
+    def count(self, name, amount=1):
+        pass
+
+    def as_dict(self):
+        return {"stages": {}, "counters": {}}
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def aggregate_profiles(profiles):
+    """
+    Sums per-file profile dicts (from FCVProfiler.as_dict) into one batch total.
+    """
+    stages = defaultdict(lambda: {"seconds": 0.0, "calls": 0})
+    counters = defaultdict(int)
+    for profile in profiles:
+        for name, stage in profile.get("stages", {}).items():
+            stages[name]["seconds"] += stage["seconds"]
+            stages[name]["calls"] += stage["calls"]
+        for name, value in profile.get("counters", {}).items():
+            counters[name] += value
+    for stage in stages.values():
+        stage["seconds"] = round(stage["seconds"], 6)
+    return {"stages": dict(stages), "counters": dict(counters)}
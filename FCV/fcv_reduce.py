@@ -0,0 +1,187 @@
+# fcv_reduce.py
+# Tolerance-based keyframe reduction for parsed FCV tracks.
+# Interior keys are dropped wherever the Hermite curve through the remaining keys stays within a
+# tolerance of the original curve at every frame. When the kept keys' own tangents cannot reproduce
+# the curve, the two tangents of the merged segment are refitted (least squares) and checked again after
+# quantizing them to the joint's encoding, so the file written afterwards keeps the same error bound.
+# The first and last key of every axis (the bind pose keys) are always kept.
+
+import numpy as np
+
+from .fcv_curves import _SegmentCoefficients
+from .fcv_encoding_types import get_encoding_info, encode_axis_arrays, decode_raw_keyframes
+from .fcv_tracks import AXES, AxisTrack
+
+# Largest allowed curve difference per tolerance category (value units).
+DEFAULT_TOLERANCES = {
+    "root_position": 0.001,
+    "rotation": 0.0001,
+    "camera_fov": 0.01,
+    "default": 0.0001,
+}
+
+
+def tolerance_category(node_type, camera_role=None):
+    """
+    Tolerance category of a joint: camera FOV tracks, root position joints and rotation joints
+    (FK or root rotation) each get their own; everything else uses "default".
+    """
+    if camera_role == "Camera FOV":
+        return "camera_fov"
+    if node_type & 0x01:
+        return "root_position"
+    if node_type & 0x42:
+        return "rotation"
+    return "default"
+
+
+def _hermite_basis(s):
+    s2 = s * s
+    s3 = s2 * s
+    return 2 * s3 - 3 * s2 + 1, s3 - 2 * s2 + s, -2 * s3 + 3 * s2, s3 - s2
+
+
+def _segment_error(p0, p1, m0, m1, f0, f1, times, target):
+    # Largest difference between one Hermite segment and the original curve sampled at 'times'.
+    dt = f1 - f0
+    h00, h10, h01, h11 = _hermite_basis((times - f0) / dt)
+    curve = h00 * p0 + h10 * m0 * dt + h01 * p1 + h11 * m1 * dt
+    return float(np.max(np.abs(curve - target)))
+
+
+def _fit_tangents(p0, p1, f0, f1, times, target):
+    # Least-squares out tangent of the left key and in tangent of the right key for one segment.
+    dt = f1 - f0
+    h00, h10, h01, h11 = _hermite_basis((times - f0) / dt)
+    residual = target - h00 * p0 - h01 * p1
+    (m0, m1), *_ = np.linalg.lstsq(np.column_stack((h10 * dt, h11 * dt)), residual, rcond=None)
+    return m0, m1
+
+
+def reduce_axis(track, tolerance, data_type=None, endianness="<"):
+    """
+    Removes the keys of one axis that the remaining curve reproduces within 'tolerance' at every frame.
+    With 'data_type' refitted tangents are quantized to that encoding before their error is checked;
+    shared-tangent encodings (one tangent per key) never get refitted tangents.
+    Axes with fewer than three keys, unsorted frames or undecoded values are returned unchanged.
+
+    Returns:
+        tuple: (AxisTrack (the same one if nothing was removed), largest curve error introduced)
+    """
+    count = len(track.frames)
+    if count < 3 or len(track.values) != count or not np.all(np.isfinite(track.values)) \
+            or not np.all(np.diff(track.frames.astype(np.int64)) > 0):
+        return track, 0.0
+
+    enc = get_encoding_info(data_type) if data_type is not None else None
+    refit = enc is None or enc["tangent_out_bytes"] > 0
+
+    def quantize(m0, m1):
+        if enc is None:
+            return m0, m1
+        raw = encode_axis_arrays(np.zeros(2), np.array([0.0, m1]), np.array([m0, 0.0]), data_type, endianness)
+        _, ins, outs = decode_raw_keyframes(raw, data_type)
+        return outs[0], ins[1]
+
+    frames = track.frames.astype(np.float64)
+    values = track.values
+    ins = track.ins.copy()
+    outs = track.outs.copy()
+    original = _SegmentCoefficients(track)
+
+    keep = [0]
+    worst = 0.0
+    anchor = 0
+    best = None  # (end key, anchor out tangent, end in tangent, error) of the longest segment that fits
+    end = anchor + 2
+    while end <= count:
+        if end == count:
+            fit = None
+        else:
+            f0, f1 = frames[anchor], frames[end]
+            times = np.arange(f0, f1 + 1.0)
+            target = original.evaluate(times)
+            m0, m1 = outs[anchor], ins[end]
+            error = _segment_error(values[anchor], values[end], m0, m1, f0, f1, times, target)
+            if error > tolerance and refit:
+                m0, m1 = quantize(*_fit_tangents(values[anchor], values[end], f0, f1, times, target))
+                error = _segment_error(values[anchor], values[end], m0, m1, f0, f1, times, target)
+            fit = (end, m0, m1, error) if error <= tolerance else None
+
+        if fit is not None:
+            best = fit
+            end += 1
+            continue
+
+        # The segment cannot grow further: keep its end key (the next one if nothing could be skipped).
+        if best is not None:
+            kept, m0, m1, error = best
+            outs[anchor], ins[kept] = m0, m1
+            worst = max(worst, error)
+        else:
+            kept = anchor + 1
+        keep.append(kept)
+        anchor = kept
+        best = None
+        end = anchor + 2
+        if anchor == count - 1:
+            break
+    if keep[-1] != count - 1:
+        keep.append(count - 1)
+
+    if len(keep) == count:
+        return track, 0.0
+    keep = np.asarray(keep)
+    return AxisTrack(track.frames[keep], values[keep], ins[keep], outs[keep], track.int_values), worst
+
+
+def _block_bytes(counts, enc):
+    # Size of a keyframe block: per axis a key count, then a frame ID and an encoded key per key.
+    key_bytes = 2 + (enc["total_bytes"] if enc else 0)
+    return sum(2 + n * key_bytes for n in counts)
+
+
+def reduce_model(model, tolerances=None):
+    """
+    Reduces the keys of every joint of a parsed model (FCVParser, lazy or not) in place.
+    The reduced axes have no raw keys left, so FCVWriter re-encodes them.
+
+    Args:
+        model: FCVParser (or anything with node_count, node_types, data_types, keyframe_blocks, endianness).
+        tolerances (dict or None): Overrides for DEFAULT_TOLERANCES, by category (see tolerance_category).
+
+    Returns:
+        list: One dict per joint: joint, category, tolerance, keys_before, keys_after,
+              bytes_before, bytes_after, max_error.
+    """
+    limits = dict(DEFAULT_TOLERANCES, **(tolerances or {}))
+    camera_roles = getattr(model, "camera_roles", {}) or {}
+    endianness = getattr(model, "endianness", "<")
+    report = []
+    for joint in range(model.node_count):
+        block = model.keyframe_blocks[joint]
+        data_type = model.data_types[joint]
+        enc = get_encoding_info(data_type)
+        category = tolerance_category(model.node_types[joint], camera_roles.get(joint))
+        tolerance = limits[category]
+
+        before = [len(block.axis(axis).frames) if block.axis(axis) is not None else 0 for axis in AXES]
+        max_error = 0.0
+        for axis, track in list(block.axes.items()):
+            reduced, error = reduce_axis(track, tolerance, data_type if enc else None, endianness)
+            if reduced is not track:
+                block.axes[axis] = reduced
+                max_error = max(max_error, error)
+        after = [len(block.axis(axis).frames) if block.axis(axis) is not None else 0 for axis in AXES]
+
+        report.append({
+            "joint": joint,
+            "category": category,
+            "tolerance": tolerance,
+            "keys_before": sum(before),
+            "keys_after": sum(after),
+            "bytes_before": _block_bytes(before, enc),
+            "bytes_after": _block_bytes(after, enc),
+            "max_error": max_error,
+        })
+    return report
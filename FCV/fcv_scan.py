@@ -0,0 +1,137 @@
+# fcv_scan.py
+# Streaming corpus scanner: walks a folder tree with os.scandir and yields matching files one
+# directory at a time, so the first file is available before the whole tree has been listed.
+# scan_archive does the same for the members of a zip or tar archive, without extracting it.
+
+import os
+import tarfile
+import zipfile
+import zlib
+from fnmatch import fnmatch
+
+
+def _matches(name, rel_path, patterns):
+    # Patterns are checked against the bare name and the path relative to the scan root (case-insensitive).
+    name = name.lower()
+    rel_path = rel_path.replace(os.sep, "/").lower()
+    return any(fnmatch(name, p.lower()) or fnmatch(rel_path, p.lower()) for p in patterns)
+
+
+def scan_fcv(root, include=("*.fcv",), exclude=(), max_depth=None, largest_first=False, follow_symlinks=False):
+    """
+    Yields (path, size) for every file under 'root' matching 'include' and not 'exclude'.
+
+    Args:
+        root (str): Folder to scan.
+        include (tuple): Glob patterns a file must match (name or relative path).
+        exclude (tuple): Glob patterns that skip a file, or a whole folder when they match it.
+        max_depth (int or None): 0 = only 'root' itself, 1 = one level of subfolders, None = unlimited.
+        largest_first (bool): Yield each folder's files by descending size (default: by name).
+        follow_symlinks (bool): Descend into symlinked folders.
+
+    Yields:
+        tuple: (path, size in bytes)
+    """
+    pending = [(root, 0)]
+    while pending:
+        folder, depth = pending.pop()
+        try:
+            with os.scandir(folder) as it:
+                entries = list(it)
+        except OSError:
+            continue  # Unreadable folder; skip it like a missing one
+
+        files = []
+        subfolders = []
+        for entry in entries:
+            rel_path = os.path.relpath(entry.path, root)
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    if (max_depth is None or depth < max_depth) and not _matches(entry.name, rel_path, exclude):
+                        subfolders.append(entry.path)
+                elif entry.is_file() and _matches(entry.name, rel_path, include) \
+                        and not _matches(entry.name, rel_path, exclude):
+                    files.append((entry.path, entry.stat().st_size))
+            except OSError:
+                continue
+
+        if largest_first:
+            files.sort(key=lambda item: (-item[1], item[0]))
+        else:
+            files.sort()
+        yield from files
+
+        # Reverse so subfolders are visited in name order (the stack pops from the end).
+        for path in sorted(subfolders, reverse=True):
+            pending.append((path, depth + 1))
+
+
+# File name endings read as archives by scan_archive.
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+# What a corrupt, truncated or unreadable zip/tar archive raises while it is opened or read.
+ARCHIVE_READ_ERRORS = (zipfile.BadZipFile, tarfile.TarError, OSError, EOFError, zlib.error)
+
+
+class ArchiveError(Exception):
+    """
+    Raised by scan_archive when an archive cannot be opened or read. 'path' is the archive itself, or
+    "<archive>/<member>" when a member's data could not be read; members yielded before it are fine.
+    """
+
+    def __init__(self, path, message):
+        super().__init__(message)
+        self.path = path
+
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+# Archive path without its archive extension ("mods.tar.gz" -> "mods").
+def archive_stem(path):
+    for ext in sorted(ARCHIVE_EXTENSIONS, key=len, reverse=True):
+        if path.lower().endswith(ext):
+            return path[:-len(ext)]
+    return path
+
+
+def scan_archive(path, include=("*.fcv",), exclude=()):
+    """
+    Yields (member name, bytes) for every file inside a zip or tar archive matching 'include' and not
+    'exclude' (patterns work like scan_fcv's; an excluded folder skips everything below it).
+    Members are read one at a time straight from the archive; tar archives (also compressed ones)
+    are read as a stream, so nothing is extracted to disk.
+    Raises ArchiveError when the archive is corrupt or truncated (see ARCHIVE_READ_ERRORS).
+    """
+    def wanted(name):
+        parts = name.strip("/").split("/")
+        for depth in range(1, len(parts)):
+            folder = "/".join(parts[:depth])
+            if _matches(parts[depth - 1], folder, exclude):
+                return False
+        return _matches(parts[-1], name, include) and not _matches(parts[-1], name, exclude)
+
+    current = None  # Member being read, for the error report
+    try:
+        if path.lower().endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and wanted(info.filename):
+                        current = info.filename
+                        data = archive.read(info)
+                        current = None
+                        yield info.filename, data
+            return
+
+        with tarfile.open(path, mode="r|*") as archive:
+            for member in archive:
+                if member.isfile() and wanted(member.name):
+                    current = member.name
+                    data = archive.extractfile(member).read()
+                    current = None
+                    yield member.name, data
+    except ARCHIVE_READ_ERRORS as e:
+        where = os.path.join(path, *current.strip("/").split("/")) if current else path
+        raise ArchiveError(where, f"{type(e).__name__}: {e}") from e
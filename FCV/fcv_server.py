@@ -0,0 +1,398 @@
+# fcv_server.py
+# Resident parse server: a long-running process that answers FCV requests over localhost TCP or a
+# Unix socket, so editor plugins skip interpreter start-up and cold parses on every call.
+#
+# Protocol: one JSON object per line in each direction. Every request has an "op" and usually a "path";
+# an optional "id" is echoed back. Replies are {"id", "ok": true, "result": ...} or {"id", "ok": false, "error"}.
+#   ping                                   -> {"pong": true}
+#   header    path                         -> header fields and the joint table
+#   parse     path [keyframes]             -> header, joint table and summary (+ every joint's keys)
+#   joints    path joints [axes]           -> the keys of a subset of joints (to_dict "nodes" layout)
+#   evaluate  path frame|frames [joints]   -> curve values per joint as [X, Y, Z] (null = axis without keys)
+#   export    path format [out] [mode]     -> writes JSON ("pretty"/"compact"/"ndjson") or NPZ, returns the path;
+#                                             only into the server's output folder ("out" is relative to it)
+#   check     path                         -> structural check (see fcv_check)
+#   stats                                  -> in-memory file and parse counters of the worker that answers
+#   shutdown                               -> stops the server after replying
+# Requests may also carry "endianness" ("little"/"big") and "transform" (a TrackTransform spec dict).
+#
+# Requests run on warm worker processes. Each worker keeps its recently parsed files in memory (keyed by
+# path, size and mtime, so edited files are parsed again); an optional on-disk ParseCache is shared by all.
+
+import os
+import json
+import socket
+import threading
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from .fcv_parser import FCVParser
+from .fcv_probe import probe_header
+from .fcv_cache import ParseCache
+from .fcv_curves import CurveEvaluator
+from .fcv_check import check_fcv
+from .fcv_json import JSON_MODES, export_json, json_export_path
+from .fcv_npz import export_npz
+from .fcv_node_types import get_node_type_flags
+from .fcv_transform import TrackTransform
+from .fcv_tracks import AXES
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+# Parsed files each worker keeps in memory.
+DEFAULT_MEMORY_FILES = 64
+
+# Longest accepted request line.
+MAX_REQUEST_BYTES = 1 << 20
+
+
+class RequestError(Exception):
+    """
+    A request that cannot be answered (bad op or arguments); the message is sent back to the client.
+    """
+
+
+# Per-process state of a worker: settings and the in-memory LRU of parsed files.
+_worker = {
+    "cache": None, "memory_files": DEFAULT_MEMORY_FILES, "output_dir": None, "files": OrderedDict(), "hits": 0,
+    "parses": 0,
+}
+
+
+def _init_worker(cache_dir, memory_files, output_dir=None):
+    _worker["cache"] = ParseCache(cache_dir) if cache_dir else None
+    _worker["memory_files"] = memory_files
+    _worker["output_dir"] = os.path.realpath(output_dir) if output_dir else None
+
+
+def _load(request):
+    # Returns the parsed file of a request, from the worker's memory when the file is unchanged.
+    path = request.get("path")
+    if not path:
+        raise RequestError("Missing 'path'")
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    endianness = {"little": "<", "big": ">", None: None}.get(request.get("endianness"), None)
+    transform = TrackTransform.from_spec(request["transform"]) if request.get("transform") else None
+    key = (path, st.st_size, st.st_mtime_ns, endianness, transform.key if transform else None)
+
+    files = _worker["files"]
+    parser = files.get(key)
+    if parser is not None:
+        files.move_to_end(key)
+        _worker["hits"] += 1
+        return parser
+
+    with probe_header(path) as probe:
+        parser = FCVParser(
+            path, endianness=endianness or probe.endianness, log_level="none", cache=_worker["cache"],
+            buffer=probe.buffer, transform=transform
+        )
+        try:
+            parser.parse()
+        finally:
+            parser.close()
+    _worker["parses"] += 1
+    files[key] = parser
+    while len(files) > _worker["memory_files"]:
+        files.popitem(last=False)
+    return parser
+
+
+def _joint_table(parser):
+    return [
+        {
+            "joint": i,
+            "node_type": parser.node_types[i],
+            "data_type": parser.data_types[i],
+            "id": parser.node_ids[i],
+            "flags": [flag.strip() for flag in get_node_type_flags(parser.node_types[i])],
+            "data_role": parser.data_type_roles[i],
+            "camera_role": parser.camera_roles.get(i),
+        }
+        for i in range(parser.node_count)
+    ]
+
+
+def _joint_list(parser, request):
+    joints = request.get("joints")
+    if joints is None:
+        return list(range(parser.node_count))
+    joints = [int(j) for j in joints]
+    for j in joints:
+        if not 0 <= j < parser.node_count:
+            raise RequestError(f"Joint {j} out of range (file has {parser.node_count})")
+    return joints
+
+
+def _op_header(request):
+    parser = _load(request)
+    return {
+        "header": parser.header_dict(),
+        "endianness": "little" if parser.endianness == "<" else "big",
+        "joints": _joint_table(parser),
+    }
+
+
+def _op_parse(request):
+    parser = _load(request)
+    result = {
+        "header": parser.header_dict(),
+        "endianness": "little" if parser.endianness == "<" else "big",
+        "summary": parser.get_summary(),
+        "joints": _joint_table(parser),
+    }
+    if request.get("keyframes"):
+        result["nodes"] = parser.to_dict()["nodes"]
+    return result
+
+
+def _op_joints(request):
+    parser = _load(request)
+    axes = [a.upper() for a in request.get("axes", AXES)]
+    nodes = {}
+    for j in _joint_list(parser, request):
+        node = parser.node_dict(j, parser.keyframe_blocks[j])
+        node["keyframes"]["axis_data"] = {
+            axis: data for axis, data in node["keyframes"]["axis_data"].items() if axis in axes
+        }
+        nodes[str(j)] = node
+    return {"nodes": nodes}
+
+
+def _op_evaluate(request):
+    parser = _load(request)
+    evaluator = getattr(parser, "_server_evaluator", None)
+    if evaluator is None:
+        evaluator = parser._server_evaluator = CurveEvaluator(parser)  # Coefficients stay with the cached parse
+    if "frames" in request:
+        times = np.asarray(request["frames"], dtype=np.float64)
+    elif "frame" in request:
+        times = np.asarray([request["frame"]], dtype=np.float64)
+    else:
+        raise RequestError("Missing 'frame' or 'frames'")
+
+    values = {}
+    for j in _joint_list(parser, request):
+        columns = [evaluator.sample_many(j, axis, times).tolist() for axis in AXES]
+        values[str(j)] = [[None if v != v else v for v in sample] for sample in zip(*columns)]  # NaN -> null
+    return {"frames": times.tolist(), "values": values}
+
+
+def _export_path(request, default_name):
+    # Resolves "out" inside the output folder; anything that lands outside it (.., absolute paths, symlinks)
+    # is refused, so clients cannot overwrite arbitrary files.
+    output_dir = _worker["output_dir"]
+    if output_dir is None:
+        raise RequestError("Exports are disabled: start the server with an output folder (-outdir DIR)")
+    out = os.path.realpath(os.path.join(output_dir, request.get("out") or default_name))
+    if os.path.commonpath([output_dir, out]) != output_dir or out == output_dir:
+        raise RequestError(f"Export path {request.get('out')!r} is outside the output folder")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    return out
+
+
+def _op_export(request):
+    parser = _load(request)
+    fmt = request.get("format", "json")
+    name = os.path.splitext(os.path.basename(parser.filepath))[0]
+    if fmt == "npz":
+        return {"path": export_npz(parser, _export_path(request, name + ".npz"))}
+    if fmt != "json":
+        raise RequestError(f"Unknown export format: {fmt} (expected json or npz)")
+    mode = request.get("mode", "pretty")
+    if mode not in JSON_MODES:
+        raise RequestError(f"Unknown JSON mode: {mode} (expected one of {', '.join(JSON_MODES)})")
+    out = _export_path(request, os.path.basename(json_export_path(name, mode)))
+    return {"path": export_json(parser, out, mode=mode)}
+
+
+def _op_check(request):
+    path = request.get("path")
+    if not path:
+        raise RequestError("Missing 'path'")
+    return check_fcv(path)
+
+
+def _op_stats(request):
+    return {"pid": os.getpid(), "files_in_memory": len(_worker["files"]), "memory_hits": _worker["hits"],
+            "parses": _worker["parses"]}
+
+
+OPS = {
+    "header": _op_header,
+    "parse": _op_parse,
+    "joints": _op_joints,
+    "evaluate": _op_evaluate,
+    "export": _op_export,
+    "check": _op_check,
+    "stats": _op_stats,
+}
+
+
+def handle_request(request):
+    """
+    Answers one request dict (runs inside a worker process). Never raises: errors become error replies.
+    """
+    reply = {"id": request.get("id")} if isinstance(request, dict) else {"id": None}
+    try:
+        if not isinstance(request, dict):
+            raise RequestError("Request must be a JSON object")
+        op = OPS.get(request.get("op"))
+        if op is None:
+            raise RequestError(f"Unknown op: {request.get('op')} (expected one of ping, shutdown, {', '.join(OPS)})")
+        reply.update(ok=True, result=op(request))
+    except Exception as e:
+        reply.update(ok=False, error=str(e) or type(e).__name__)
+    return reply
+
+
+def parse_address(address):
+    """
+    "unix:/path/to.sock" -> (AF_UNIX, path); "host:port" or "port" -> (AF_INET, (host, port)).
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+            if not line:
+                return
+            if len(line) > MAX_REQUEST_BYTES and not line.endswith(b"\n"):
+                # Drop the rest of the oversized line, so it is not read as further requests
+                while line and not line.endswith(b"\n"):
+                    line = self.rfile.readline(MAX_REQUEST_BYTES)
+                reply = {"id": None, "ok": False, "error": f"Request longer than {MAX_REQUEST_BYTES} bytes"}
+            elif not line.strip():
+                continue
+            else:
+                reply = self._answer(line)
+            self.wfile.write((json.dumps(reply, separators=(",", ":")) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+    def _answer(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"id": None, "ok": False, "error": f"Invalid JSON: {e}"}
+        op = request.get("op") if isinstance(request, dict) else None
+        if op == "ping":
+            return {"id": request.get("id"), "ok": True, "result": {"pong": True}}
+        if op == "shutdown":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {"id": request.get("id"), "ok": True, "result": {"stopping": True}}
+        return self.server.fcv.submit(request)
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+class FCVServer:
+    """
+    Serves the request protocol on 'address' until a shutdown request (or serve_forever is interrupted).
+
+    Args:
+        address (str): "host:port" (localhost by default) or "unix:/path/to.sock".
+        jobs (int): Warm worker processes answering requests.
+        cache_dir (str or None): On-disk ParseCache shared by the workers.
+        memory_files (int): Parsed files each worker keeps in memory.
+        output_dir (str or None): The only folder export requests may write into (None disables exports).
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, jobs=1, cache_dir=None, memory_files=DEFAULT_MEMORY_FILES,
+                 output_dir=None):
+        family, target = parse_address(address)
+        if family == socket.AF_UNIX:
+            if not hasattr(socketserver, "UnixStreamServer"):
+                raise ValueError("Unix sockets are not available on this platform; use host:port")
+            if os.path.exists(target):
+                os.remove(target)  # Stale socket of a previous server
+            self.server = _UnixServer(target, _Handler)
+        else:
+            self.server = _TCPServer(target, _Handler)
+        self.address = address
+        self.server.fcv = self
+        self._jobs = jobs
+        self._worker_args = (cache_dir, memory_files, output_dir)
+        self._pool_lock = threading.Lock()
+        self.pool = self._start_pool()
+
+    # Starts a pool of workers and waits for them, so the first request does not pay their start-up.
+    def _start_pool(self):
+        pool = ProcessPoolExecutor(max_workers=self._jobs, initializer=_init_worker, initargs=self._worker_args)
+        for future in [pool.submit(_op_stats, {}) for _ in range(self._jobs)]:
+            future.result()
+        return pool
+
+    def submit(self, request):
+        """
+        Answers one request on the worker pool. Never raises: a worker that dies (the pool is then replaced
+        by a fresh one) or any other failure becomes an error reply.
+        """
+        request_id = request.get("id")
+        pool = self.pool
+        try:
+            return pool.submit(handle_request, request).result()
+        except BrokenProcessPool:
+            with self._pool_lock:
+                if self.pool is pool:  # Not already replaced by another connection
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    try:
+                        self.pool = self._start_pool()
+                    except Exception:
+                        pass  # Still broken: the next request tries again
+            return {"id": request_id, "ok": False, "error": "Worker process died; the request was not answered"}
+        except Exception as e:
+            return {"id": request_id, "ok": False, "error": str(e) or type(e).__name__}
+
+    # Bound address as text (useful with port 0).
+    @property
+    def bound_address(self):
+        if isinstance(self.server.server_address, tuple):
+            return "%s:%d" % self.server.server_address[:2]
+        return "unix:" + self.server.server_address
+
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        self.server.server_close()
+        self.pool.shutdown(cancel_futures=True)
+        if isinstance(self.server.server_address, str) and os.path.exists(self.server.server_address):
+            os.remove(self.server.server_address)
+
+
+def send_request(address, request, timeout=30.0):
+    """
+    Client helper: sends one request to a running server and returns its reply dict.
+    Plugins that send many requests should keep one connection open and write one line per request instead.
+    """
+    family, target = parse_address(address)
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(target)
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("Server closed the connection without replying")
+    return json.loads(line)
@@ -0,0 +1,135 @@
+# fcv_synth.py
+# Deterministic synthetic .fcv generator for benchmarks and fixtures.
+# Files cover every keyframe encoding, both endiannesses, camera joints and IK joints, and are
+# written with FCVWriter, so they always parse back to exactly the generated tracks.
+
+import os
+
+import numpy as np
+
+from .fcv_encoding_types import FCV_ENCODING_TYPES, encode_axis_arrays, decode_raw_keyframes
+from .fcv_tracks import AXES, AxisTrack, JointTrack
+from .fcv_writer import FCVWriter
+
+# (node type, role nibble, joint ID) used for the fixed joints of every synthetic file.
+_CAMERA_JOINTS = [(0x02, 0x06, node_id) for node_id in range(6)]            # Position, Target, Roll, FOV, ...
+_IK_JOINTS = [(0x10, 0x00, 0x20), (0x20, 0x01, 0x21), (0xA0, 0x02, 0x22)]  # IK Parent, IK Toe, IK Arm
+
+# Body joint node types cycled through after the fixed joints.
+_BODY_NODE_TYPES = (0x01, 0x02, 0x04, 0x08, 0x40, 0x80)
+
+# Keys per axis for the standard corpus sizes.
+CORPUS_SIZES = {"tiny": 2, "small": 16, "medium": 256, "large": 2048}
+
+
+class SyntheticFCV:
+    """
+    In-memory FCV model with the attributes FCVWriter (and most FCV tools) expect from a parser.
+    """
+
+    def __init__(self, endianness, max_time, node_types, data_types, node_ids, keyframe_blocks):
+        self.endianness = endianness
+        self.max_time = max_time
+        self.node_count = len(node_types)
+        self.node_types = node_types
+        self.data_types = data_types
+        self.node_ids = node_ids
+        self.file_size = None  # Let the writer fill in the real size
+        self.pointer_table = []
+        self.keyframe_blocks = keyframe_blocks
+
+    def to_bytes(self):
+        return FCVWriter(self).encode()
+
+
+def _synthetic_axis(rng, data_type, keys, max_time, endianness):
+    # A smooth curve sampled at 'keys' sorted frames, quantized through the real encoding.
+    enc = FCV_ENCODING_TYPES[data_type & 0xF0]
+    frames = np.unique(np.concatenate((
+        [0, max_time], rng.choice(np.arange(1, max_time), size=max(keys - 2, 0), replace=False)
+    ))).astype(np.uint16)[:keys]
+    t = frames.astype(np.float64) / max(max_time, 1)
+
+    amplitude = {4: 90.0, 2: 3.0, 1: 100.0}[enc["value_bytes"]]
+    phase = rng.uniform(0, 2 * np.pi)
+    values = amplitude * np.sin(2 * np.pi * t * rng.uniform(0.5, 3.0) + phase)
+    slope_scale = {4: 0.5, 2: 3.0, 1: 0.0005}[enc["tangent_in_bytes"]]
+    ins = slope_scale * np.cos(2 * np.pi * t + phase)
+    outs = ins if enc["tangent_out_bytes"] == 0 else slope_scale * np.cos(2 * np.pi * t + phase + 0.1)
+
+    raw = encode_axis_arrays(values, ins, outs, data_type, endianness)
+    values, ins, outs = decode_raw_keyframes(raw, data_type)
+    return AxisTrack(frames, values, ins, outs, enc["value_bytes"] == 1, raw)
+
+
+def generate_fcv(seed, endianness="<", keys_per_axis=16, body_joints=None, max_time=None,
+                 encodings=None, camera=True, ik=True):
+    """
+    Builds one synthetic FCV model (call .to_bytes() for the file contents).
+
+    Args:
+        seed (int): Random seed; the same arguments always give the same file.
+        endianness (str): '<' or '>'.
+        keys_per_axis (int): Keys per axis (at least 2: every axis needs its start/end bind pose).
+        body_joints (int or None): Plain joints added after the camera/IK joints (default: one per encoding).
+        max_time (int or None): Last frame (default: enough frames for the keys).
+        encodings (list or None): Upper-nibble encodings to cycle through (default: all of them).
+        camera (bool): Include the six camera joints.
+        ik (bool): Include IK Parent / IK Toe Parent / IK Arm Parent joints.
+
+    Returns:
+        SyntheticFCV
+    """
+    rng = np.random.default_rng(seed)
+    encodings = list(encodings or FCV_ENCODING_TYPES)
+    keys_per_axis = max(2, keys_per_axis)
+    if max_time is None:
+        max_time = min(65535, max(30, keys_per_axis * 2))
+    if body_joints is None:
+        body_joints = len(encodings)
+
+    joints = (list(_CAMERA_JOINTS) if camera else []) + (list(_IK_JOINTS) if ik else [])
+    for i in range(body_joints):
+        joints.append((_BODY_NODE_TYPES[i % len(_BODY_NODE_TYPES)], int(rng.integers(0, 6)), 0x30 + i))
+    joints = joints[:255]
+
+    node_types, data_types, node_ids, blocks = [], [], [], []
+    for i, (node_type, role, node_id) in enumerate(joints):
+        upper = encodings[i % len(encodings)]
+        data_type = upper | role
+        axes = {
+            axis: _synthetic_axis(rng, data_type, min(keys_per_axis, max_time + 1), max_time, endianness)
+            for axis in AXES
+        }
+        node_types.append(node_type)
+        data_types.append(data_type)
+        node_ids.append(node_id)
+        blocks.append(JointTrack(FCV_ENCODING_TYPES[upper], axes))
+
+    return SyntheticFCV(endianness, max_time, node_types, data_types, node_ids, blocks)
+
+
+def generate_corpus(directory, sizes=None, endiannesses=("<", ">"), files_per_size=1, seed=0):
+    """
+    Writes a deterministic corpus of synthetic .fcv files into 'directory'.
+    File names are "<size>_<le|be>_<n>.fcv".
+
+    Returns:
+        list: Paths of the written files.
+    """
+    sizes = sizes or CORPUS_SIZES
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for size_index, (name, keys) in enumerate(sizes.items()):
+        for endianness in endiannesses:
+            for n in range(files_per_size):
+                model = generate_fcv(
+                    seed + size_index * 1000 + n * 2 + (endianness == ">"),
+                    endianness=endianness,
+                    keys_per_axis=keys
+                )
+                path = os.path.join(directory, f"{name}_{'le' if endianness == '<' else 'be'}_{n}.fcv")
+                with open(path, "wb") as f:
+                    f.write(model.to_bytes())
+                paths.append(path)
+    return paths
@@ -0,0 +1,164 @@
+# fcv_tracks.py
+# Compact columnar storage for decoded keyframes.
+# Each axis keeps its keys as contiguous typed arrays instead of one dict per key;
+# the old list-of-dicts layout is still available through as_dict().
+
+import sys
+
+import numpy as np
+
+AXES = ("X", "Y", "Z")
+
+
+def window_bounds(frames, start, end):
+    """
+    Key range [first, stop) of the keys needed to evaluate frames start..end: every key inside the window
+    plus the nearest key on each side of it, so interpolation at the window edges stays exact.
+    Binary search on the sorted frame IDs; no key outside the range is touched.
+    """
+    count = len(frames)
+    first = max(int(np.searchsorted(frames, start, side="right")) - 1, 0)
+    stop = min(int(np.searchsorted(frames, end, side="left")) + 1, count)
+    return first, max(stop, first)
+
+
+class AxisTrack:
+    """
+    Keyframes of one axis: frame IDs (uint16) plus decoded value / in / out tangents (float64).
+    int_values marks values that are still raw 1-byte integers (shown as ints in the legacy view).
+    raw optionally keeps the encoded keys (structured array) so the axis can be written back unchanged.
+    """
+    __slots__ = ("frames", "values", "ins", "outs", "int_values", "raw")
+
+    def __init__(self, frames, values, ins, outs, int_values=False, raw=None):
+        self.frames = np.asarray(frames, dtype=np.uint16)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.ins = np.asarray(ins, dtype=np.float64)
+        self.outs = np.asarray(outs, dtype=np.float64)
+        self.int_values = int_values
+        self.raw = raw
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def nbytes(self):
+        raw_bytes = self.raw.nbytes if self.raw is not None else 0
+        return self.frames.nbytes + self.values.nbytes + self.ins.nbytes + self.outs.nbytes + raw_bytes
+
+    def window(self, start, end):
+        """
+        The keys covering frames start..end (see window_bounds) as a new AxisTrack of array views.
+        """
+        first, stop = window_bounds(self.frames, start, end)
+        return AxisTrack(
+            self.frames[first:stop], self.values[first:stop], self.ins[first:stop], self.outs[first:stop],
+            self.int_values, self.raw[first:stop] if self.raw is not None else None
+        )
+
+    def as_dict(self):
+        """
+        Legacy view: {"frames": [...], "values": [{"frame", "value", "in", "out"}, ...]}.
+        """
+        return {"frames": self.frames.tolist(), "values": self.value_dicts()}
+
+    def value_dicts(self, start=0, stop=None):
+        """
+        Legacy per-key dicts {"frame", "value", "in", "out"} for keys[start:stop].
+        """
+        frames = self.frames[start:stop].tolist()
+        values = self.values[start:stop]
+        if self.int_values:
+            values = values.astype(np.int64)
+        # zip() stops at the shorter list: keys past the end of a truncated payload have a frame ID but no value.
+        return [
+            {"frame": fid, "value": v, "in": i, "out": o}
+            for fid, v, i, o in zip(frames, values.tolist(), self.ins[start:stop].tolist(), self.outs[start:stop].tolist())
+        ]
+
+
+class JointTrack:
+    """
+    Decoded keyframe block of one joint: its encoding info and an AxisTrack per decoded axis.
+    """
+    __slots__ = ("encoding", "axes")
+
+    def __init__(self, encoding, axes):
+        self.encoding = encoding
+        self.axes = axes
+
+    @property
+    def count(self):
+        # Highest key count over the axes, like the legacy "count" field.
+        return max((len(track.frames) for track in self.axes.values()), default=0)
+
+    @property
+    def nbytes(self):
+        return sum(track.nbytes for track in self.axes.values())
+
+    def axis(self, name):
+        return self.axes.get(name)
+
+    # The keys of every axis covering frames start..end (see AxisTrack.window).
+    def window(self, start, end):
+        return JointTrack(self.encoding, {axis: track.window(start, end) for axis, track in self.axes.items()})
+
+    def as_dict(self):
+        """
+        Legacy view: {"count", "encoding", "axis_data": {axis: {"frames", "values"}}}.
+        """
+        return {
+            "count": self.count,
+            "encoding": self.encoding,
+            "axis_data": {axis: track.as_dict() for axis, track in self.axes.items()}
+        }
+
+
+def _deep_sizeof(obj, seen):
+    """
+    Approximate resident size of a nested dict/list structure, counting shared objects once.
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_deep_sizeof(v, seen) for v in obj)
+    return size
+
+
+def measure_memory(joint_tracks):
+    """
+    Compares the memory held by columnar JointTracks with the legacy list-of-dicts layout
+    they replace (built temporarily to be measured).
+
+    Returns:
+        dict: columnar_bytes, legacy_bytes, saved_bytes and ratio (legacy / columnar).
+    """
+    seen = set()
+    columnar = 0
+    for joint in joint_tracks:
+        columnar += sys.getsizeof(joint) + sys.getsizeof(joint.axes)
+        for track in joint.axes.values():
+            columnar += sys.getsizeof(track) + sum(
+                sys.getsizeof(a) for a in (track.frames, track.values, track.ins, track.outs)
+            )
+            if track.raw is not None:
+                columnar += track.raw.nbytes
+
+    # Encoding dicts are shared module constants in both layouts, so they are not counted.
+    for joint in joint_tracks:
+        if joint.encoding is not None:
+            seen.add(id(joint.encoding))
+    # Keep every legacy block alive while measuring so object ids are not reused.
+    legacy_blocks = [joint.as_dict() for joint in joint_tracks]
+    legacy = _deep_sizeof(legacy_blocks, seen) - sys.getsizeof(legacy_blocks)
+
+    return {
+        "columnar_bytes": columnar,
+        "legacy_bytes": legacy,
+        "saved_bytes": legacy - columnar,
+        "ratio": round(legacy / columnar, 2) if columnar else None
+    }
@@ -0,0 +1,106 @@
+# fcv_transform.py
+# Declarative post-decode transform that FCVParser applies while it decodes each axis (one fused pass):
+# rotation unit conversion, axis swaps/negation, position scaling and optional rounding.
+# Every step is linear, so tangents (value units per frame) get the same factor as the values.
+# One TrackTransform is plain data and can be reused (and pickled to workers) for every file of a batch.
+
+import json
+import math
+
+from .fcv_encoding_types import round_array
+from .fcv_node_types import get_node_type_flags
+from .fcv_tracks import AXES
+
+# Node-type flags (see get_node_type_flags) selecting the joints each step applies to.
+ROTATION_FLAGS = ("FK Rotation", "Root Rotation")
+POSITION_FLAGS = ("Root Position", "IK Handle")
+
+ROTATION_UNITS = {
+    "deg_to_rad": math.pi / 180.0,
+    "rad_to_deg": 180.0 / math.pi,
+}
+
+
+class TrackTransform:
+    """
+    Transform spec applied to every decoded axis.
+
+    Args:
+        rotation_units (str or None): "deg_to_rad" or "rad_to_deg" for joints with a ROTATION_FLAGS flag.
+        axes (dict or None): Output axis -> source axis, optionally negated, e.g. {"Y": "Z", "Z": "-Y"}
+                             (unlisted axes map to themselves; the result must use every source axis once).
+                             Applies to every joint; each axis keeps its own frame IDs.
+        position_scale (float): Factor for joints with a POSITION_FLAGS flag.
+        precision (int or None): Round values and tangents to this many decimals.
+    """
+
+    def __init__(self, rotation_units=None, axes=None, position_scale=1.0, precision=None):
+        if rotation_units is not None and rotation_units not in ROTATION_UNITS:
+            raise ValueError(f"Unknown rotation_units: {rotation_units} (expected one of {', '.join(ROTATION_UNITS)})")
+        self.rotation_units = rotation_units
+        self.axes = {}
+        for axis in AXES:
+            source = str((axes or {}).get(axis, axis)).strip().upper()
+            sign = -1.0 if source.startswith("-") else 1.0
+            source = source.lstrip("+-")
+            if source not in AXES:
+                raise ValueError(f"Invalid source axis for {axis}: {source}")
+            self.axes[axis] = (source, sign)
+        if sorted(source for source, _ in self.axes.values()) != sorted(AXES):
+            raise ValueError("Axis map must use every source axis exactly once")
+        self.position_scale = float(position_scale)
+        self.precision = precision
+
+    @classmethod
+    def from_spec(cls, spec):
+        """
+        Builds a transform from a dict, a JSON string or the path of a JSON file with the constructor's keys.
+        """
+        if isinstance(spec, str):
+            if spec.lstrip().startswith("{"):
+                spec = json.loads(spec)
+            else:
+                with open(spec, "r", encoding="utf-8") as f:
+                    spec = json.load(f)
+        return cls(**spec)
+
+    # The spec as a plain dict (from_spec(t.as_spec()) rebuilds it).
+    def as_spec(self):
+        return {
+            "rotation_units": self.rotation_units,
+            "axes": {axis: ("-" if sign < 0 else "") + source for axis, (source, sign) in self.axes.items()},
+            "position_scale": self.position_scale,
+            "precision": self.precision,
+        }
+
+    # Short stable text naming the spec (used to keep transformed parses apart in caches).
+    @property
+    def key(self):
+        return json.dumps(self.as_spec(), sort_keys=True, separators=(",", ":"))
+
+    @property
+    def identity(self):
+        return (self.rotation_units is None and self.position_scale == 1.0 and self.precision is None
+                and all(source == axis and sign > 0 for axis, (source, sign) in self.axes.items()))
+
+    # Source axis and combined factor of one output axis of a joint with 'node_type'.
+    def axis_plan(self, node_type, axis):
+        source, factor = self.axes[axis]
+        flags = [flag.strip() for flag in get_node_type_flags(node_type)]
+        if self.rotation_units and any(flag in ROTATION_FLAGS for flag in flags):
+            factor *= ROTATION_UNITS[self.rotation_units]
+        if any(flag in POSITION_FLAGS for flag in flags):
+            factor *= self.position_scale
+        return source, factor
+
+    # Applies a factor (and the rounding) to decoded values and tangents in one pass.
+    def apply(self, factor, values, ins, outs):
+        if factor != 1.0:
+            values, ins, outs = values * factor, ins * factor, outs * factor
+        if self.precision is not None:
+            values, ins, outs = (round_array(a, self.precision) for a in (values, ins, outs))
+        return values, ins, outs
+
+    # True when apply() alters an axis with this factor (its encoded keys no longer match then).
+    def changes(self, factor):
+        return factor != 1.0 or self.precision is not None
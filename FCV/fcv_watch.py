@@ -0,0 +1,148 @@
+# fcv_watch.py
+# Polling watch support: a manifest of every seen .fcv (path, mtime, size, content hash and the outputs
+# written for it) decides which files are new or modified since the last pass. Files still being
+# written are held back until their size and mtime stop changing (debounce). Only os.stat is used,
+# so it works the same on every platform.
+
+import os
+import json
+import time
+import hashlib
+
+# Bump when the manifest layout changes; older manifests are ignored (everything is re-parsed once).
+MANIFEST_VERSION = 1
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 0.5
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class WatchManifest:
+    """
+    Path -> {"mtime", "size", "hash", "outputs", "error"} record of the files a watch has processed,
+    stored as JSON so a restarted watch picks up where it left off.
+
+    Args:
+        path (str or None): Manifest file (None keeps it in memory only).
+        debounce (float): Seconds a changed file's size and mtime must stay the same before it is reported.
+    """
+
+    def __init__(self, path=None, debounce=DEFAULT_DEBOUNCE):
+        self.path = path
+        self.debounce = debounce
+        self.files = {}
+        self._pending = {}  # path -> ((mtime_ns, size), time the stat last changed)
+        self._ready = {}    # path -> ((mtime_ns, size), hash) of files handed out by changes()
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.files = data["files"]
+            except (OSError, ValueError, KeyError):
+                self.files = {}  # Unreadable manifest: start over
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.files}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def changes(self, paths, now=None):
+        """
+        Compares the files found by a scan against the manifest.
+        Files whose stat changed are only returned once it has been stable for 'debounce' seconds;
+        files that were merely touched (same content hash) are updated in place and not returned.
+
+        Args:
+            paths (iterable): Paths of the files present now.
+            now (float or None): Current time.monotonic() (for tests).
+
+        Returns:
+            tuple: (list of new or modified paths ready to process, list of deleted paths)
+        """
+        now = time.monotonic() if now is None else now
+        seen = set()
+        ready = []
+        for path in paths:
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # Vanished between the scan and now; the next pass reports it as deleted
+            signature = (st.st_mtime_ns, st.st_size)
+            record = self.files.get(path)
+            if record is not None and (record["mtime"], record["size"]) == signature:
+                self._pending.pop(path, None)
+                continue
+
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != signature:
+                self._pending[path] = (signature, now)  # Still being written; wait for it to settle
+                if self.debounce > 0:
+                    continue
+            elif now - pending[1] < self.debounce:
+                continue
+            del self._pending[path]
+
+            try:
+                digest = file_hash(path)
+            except OSError:
+                continue
+            if record is not None and record["hash"] == digest:
+                record["mtime"], record["size"] = signature  # Touched, content unchanged
+                continue
+            self._ready[path] = (signature, digest)
+            ready.append(path)
+
+        deleted = [path for path in self.files if path not in seen]
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+        return ready, deleted
+
+    # Records a processed file with the outputs written for it and its error message (or None).
+    # The stat and hash are the ones changes() saw, so a write during processing is picked up next pass.
+    def record(self, path, outputs=(), error=None):
+        if path in self._ready:
+            signature, digest = self._ready.pop(path)
+        else:
+            try:
+                st = os.stat(path)
+                signature, digest = (st.st_mtime_ns, st.st_size), file_hash(path)
+            except OSError:
+                self.files.pop(path, None)  # Gone again; the next pass reports nothing for it
+                return
+        self.files[path] = {
+            "mtime": signature[0],
+            "size": signature[1],
+            "hash": digest,
+            "outputs": sorted(set(outputs)),
+            "error": error,
+        }
+
+    # Forgets a deleted file and removes the outputs written for it. Returns the removed output paths.
+    def drop(self, path):
+        removed = []
+        record = self.files.pop(path, None)
+        for output in (record or {}).get("outputs", []):
+            try:
+                os.remove(output)
+                removed.append(output)
+            except OSError:
+                pass
+        return removed
+
+    # True while changed files are waiting out the debounce time.
+    @property
+    def waiting(self):
+        return bool(self._pending)
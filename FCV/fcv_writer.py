@@ -0,0 +1,207 @@
+# fcv_writer.py
+# Serializes a parsed FCV model (an FCVParser, or anything with the same attributes) back to .fcv bytes.
+# Without changes the output is byte-identical to the parsed file; optimize mode re-encodes each joint
+# with the smallest keyframe encoding that stays within a tolerance.
+
+import struct
+
+import numpy as np
+
+from .fcv_encoding_types import (
+    FCV_ENCODING_TYPES,
+    get_encoding_info,
+    get_keyframe_dtype,
+    encode_axis_arrays,
+    decode_raw_keyframes,
+)
+from .fcv_tracks import AXES
+
+# Largest allowed difference between a decoded value/tangent and its re-encoded version in optimize mode.
+DEFAULT_TOLERANCE = 0.0001
+
+
+class FCVWriter:
+    # Initializes the writer with a parsed model and the target endianness (defaults to the model's).
+    def __init__(self, model, endianness=None):
+        self.model = model
+        self.endianness = endianness or model.endianness
+        self.data_types = list(model.data_types)  # May change per joint in optimize mode
+        self.report = []
+
+    # Builds the whole file. optimize=True picks the smallest encoding per joint within 'tolerance'.
+    # repack=True lays the blocks out back to back even without optimize (e.g. after keyframe reduction).
+    def encode(self, optimize=False, tolerance=DEFAULT_TOLERANCE, repack=False):
+        model = self.model
+        e = self.endianness
+        self.data_types = list(model.data_types)
+        self.report = []
+
+        # Encode every joint's keyframe block first; their sizes decide the pointer table.
+        blocks = []
+        for i in range(model.node_count):
+            block = model.keyframe_blocks[i]
+            if optimize:
+                self.data_types[i], raws, max_error = self._choose_encoding(i, block, tolerance)
+            else:
+                raws, max_error = self._axis_raws(block, self.data_types[i]), 0.0
+            blocks.append(self._block_bytes(block, raws))
+            self.report.append({
+                "joint": i,
+                "data_type_before": model.data_types[i],
+                "data_type_after": self.data_types[i],
+                "max_error": max_error,
+            })
+
+        header = self._header_bytes()
+        table_end = len(header) + 4 + 4 * model.node_count
+
+        # Keep the original block positions when nothing moved, so unchanged files round-trip exactly.
+        pointers = None
+        if not optimize and not repack:
+            pointers = self._original_pointers(blocks, table_end)
+        preserved = pointers is not None
+        if not preserved:
+            pointers = []
+            offset = table_end
+            for block in blocks:
+                pointers.append(offset)
+                offset += len(block)
+
+        total = max([table_end] + [ptr + len(block) for ptr, block in zip(pointers, blocks)])
+        if preserved:
+            total = max(total, self._original_size())
+
+        # The game reads but never checks file_size; keep the original value (or 0) unless the size changed.
+        # A model with file_size None (e.g. built from scratch) always gets the real size.
+        if model.file_size is None:
+            file_size = total
+        elif preserved or not model.file_size:
+            file_size = model.file_size
+        else:
+            file_size = total
+
+        out = bytearray(total)
+        out[:len(header)] = header
+        struct.pack_into(f"{e}I{model.node_count}I", out, len(header), file_size, *pointers)
+        for ptr, block in zip(pointers, blocks):
+            out[ptr:ptr + len(block)] = block
+
+        for entry, block in zip(self.report, blocks):
+            entry["block_bytes"] = len(block)
+        return bytes(out)
+
+    # Encodes and writes the file, returning the number of bytes written.
+    def write(self, path, optimize=False, tolerance=DEFAULT_TOLERANCE, repack=False):
+        data = self.encode(optimize=optimize, tolerance=tolerance, repack=repack)
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+
+    # Header up to (not including) file size: max time, node count, node/data type pairs, IDs, padding.
+    def _header_bytes(self):
+        model = self.model
+        header = bytearray(struct.pack(self.endianness + "HB", model.max_time, model.node_count))
+        for node_type, data_type in zip(model.node_types, self.data_types):
+            # Big-endian files store the pair as data type first (see FCVParser).
+            header += bytes((node_type, data_type)) if self.endianness == "<" else bytes((data_type, node_type))
+        header += bytes(model.node_ids)
+        header += b"\x00" * (self.align4(len(header)) - len(header))
+        return bytes(header)
+
+    # One joint's keyframe block: per axis, key count + frame IDs + encoded keys.
+    def _block_bytes(self, block, raws):
+        out = bytearray()
+        for axis in AXES:
+            track = block.axis(axis)
+            out += struct.pack(self.endianness + "H", len(track.frames))
+            out += track.frames.astype(self.endianness + "u2").tobytes()
+            out += raws[axis].tobytes()
+        return bytes(out)
+
+    # Encoded keys for each axis in 'data_type', reusing the parsed raw keys when they match exactly.
+    def _axis_raws(self, block, data_type):
+        raws = {}
+        for axis in AXES:
+            track = block.axis(axis)
+            if track is None:
+                raise ValueError(f"Joint block is missing axis {axis}; decode all axes before writing")
+            dtype = get_keyframe_dtype(data_type, self.endianness)
+            if track.raw is not None and track.raw.dtype.names == dtype.names and len(track.raw) == len(track.values):
+                raws[axis] = track.raw.astype(dtype)  # Exact, only the byte order may change
+            else:
+                raws[axis] = encode_axis_arrays(track.values, track.ins, track.outs, data_type, self.endianness)
+        return raws
+
+    # Tries every encoding smaller than the joint's current one (smallest first) and keeps the first
+    # whose round-trip error is within tolerance. The lower-nibble role bits are never touched.
+    def _choose_encoding(self, index, block, tolerance):
+        data_type = self.data_types[index]
+        current = get_encoding_info(data_type)
+        role_bits = data_type & 0x0F
+
+        candidates = sorted(
+            (upper for upper, enc in FCV_ENCODING_TYPES.items() if enc["total_bytes"] < current["total_bytes"]),
+            key=lambda upper: (FCV_ENCODING_TYPES[upper]["total_bytes"], upper)
+        )
+        for upper in candidates:
+            candidate = upper | role_bits
+            raws = {
+                axis: encode_axis_arrays(track.values, track.ins, track.outs, candidate, self.endianness)
+                for axis, track in ((axis, block.axis(axis)) for axis in AXES)
+            }
+            max_error = max(self._roundtrip_error(block.axis(axis), raws[axis], candidate) for axis in AXES)
+            if max_error <= tolerance:
+                return candidate, raws, max_error
+
+        return data_type, self._axis_raws(block, data_type), 0.0
+
+    # Largest difference between a track's decoded keys and the same keys after re-encoding.
+    def _roundtrip_error(self, track, raw, data_type):
+        if len(raw) == 0:
+            return 0.0
+        decoded = decode_raw_keyframes(raw, data_type)
+        worst = 0.0
+        for before, after in zip((track.values, track.ins, track.outs), decoded):
+            with np.errstate(invalid="ignore"):
+                diff = np.abs(before - after)
+            diff[np.isnan(before) & np.isnan(after)] = 0.0
+            diff[np.isnan(diff)] = np.inf
+            worst = max(worst, float(diff.max()))
+        return worst
+
+    # Original pointers, if every block still fits at its old position without overlapping another.
+    def _original_pointers(self, blocks, table_end):
+        pointers = list(getattr(self.model, "pointer_table", []))
+        if len(pointers) != len(blocks):
+            return None
+        spans = sorted(zip(pointers, blocks), key=lambda span: span[0])
+        previous_end = table_end
+        previous = None
+        for ptr, block in spans:
+            if previous is not None and ptr == previous[0] and block == previous[1]:
+                continue  # Two joints sharing one identical block
+            if ptr < previous_end:
+                return None
+            previous_end = ptr + len(block)
+            previous = (ptr, block)
+        return pointers
+
+    # Size of the parsed file (trailing bytes are kept as zero padding), or 0 if unknown.
+    def _original_size(self):
+        try:
+            return self.model.get_real_file_size()
+        except (OSError, AttributeError, TypeError):
+            return 0
+
+    # Aligns a given offset to the next multiple of 4 bytes.
+    def align4(self, offset):
+        return (offset + 3) & ~0x03
+
+
+def write_fcv(model, path, endianness=None, optimize=False, tolerance=DEFAULT_TOLERANCE, repack=False):
+    """
+    Convenience wrapper: writes 'model' to 'path' and returns the FCVWriter (see .report).
+    """
+    writer = FCVWriter(model, endianness=endianness)
+    writer.write(path, optimize=optimize, tolerance=tolerance, repack=repack)
+    return writer
@@ -0,0 +1,270 @@
+import sys
+import os
+import json
+import time
+import struct
+import tempfile
+import tracemalloc
+
+from FCV.fcv_parser import FCVParser
+from FCV.fcv_probe import probe_header
+from FCV.fcv_encoding_types import decode_axis_keyframes, decode_axis_arrays
+from FCV.fcv_json import export_json
+from FCV.fcv_synth import generate_corpus, CORPUS_SIZES
+
+# Results of the default corpus committed with the repo (re-record with -save after an intended change).
+# Times are stored relative to the "reference" benchmark, so the file can be compared on other machines.
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+# Allowed growth of a benchmark's relative time or peak memory before it counts as a regression. Relative
+# times still move by up to ~10-15% between machines and Python builds (the reference loop and numpy code
+# do not speed up equally), so the default leaves room for that on top of run-to-run noise.
+DEFAULT_TOLERANCE = 0.25
+
+
+def load_corpus(paths):
+    """
+    Parses every corpus file once to collect what the benchmarks need.
+
+    Returns:
+        list: (path, endianness, file size, key count, list of (payload bytes, data type, frame IDs))
+    """
+    corpus = []
+    for path in paths:
+        with probe_header(path) as probe:
+            endianness = probe.endianness
+        parser = FCVParser(path, endianness=endianness, log_level="none")
+        parser.parse()
+        payloads = []
+        keys = 0
+        for data_type, block in zip(parser.data_types, parser.keyframe_blocks):
+            for track in block.axes.values():
+                payloads.append((track.raw.tobytes(), data_type, track.frames.tolist()))
+                keys += len(track.frames)
+        corpus.append((path, endianness, os.path.getsize(path), keys, payloads))
+    return corpus
+
+
+def _reference(corpus):
+    # Fixed interpreter workload that does not use the FCV package: unpacks every payload as 16-bit words.
+    # Other benchmarks are reported relative to it, which cancels most of the machine speed.
+    for _, _, _, _, payloads in corpus:
+        for data, _, _ in payloads:
+            sum(word for word, in struct.iter_unpack("<H", data[:len(data) & ~1]))
+
+
+def _parse(corpus):
+    for path, endianness, _, _, _ in corpus:
+        FCVParser(path, endianness=endianness, log_level="none").parse()
+
+
+def _decode_scalar(corpus):
+    for _, endianness, _, _, payloads in corpus:
+        for data, data_type, frames in payloads:
+            decode_axis_keyframes(data, data_type, frames, endianness)
+
+
+def _decode_batch(corpus):
+    for _, endianness, _, _, payloads in corpus:
+        for data, data_type, frames in payloads:
+            decode_axis_arrays(data, data_type, len(frames), endianness)
+
+
+def _parsed(corpus):
+    parsers = []
+    for path, endianness, _, _, _ in corpus:
+        parser = FCVParser(path, endianness=endianness, log_level="none")
+        parser.parse()
+        parsers.append(parser)
+    return parsers
+
+
+def _to_dict(parsers):
+    for parser in parsers:
+        parser.to_dict()
+
+
+def _json_export(mode):
+    # The streaming exporter used by run_fcv -json (see FCV.fcv_json), written to a scratch file.
+    def run(parsers):
+        with tempfile.TemporaryDirectory() as out_dir:
+            for i, parser in enumerate(parsers):
+                export_json(parser, os.path.join(out_dir, f"{i}.json"), mode=mode)
+    return run
+
+
+def best_time(fn, arg, repeat):
+    """
+    Fastest of 'repeat' runs of fn(arg), in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(fn, arg, repeat):
+    """
+    Best-of-'repeat' wall time of fn(arg), then one extra run under tracemalloc for peak memory.
+
+    Returns:
+        tuple: (seconds, peak traced bytes)
+    """
+    best = best_time(fn, arg, repeat)
+
+    tracemalloc.start()
+    try:
+        fn(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return max(best, 1e-9), peak
+
+
+def run_benchmarks(corpus, repeat=3):
+    """
+    Runs every benchmark over the corpus.
+
+    Returns:
+        dict: {benchmark name: {"seconds", "relative" (seconds / reference seconds), "keys_per_sec",
+               "mb_per_sec", "peak_bytes"}}. The reference is re-timed right before each benchmark, so a
+               machine that speeds up or slows down during the run (turbo, other load) shifts both alike.
+    """
+    total_keys = sum(entry[3] for entry in corpus)
+    file_bytes = sum(entry[2] for entry in corpus)
+    payload_bytes = sum(len(data) for entry in corpus for data, _, _ in entry[4])
+    parsers = _parsed(corpus)
+
+    benchmarks = [
+        ("reference", _reference, corpus, payload_bytes),
+        ("parse", _parse, corpus, file_bytes),
+        ("decode_axis_keyframes", _decode_scalar, corpus, payload_bytes),
+        ("decode_axis_arrays", _decode_batch, corpus, payload_bytes),
+        ("to_dict", _to_dict, parsers, file_bytes),
+        ("json_export_pretty", _json_export("pretty"), parsers, file_bytes),
+        ("json_export_compact", _json_export("compact"), parsers, file_bytes),
+        ("json_export_ndjson", _json_export("ndjson"), parsers, file_bytes),
+    ]
+    results = {}
+    for name, fn, arg, size in benchmarks:
+        reference = best_time(_reference, corpus, repeat)
+        seconds, peak = measure(fn, arg, repeat)
+        results[name] = {
+            "seconds": round(seconds, 6),
+            "relative": round(seconds / reference, 4) if name != "reference" else 1.0,
+            "keys_per_sec": round(total_keys / seconds, 1),
+            "mb_per_sec": round(size / seconds / (1024 * 1024), 3),
+            "peak_bytes": peak,
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a stored baseline. A benchmark regresses when its time relative to the
+    reference benchmark or its peak memory grew by more than 'tolerance' (a fraction, e.g. 0.25 = 25%).
+    Comparing relative times keeps a baseline recorded on another machine meaningful.
+
+    Returns:
+        list: Regression messages (empty when everything is within tolerance).
+    """
+    regressions = []
+    for name, base in baseline.get("benchmarks", {}).items():
+        current = results.get(name)
+        if current is None or name == "reference" or "relative" not in base:
+            continue
+        time_change = current["relative"] / base["relative"] - 1
+        memory = current["peak_bytes"] / max(base["peak_bytes"], 1) - 1
+        print(f"  {name:<24} relative time {time_change:+7.1%}   peak memory {memory:+7.1%}")
+        if time_change > tolerance:
+            regressions.append(f"{name}: {time_change:.1%} slower than baseline (relative to the reference)")
+        if memory > tolerance:
+            regressions.append(f"{name}: {memory:.1%} more peak memory than baseline")
+    return regressions
+
+
+def main():
+    """
+    Benchmark entry point: generates the synthetic corpus, runs the benchmarks, prints the results,
+    and optionally saves them or compares them against a stored baseline.
+    """
+    sizes = dict(CORPUS_SIZES)
+    repeat = 3
+    save_path = None
+    baseline_path = None
+    tolerance = DEFAULT_TOLERANCE
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        arg = args[i].lower()
+        if arg == "-sizes" and i + 1 < len(args):
+            i += 1
+            sizes = {name: CORPUS_SIZES[name] for name in args[i].split(",")}
+        elif arg == "-repeat" and i + 1 < len(args):
+            i += 1
+            repeat = max(1, int(args[i]))
+        elif arg == "-save" and i + 1 < len(args):
+            i += 1
+            save_path = args[i]
+        elif arg == "-baseline":
+            baseline_path = DEFAULT_BASELINE
+            if i + 1 < len(args) and not args[i + 1].startswith("-"):
+                i += 1
+                baseline_path = args[i]
+        elif arg == "-tolerance" and i + 1 < len(args):
+            i += 1
+            tolerance = float(args[i])
+        else:
+            print("Usage: python bench_fcv.py [-sizes tiny,small,medium,large] [-repeat N] "
+                  "[-save FILE] [-baseline [FILE]] [-tolerance FRACTION]")
+            return 2
+        i += 1
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        paths = generate_corpus(corpus_dir, sizes=sizes)
+        corpus = load_corpus(paths)
+        results = run_benchmarks(corpus, repeat=repeat)
+
+    report = {
+        "corpus": {
+            "sizes": sizes,
+            "files": len(corpus),
+            "bytes": sum(entry[2] for entry in corpus),
+            "keys": sum(entry[3] for entry in corpus),
+        },
+        "python": sys.version.split()[0],
+        "benchmarks": results,
+    }
+
+    print(f"=== FCV Benchmarks ({report['corpus']['files']} files, {report['corpus']['keys']} keys) ===")
+    for name, r in results.items():
+        print(f"  {name:<24} {r['keys_per_sec']:>14,.0f} keys/sec {r['mb_per_sec']:>10.2f} MB/sec "
+              f"{r['peak_bytes'] / (1024 * 1024):>9.2f} MB peak {r['relative']:>10.3f}x reference")
+
+    if save_path:
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Results saved to: {save_path}")
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("corpus", {}).get("sizes") != report["corpus"]["sizes"]:
+            print("[BENCH] Warning: baseline was recorded with different corpus sizes")
+        print(f"=== Compared to {baseline_path} ===")
+        regressions = compare(results, baseline, tolerance)
+        if regressions:
+            print("=== REGRESSIONS ===")
+            for msg in regressions:
+                print(f"[REGRESSION] {msg}")
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
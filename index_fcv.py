@@ -0,0 +1,130 @@
+import sys
+import time
+
+from FCV.fcv_index import CorpusIndex
+from FCV.fcv_scan import scan_fcv
+
+USAGE = """Usage:
+  python index_fcv.py update <index.db> <folder> [-recursive|-depth N] [-include GLOB] [-exclude GLOB] [-jobs N] [-little|-big]
+  python index_fcv.py query <index.db> [-joint ID] [-flag LABEL] [-encoding BYTE] [-role ROLE] [-camera ROLE] [-longer N]
+  python index_fcv.py query <index.db> -sql "SELECT ..."
+"""
+
+
+def _int(text):
+    # Accepts decimal or 0x-prefixed hex (joint IDs and encodings are usually written in hex).
+    return int(text, 0)
+
+
+def update(db_path, folder, args):
+    """
+    (Re)indexes the .fcv files of a folder; unchanged files are skipped and missing ones removed.
+    """
+    include = []
+    exclude = []
+    max_depth = 0
+    jobs = 1
+    force_endian = None
+    i = 0
+    while i < len(args):
+        arg = args[i].lower()
+        if arg == "-recursive":
+            max_depth = None
+        elif arg == "-depth" and i + 1 < len(args):
+            i += 1
+            max_depth = int(args[i])
+        elif arg == "-include" and i + 1 < len(args):
+            i += 1
+            include.append(args[i])
+        elif arg == "-exclude" and i + 1 < len(args):
+            i += 1
+            exclude.append(args[i])
+        elif arg == "-jobs" and i + 1 < len(args):
+            i += 1
+            jobs = max(1, int(args[i]))
+        elif arg in ("-little", "-big"):
+            force_endian = "<" if arg == "-little" else ">"
+        else:
+            print(USAGE)
+            return 2
+        i += 1
+
+    start = time.perf_counter()
+    paths = (p for p, _ in scan_fcv(folder, include=include or ("*.fcv",), exclude=exclude, max_depth=max_depth))
+    with CorpusIndex(db_path) as index:
+        counts = index.update(paths, jobs=jobs, force_endian=force_endian)
+        files, failed = index.stats()
+    print(f"=== Index Update ({time.perf_counter() - start:.2f} s) ===")
+    print(f"Indexed     : {counts['indexed']} ({counts['failed']} failed to parse)")
+    print(f"Unchanged   : {counts['unchanged']}")
+    print(f"Removed     : {counts['removed']}")
+    print(f"Total       : {files} file(s) in {db_path} ({failed} with parse errors)")
+    return 0
+
+
+def query(db_path, args):
+    """
+    Answers a query from the index alone; the .fcv files are not opened.
+    """
+    conditions = {}
+    sql = None
+    i = 0
+    while i < len(args):
+        arg = args[i].lower()
+        if i + 1 >= len(args):
+            print(USAGE)
+            return 2
+        i += 1
+        if arg == "-joint":
+            conditions["node_id"] = _int(args[i])
+        elif arg == "-flag":
+            conditions["node_flag"] = args[i]
+        elif arg == "-encoding":
+            conditions["encoding"] = _int(args[i])
+        elif arg == "-role":
+            conditions["data_role"] = args[i]
+        elif arg == "-camera":
+            conditions["camera_role"] = args[i]
+        elif arg == "-longer":
+            conditions["longer_than"] = int(args[i])
+        elif arg == "-sql":
+            sql = args[i]
+        else:
+            print(USAGE)
+            return 2
+        i += 1
+
+    start = time.perf_counter()
+    with CorpusIndex(db_path) as index:
+        if sql:
+            columns, rows = index.query(sql)
+            elapsed = time.perf_counter() - start
+            print("\t".join(columns))
+            for row in rows:
+                print("\t".join("" if v is None else str(v) for v in row))
+        else:
+            rows = index.find_joints(**conditions)
+            elapsed = time.perf_counter() - start
+            for path, joint, node_id, data_type, camera_role in rows:
+                role = f" {camera_role}" if camera_role else ""
+                print(f"{path}  joint {joint} (ID 0x{node_id:02X}, data type 0x{data_type:02X}){role}")
+    print(f"[QUERY] {len(rows)} row(s) in {elapsed * 1000:.1f} ms")
+    return 0
+
+
+def main():
+    """
+    Corpus index entry point: 'update' builds or refreshes the SQLite index of a folder,
+    'query' answers questions from it.
+    """
+    args = sys.argv[1:]
+    if len(args) >= 3 and args[0].lower() == "update":
+        return update(args[1], args[2], args[3:])
+    if len(args) >= 2 and args[0].lower() == "query":
+        return query(args[1], args[2:])
+    print(USAGE)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
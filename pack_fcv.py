@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+
+from FCV.fcv_pack import PackedCorpus, pack_corpus
+from FCV.fcv_scan import scan_fcv
+
+USAGE = """Usage:
+  python pack_fcv.py pack <corpus.fcvpack> <folder> [-recursive|-depth N] [-include GLOB] [-exclude GLOB] [-jobs N] [-little|-big] [-rounded]
+  python pack_fcv.py info <corpus.fcvpack> [FILE [JOINT]]
+"""
+
+
+def pack(out_path, folder, args):
+    """
+    Decodes every .fcv file of a folder once and writes them as one packed corpus (names relative to the folder).
+    """
+    include = []
+    exclude = []
+    max_depth = 0
+    jobs = 1
+    force_endian = None
+    exact = True
+    i = 0
+    while i < len(args):
+        arg = args[i].lower()
+        if arg == "-recursive":
+            max_depth = None
+        elif arg == "-depth" and i + 1 < len(args):
+            i += 1
+            max_depth = int(args[i])
+        elif arg == "-include" and i + 1 < len(args):
+            i += 1
+            include.append(args[i])
+        elif arg == "-exclude" and i + 1 < len(args):
+            i += 1
+            exclude.append(args[i])
+        elif arg == "-jobs" and i + 1 < len(args):
+            i += 1
+            jobs = max(1, int(args[i]))
+        elif arg in ("-little", "-big"):
+            force_endian = "<" if arg == "-little" else ">"
+        elif arg == "-rounded":
+            exact = False  # Store the regular (rounded) decoded values
+        else:
+            print(USAGE)
+            return 2
+        i += 1
+
+    start = time.perf_counter()
+    paths = [p for p, _ in scan_fcv(folder, include=include or ("*.fcv",), exclude=exclude, max_depth=max_depth)]
+    result = pack_corpus(
+        paths, out_path, jobs=jobs, force_endian=force_endian, exact=exact,
+        names=lambda p: os.path.relpath(p, folder).replace(os.sep, "/")
+    )
+    for path, error in result["failed"]:
+        print(f"[ERROR] {path}: {error}")
+    print(f"=== Corpus Pack ({time.perf_counter() - start:.2f} s) ===")
+    print(f"Files       : {result['files']} ({len(result['failed'])} failed to parse)")
+    print(f"Joints      : {result['joints']}")
+    print(f"Keys        : {result['keys']}")
+    print(f"Written     : {out_path} ({result['bytes']} bytes)")
+    return 0
+
+
+def info(pack_path, args):
+    """
+    Lists the corpus, one file's joint table, or one joint's key counts and frame range.
+    """
+    start = time.perf_counter()
+    with PackedCorpus(pack_path) as corpus:
+        opened = time.perf_counter() - start
+        if not args:
+            for name in corpus.names():
+                print(name)
+            print(f"[PACK] {len(corpus)} file(s), opened in {opened * 1000:.2f} ms")
+            return 0
+
+        try:
+            model = corpus.file(args[0])
+        except KeyError:
+            print(f"[ERROR] {args[0]} is not in {pack_path}")
+            return 1
+        if len(args) == 1:
+            header = model.max_time, model.node_count, "Little" if model.endianness == "<" else "Big"
+            print("Max Time: %d, Nodes: %d, Endian: %s" % header)
+            for j in range(model.node_count):
+                role = model.camera_roles.get(j) or model.data_type_roles[j]
+                print(f"Joint {j:>3}: ID 0x{model.node_ids[j]:02X}, node type 0x{model.node_types[j]:02X}, "
+                      f"data type 0x{model.data_types[j]:02X}, {role}, {model.keyframe_blocks[j].count} key(s)")
+        else:
+            block = model.keyframe_blocks[int(args[1])]
+            for axis, track in block.axes.items():
+                span = f"frames {int(track.frames[0])}..{int(track.frames[-1])}" if len(track) else "no keys"
+                print(f"{axis}: {len(track)} key(s), {span}")
+    print(f"[PACK] Opened in {opened * 1000:.2f} ms")
+    return 0
+
+
+def main():
+    """
+    Packed corpus entry point: 'pack' decodes a folder into one mmap-able file, 'info' reads from it.
+    """
+    args = sys.argv[1:]
+    if len(args) >= 3 and args[0].lower() == "pack":
+        return pack(args[1], args[2], args[3:])
+    if len(args) >= 2 and args[0].lower() == "info":
+        return info(args[1], args[2:])
+    print(USAGE)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
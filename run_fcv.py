@@ -1,107 +1,252 @@
 
 import sys
 import os
+import io
+import time
 import struct
 import json
+from contextlib import redirect_stdout
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 from colorama import init, Fore, Style
 
 from FCV.fcv_parser import FCVParser
+from FCV.fcv_writer import FCVWriter, DEFAULT_TOLERANCE
+from FCV.fcv_cache import ParseCache, DEFAULT_MAX_BYTES
+from FCV.fcv_scan import scan_fcv, scan_archive, is_archive, archive_stem, ArchiveError
+from FCV.fcv_probe import probe_header
+from FCV.fcv_json import write_json, export_json as export_json_file, json_export_path
+from FCV.fcv_npz import NPZArchive, file_columns
+from FCV.fcv_profile import FCVProfiler, NULL_PROFILER, aggregate_profiles
+from FCV.fcv_reduce import reduce_model
+from FCV.fcv_dedup import BlockStore, dedup_report
+from FCV.fcv_transform import TrackTransform
+from FCV.fcv_check import check_fcv
+from FCV.fcv_watch import WatchManifest, DEFAULT_INTERVAL, DEFAULT_DEBOUNCE
 
 init(autoreset=True) #Colorama init
 
+# process_file options that collect one entry per file; batch workers hand these lists back to the parent.
+RESULT_LISTS = ("profile_results", "npz_results", "output_results", "dedup_results")
+
+USAGE = "Usage: python run_fcv.py <file_folder_or_archive_path> [-little|-big] [-json [-jsonmode pretty|compact|ndjson]] [-ndjson FILE [-jsonrecords joint|axis]] [-npz] [-npzstack FILE] [-verbose] [-jobs N] [-write DIR [-optimize] [-tolerance X]] [-reduce [-reducetol CATEGORY=X,...]] [-transform SPEC] [-frames START-END] [-cache DIR [-cachesize MB]] [-recursive|-depth N] [-include GLOB] [-exclude GLOB] [-log LEVEL|-nolog] [-logdir DIR] [-logfile FILE] [-profile FILE] [-dedup FILE] [-check] [-watch [-interval S] [-debounce S] [-manifest FILE]] "
+
+# Axis blocks shared by the files of the current -dedup batch in this process (each worker process has its own).
+# Set for the length of one run_batch call, so decoded tracks are released with the batch (and each -watch pass).
+_block_store = None
+
+def get_block_store():
+    # Outside a batch every file gets a store of its own.
+    return _block_store if _block_store is not None else BlockStore()
+
+# Parse caches of this process by (folder, size limit): built once, so the decoder fingerprint and the
+# cache size scan are not repeated for every file.
+_parse_caches = {}
+
+def get_parse_cache(directory, max_bytes=DEFAULT_MAX_BYTES):
+    cache = _parse_caches.get((directory, max_bytes))
+    if cache is None:
+        cache = _parse_caches[(directory, max_bytes)] = ParseCache(directory, max_bytes=max_bytes)
+    return cache
+
+def _set_block_store(dedup):
+    # Batch worker initializer (and in-process batches): a fresh store for the batch, or none.
+    global _block_store
+    _block_store = BlockStore() if dedup else None
+
 def detect_endian(filepath, max_nodes=30):
     """
     Detects the endianness (little or big) of an FCV file by
-    evaluating header values and basic sanity checks.
+    scoring its whole header and pointer table in both byte orders (see FCV.fcv_probe).
 
     Args:
         filepath (str): Path to the FCV file.
-        max_nodes (int): Maximum number of nodes to read for validation.
+        max_nodes (int): Unused; kept for compatibility (the probe checks every node).
 
     Returns:
         str: '<' for little-endian or '>' for big-endian, depending on the score.
     """
+    with probe_header(filepath) as probe:
+        return probe.endianness
 
-    with open(filepath, "rb") as f:
-    # Open the file in binary mode and read enough bytes for:
-    # - 2 bytes for max_time
-    # - 1 byte for node_count
-    # - 2 bytes per node (node_type and data_type)
-        data = f.read(3 + max_nodes * 2)
+def archive_members(archive, include=("*.fcv",), exclude=()):
+    """
+    Yields the matching .fcv members of a zip/tar archive as batch sources (see run_batch).
+    Members are named "<archive>/<member>" in output and error reports; their exports go where
+    the member would be if the archive were extracted next to itself ("mods.zip" -> "mods/...").
+    A corrupt or truncated archive raises FCV.fcv_scan.ArchiveError (run_batch/run_check report it).
+    """
+    for name, data in scan_archive(archive, include=include, exclude=exclude):
+        yield (
+            os.path.join(archive, *name.strip("/").split("/")), data,
+            os.path.join(archive_stem(archive), *name.strip("/").split("/"))
+        )
 
-    scores = {}
-    for endian in ("<", ">"):
-        try:
-            max_time = struct.unpack(endian + "H", data[:2])[0]
-            node_count = struct.unpack(endian + "B", data[2:3])[0]
-            score = 0
-
-            # Check if max_time looks reasonable (1 to 32767 frames)
-            if 1 <= max_time <= 32767:
-                score += 1
-                
-            # Check if node_count looks reasonable (1 to 100 nodes)
-            if 1 <= node_count <= 100:
-                score += 1
-
-            invalid_nodes = 0 # Counter for suspicious node types
-            
-            # Validate each node's type (node_type field)
-            for i in range(min(node_count, max_nodes)):
-                base = 3 + i * 2
-                b1 = struct.unpack(endian + "B", data[base:base+1])[0]
-                b2 = struct.unpack(endian + "B", data[base+1:base+2])[0]
-                node_type = b1 if endian == "<" else b2
-                
-                # Consider node_type == 0 suspicious (invalid)
-                if node_type == 0:
-                    invalid_nodes += 1
-            if invalid_nodes == 0:
-                score += 1
-
-            scores[endian] = score
-        except:
-            scores[endian] = -1
-
-    return max(scores, key=scores.get)
-
-def process_file(filepath, verbose, force_endian=None, export_json=False):
+def source_info(source):
+    """
+    Splits a batch source into (filepath, data, out_path): a plain path is read from disk,
+    an archive member tuple (name, bytes, out_path) is parsed from its bytes.
+    """
+    if isinstance(source, tuple):
+        return source
+    return source, None, None
+
+def process_file(filepath, verbose, force_endian=None, export_json=False, options=None, data=None, out_path=None):
     """
     Processes a single .fcv file: detects endianness (or uses forced),
     parses the file, prints summary info, and optionally exports JSON.
 
     Args:
-        filepath (str): Path to the FCV file.
+        filepath (str): Path to the FCV file (with 'data': the name it is reported under).
         verbose (bool): Enable verbose output (debug logging).
         force_endian (str or None): '<' or '>' to force endian mode, otherwise auto-detect.
         export_json (bool): Whether to export parsed data to JSON.
+        options (dict or None): Extra CLI features:
+            write_dir (str): Write the file back out into this folder.
+            optimize (bool): Re-encode joints with the smallest encoding within 'tolerance' when writing.
+            tolerance (float): Largest allowed quantization error for 'optimize'.
+            transform (TrackTransform): Applied to every axis while it is decoded (units, axis swaps, scale, rounding).
+            frame_window (tuple): (start, end) frames; only the keys covering this range are decoded.
+            reduce (bool): Drop keys the curve reproduces within a per-node-type tolerance (before exports/write).
+            reduce_tolerances (dict): Overrides of FCV.fcv_reduce.DEFAULT_TOLERANCES by category.
+            cache_dir (str): Load/store parse results in this cache folder.
+            cache_bytes (int): Size limit of the cache folder.
+            log_level (str): "none", "error", "info" or "debug" (default) for the .log file.
+            log_dir (str): Folder for .log files (default: working directory).
+            log_stream (file-like): Write the log here instead of a per-file .log (batch log).
+            profile_results (list): Collect stage timings and counters; one dict per file is appended.
+            json_mode (str): "pretty" (default), "compact" or "ndjson" for the per-file JSON export.
+            ndjson_records (str): "joint" (default) or "axis": NDJSON line granularity.
+            ndjson_stream (file-like): Also append the file as NDJSON records to this stream (batch NDJSON).
+            npz (bool): Export the decoded tracks as a .npz archive next to the .fcv.
+            npz_results (list): Collect (filepath, columns) for a stacked .npz archive of the whole run.
+            output_results (list): Collect (filepath, [paths of the log/JSON/NPZ/written files it produced]).
+            dedup_results (list): Decode identical axis blocks once per batch and process and collect
+                                  (filepath, [(block key, bytes, keys)]) for a duplication report.
+        data (bytes or None): The file's contents (e.g. an archive member); parsed instead of reading 'filepath'.
+        out_path (str or None): Path the JSON/NPZ exports are named after (default: 'filepath').
 
     Returns:
         None on success, or an error message on failure.
     """
+    options = options or {}
+    out_path = out_path or filepath
+    probe = None
+    parser = None
+    err = None
+    outputs = []
+    profiler = FCVProfiler() if options.get("profile_results") is not None else NULL_PROFILER
     try:
+        # Map the file once; the probe scores both endiannesses and its buffer goes straight to the parser
+        with profiler.stage("endian_detection"):
+            probe = probe_header(filepath, data=data)
         # Detect or force endianness    
-        endianness = force_endian if force_endian else detect_endian(filepath)
+        endianness = force_endian if force_endian else probe.endianness
         print(Fore.GREEN + "=== BEGIN FCV PARSE ===" + Style.RESET_ALL)
         print(f"Endian Mode: {'Little' if endianness == '<' else 'Big'}")
         print(f"Target File: {filepath}")
 
+        # Optional persistent parse cache
+        cache = None
+        if options.get("cache_dir"):
+            cache = get_parse_cache(options["cache_dir"], options.get("cache_bytes", DEFAULT_MAX_BYTES))
+            cache_hits = cache.hits
+
         # Initialize the FCV parser
-        parser = FCVParser(filepath, verbose=verbose, endianness=endianness)
+        log_path = None
+        if options.get("log_dir"):
+            log_path = os.path.join(options["log_dir"], os.path.basename(filepath) + ".log")
+        log_level = options.get("log_level", "debug")
+        # A pure JSON/NPZ export streams joints straight from a lazy parse (constant memory); the debug log is
+        # then written joint by joint during that pass. The cache, -reduce and -write need every joint decoded
+        # up front, so they keep the eager parse.
+        exports = (export_json or options.get("ndjson_stream") is not None
+                   or options.get("npz") or options.get("npz_results") is not None)
+        lazy = exports and not cache and not options.get("write_dir") and not options.get("reduce")
+        # Archive members are parsed from memory; 'name' keeps their archive path for logs and the cache.
+        parser = FCVParser(
+            probe.buffer if data is not None else filepath, log_path=log_path, verbose=verbose, endianness=endianness, cache=cache,
+            log_level=log_level, log_stream=options.get("log_stream"),
+            buffer=probe.buffer, profiler=profiler, lazy=lazy, name=filepath if data is not None else None,
+            block_store=get_block_store() if options.get("dedup_results") is not None else None,
+            transform=options.get("transform"), frame_window=options.get("frame_window")
+        )
         # Parse the file (header, nodes, keyframes, etc.)
-        parser.parse()
+        with profiler.stage("parse"):
+            parser.parse()
 
         # Retrieve summary info for display
         info = parser.get_summary()
+        if cache is not None:
+            print(f"Parse Cache : {'hit' if cache.hits > cache_hits else 'miss'}")
+
+        # Optionally drop keys the remaining curve reproduces within tolerance
+        if options.get("reduce"):
+            with profiler.stage("reduce"):
+                reduction = reduce_model(parser, options.get("reduce_tolerances"))
+            for r in reduction:
+                if r["keys_after"] < r["keys_before"]:
+                    print(f"[REDUCE] Joint {r['joint']:>3} ({r['category']}): {r['keys_before']} -> {r['keys_after']} keys, "
+                          f"{r['bytes_before'] - r['bytes_after']} byte(s) saved, max error {r['max_error']:.6g}")
+            keys_before = sum(r["keys_before"] for r in reduction)
+            keys_after = sum(r["keys_after"] for r in reduction)
+            saved = sum(r["bytes_before"] - r["bytes_after"] for r in reduction)
+            print(f"[REDUCE] {keys_before} -> {keys_after} keys, {saved} byte(s) saved")
 
         # Optionally export parsed data to JSON
         if export_json:
-            parsed_data = parser.to_dict()
-            json_path = os.path.splitext(filepath)[0] + ".json"
-            with open(json_path, "w", encoding="utf-8") as jf:
-                json.dump(parsed_data, jf, indent=2)
+            json_mode = options.get("json_mode", "pretty")
+            json_path = json_export_path(out_path, json_mode)
+            os.makedirs(os.path.dirname(json_path) or ".", exist_ok=True)
+            outputs.append(json_path)
+            with profiler.stage("json_export"):
+                export_json_file(parser, json_path, mode=json_mode, records=options.get("ndjson_records", "joint"))
             print(f"[JSON] Parsed data exported to: {json_path}")
+        if options.get("ndjson_stream") is not None:
+            with profiler.stage("json_export"):
+                try:
+                    write_json(
+                        parser, options["ndjson_stream"], mode="ndjson",
+                        records=options.get("ndjson_records", "joint"), source=filepath
+                    )
+                except Exception as e:
+                    # Records already streamed stay; mark the file as incomplete after them.
+                    options["ndjson_stream"].write(
+                        json.dumps({"record": "error", "file": filepath, "error": str(e)}) + "\n"
+                    )
+                    raise
+
+        # Optionally export the decoded tracks as typed NumPy arrays
+        if options.get("npz") or options.get("npz_results") is not None:
+            with profiler.stage("npz_export"):
+                columns = file_columns(parser)
+                if options.get("npz"):
+                    npz_path = os.path.splitext(out_path)[0] + ".npz"
+                    os.makedirs(os.path.dirname(npz_path) or ".", exist_ok=True)
+                    outputs.append(npz_path)
+                    archive = NPZArchive()
+                    archive.add_columns(filepath, columns)
+                    archive.save(npz_path)
+            if options.get("npz"):
+                print(f"[NPZ] Tracks exported to: {npz_path}")
+            if options.get("npz_results") is not None:
+                options["npz_results"].append((filepath, columns))
+
+        # Optionally write the file back out (re-encoded per joint in optimize mode)
+        if options.get("write_dir"):
+            write_path = os.path.join(options["write_dir"], os.path.basename(filepath))
+            outputs.append(write_path)
+            writer = FCVWriter(parser)
+            with profiler.stage("write"):
+                written = writer.write(
+                    write_path,
+                    optimize=options.get("optimize", False),
+                    tolerance=options.get("tolerance", DEFAULT_TOLERANCE),
+                    repack=options.get("reduce", False) or options.get("frame_window") is not None
+                )
+            changed = sum(1 for r in writer.report if r["data_type_before"] != r["data_type_after"])
+            print(f"[WRITE] {write_path}: {written} bytes ({info['real_file_size'] - written} byte(s) saved, {changed} joint(s) re-encoded)")
 
         # Print summary information to terminal
         print(f"=== FCV File Summary ===")
@@ -116,11 +261,327 @@ def process_file(filepath, verbose, force_endian=None, export_json=False):
     except struct.error as e:
      # Handle parsing error due to struct unpacking (likely endian mismatch)
         current_offset = hex(getattr(parser, "_file_offset", 0))
-        msg = f"{e} at file offset: {current_offset}\nThis might be caused by incorrect endian mode.\nPossible Improper Endianess in header! \nTry running with the other endian: 'little' ↔ 'big'"
-        return msg
+        err = f"{e} at file offset: {current_offset}\nThis might be caused by incorrect endian mode.\nPossible Improper Endianess in header! \nTry running with the other endian: 'little' ↔ 'big'"
+        return err
     except Exception as e:
         # Handle all other exceptions (return the error message)
-        return str(e)
+        err = str(e)
+        return err
+    finally:
+        if parser is not None:
+            parser.close()
+        if probe is not None:
+            probe.close()
+        if options.get("profile_results") is not None:
+            options["profile_results"].append({"file": filepath, "error": err, **profiler.as_dict()})
+        if options.get("dedup_results") is not None and parser is not None:
+            options["dedup_results"].append((filepath, parser.block_refs))
+        if options.get("output_results") is not None:
+            if parser is not None and options.get("log_stream") is None and os.path.exists(parser.log_path):
+                outputs.append(parser.log_path)
+            options["output_results"].append((filepath, outputs))
+
+def source_size(filepath, data=None):
+    """
+    Size in bytes of a batch source, or (0, error message) when the file vanished or cannot be read,
+    e.g. renamed by an exporter mid-batch.
+
+    Returns:
+        tuple: (size, error message or None)
+    """
+    if data is not None:
+        return len(data), None
+    try:
+        return os.path.getsize(filepath), None
+    except OSError as e:
+        return 0, str(e)
+
+def process_file_captured(task):
+    """
+    Worker entry point for batch runs: runs process_file with stdout captured,
+    so output from parallel workers can be printed in order without interleaving.
+    When a batch log file is used, the file's log is captured too, and so are its records for a batch
+    NDJSON file unless options["ndjson_stream"] is already an open stream.
+
+    Args:
+        task (tuple): (source, verbose, force_endian, export_json, options); 'source' is a path or an
+                      archive member tuple (see source_info)
+
+    Returns:
+        tuple: (filepath, captured output, error message or None, file size in bytes, captured log text,
+                captured NDJSON text, {option name: collected entries} for the RESULT_LISTS in use)
+    """
+    source, verbose, force_endian, export_json, options = task
+    filepath, data, out_path = source_info(source)
+    options = dict(options or {})
+    log_buffer = None
+    if options.get("log_file"):
+        log_buffer = options["log_stream"] = io.StringIO()
+    ndjson_buffer = None
+    if options.get("ndjson_file") and options.get("ndjson_stream") is None:
+        ndjson_buffer = options["ndjson_stream"] = io.StringIO()
+    results = {}
+    for key in RESULT_LISTS:
+        if options.get(key) is not None:
+            options[key] = results[key] = []  # Collected here and handed back to the parent process
+
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        err = process_file(
+            filepath, verbose, force_endian=force_endian, export_json=export_json, options=options,
+            data=data, out_path=out_path
+        )
+    size, size_err = source_size(filepath, data)
+    err = err or size_err
+    log_text = log_buffer.getvalue() if log_buffer is not None else ""
+    ndjson_text = ndjson_buffer.getvalue() if ndjson_buffer is not None else ""
+    return filepath, buffer.getvalue(), err, size, log_text, ndjson_text, results
+
+def run_batch(paths, verbose, force_endian=None, export_json=False, jobs=1, options=None):
+    """
+    Processes many .fcv files, optionally spread over a process pool.
+    Output is printed per file in input order, whatever order workers finish in.
+    'paths' is consumed lazily, so a scanner generator can feed it while it is still walking the tree.
+    If it stops with an ArchiveError (corrupt zip/tar), the files read so far are still processed and the
+    archive (or the member being read) is reported in error_files.
+    If options["log_file"] is set, every file's log is collected into that one file (in the same order).
+    Result lists in options (see RESULT_LISTS) get every file's entries appended (in the same order).
+    If options["ndjson_file"] is set, every file is also written into that one NDJSON file (in the same order).
+
+    Args:
+        paths (iterable): FCV file paths (or archive member tuples, see source_info), in the order results
+                          should be reported.
+        jobs (int): Number of worker processes (1 = run in this process).
+
+    Returns:
+        tuple: (error_files list of (path, message), total bytes processed, number of files)
+    """
+    options = options or {}
+    error_files = []
+    total_bytes = 0
+    file_count = 0
+
+    batch_log = None
+    if options.get("log_file"):
+        batch_log = open(options["log_file"], "w", encoding="utf-8", buffering=1 << 16)
+    batch_ndjson = None
+    task_options = options
+    if options.get("ndjson_file"):
+        batch_ndjson = open(options["ndjson_file"], "w", encoding="utf-8", buffering=1 << 16)
+        if jobs <= 1:
+            task_options = dict(options, ndjson_stream=batch_ndjson)  # Written directly, nothing is buffered
+    source_errors = []
+
+    def sources():
+        try:
+            yield from paths
+        except ArchiveError as e:
+            source_errors.append((e.path, str(e)))
+
+    tasks = ((p, verbose, force_endian, export_json, task_options) for p in sources())
+
+    def collect(filepath, output, err, size, log_text, ndjson_text="", results=None):
+        nonlocal total_bytes, file_count
+        sys.stdout.write(output)
+        for key, entries in (results or {}).items():
+            options[key].extend(entries)
+        if ndjson_text:
+            batch_ndjson.write(ndjson_text)
+        if batch_log is not None:
+            batch_log.write(f"\n##### {filepath} #####\n{log_text}")
+        total_bytes += size
+        file_count += 1
+        if err:
+            error_files.append((filepath, err))
+
+    dedup = options.get("dedup_results") is not None
+    try:
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_set_block_store, initargs=(dedup,)) as pool:
+                # Keep a bounded window of submitted files and report them in submission order,
+                # which keeps the output deterministic without listing every file up front.
+                window = deque()
+                for task in tasks:
+                    window.append(pool.submit(process_file_captured, task))
+                    if len(window) >= jobs * 4:
+                        collect(*window.popleft().result())
+                while window:
+                    collect(*window.popleft().result())
+        else:
+            _set_block_store(dedup)
+            for task in tasks:
+                if batch_log is not None:
+                    collect(*process_file_captured(task))  # Log is captured per file, then appended
+                else:
+                    source, vb, fe, ej, opts = task
+                    filepath, data, out_path = source_info(source)
+                    err = process_file(
+                        filepath, vb, force_endian=fe, export_json=ej, options=opts, data=data, out_path=out_path
+                    )
+                    size, size_err = source_size(filepath, data)
+                    collect(filepath, "", err or size_err, size, "")
+    finally:
+        _set_block_store(False)  # Release the batch's decoded blocks
+        if batch_log is not None:
+            batch_log.close()
+        if batch_ndjson is not None:
+            batch_ndjson.close()
+
+    error_files.extend(source_errors)
+    file_count += len(source_errors)
+    return error_files, total_bytes, file_count
+
+def watch_folder(folder, verbose, force_endian=None, export_json=False, jobs=1, options=None, scan_options=None,
+                 manifest_path=None, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE, max_passes=None):
+    """
+    Polls a folder and re-processes only new or modified .fcv files, until interrupted (Ctrl+C).
+    A manifest (path, mtime, size, content hash and the outputs written) is kept in 'manifest_path',
+    so a restarted watch skips files it already processed. Files being written are picked up once their
+    size and mtime have been stable for 'debounce' seconds; the outputs of deleted files are removed.
+    Run-wide outputs (-logfile, -ndjson) only hold the latest pass.
+
+    Args:
+        folder (str): Folder to watch.
+        scan_options (dict or None): include / exclude / max_depth for scan_fcv.
+        manifest_path (str or None): Manifest file (default: .fcv_watch.json in 'folder').
+        interval (float): Seconds between polls.
+        debounce (float): Seconds a changed file must stay unchanged before it is parsed.
+        max_passes (int or None): Stop after this many polls (None = until interrupted).
+
+    Returns:
+        list: (path, message) of the files whose latest parse failed.
+    """
+    options = dict(options or {})
+    scan_options = scan_options or {}
+    if manifest_path is None:
+        manifest_path = os.path.join(folder, ".fcv_watch.json")
+    manifest = WatchManifest(manifest_path, debounce=debounce)
+    print(f"[WATCH] Watching {folder} every {interval:g} s (Ctrl+C to stop)")
+
+    passes = 0
+    try:
+        while max_passes is None or passes < max_passes:
+            passes += 1
+            found = (p for p, _ in scan_fcv(folder, largest_first=jobs > 1, **scan_options))
+            changed, deleted = manifest.changes(found)
+            for path in deleted:
+                for output in manifest.drop(path):
+                    print(f"[WATCH] {path} deleted, removed {output}")
+            if changed:
+                options["output_results"] = []
+                error_files, _, file_count = run_batch(
+                    changed, verbose, force_endian=force_endian, export_json=export_json, jobs=jobs, options=options
+                )
+                errors = dict(error_files)
+                for path, outputs in options["output_results"]:
+                    manifest.record(path, outputs, errors.get(path))
+                print(f"[WATCH] {file_count} file(s) parsed ({len(error_files)} failed)")
+                for f, msg in error_files:
+                    print(Fore.RED + f"[ERROR] {f}" + Style.RESET_ALL + f": {msg}")
+            if changed or deleted:
+                manifest.save()
+            if max_passes is None or passes < max_passes:
+                time.sleep(min(interval, debounce) if manifest.waiting else interval)
+    except KeyboardInterrupt:
+        print("[WATCH] Stopped.")
+    manifest.save()
+    return [(path, record["error"]) for path, record in manifest.files.items() if record["error"]]
+
+def check_source(task):
+    """
+    Worker entry point for -check: structurally checks one batch source (path or archive member).
+
+    Args:
+        task (tuple): (source, force_endian)
+
+    Returns:
+        dict: check_fcv result
+    """
+    source, force_endian = task
+    filepath, data, _ = source_info(source)
+    return check_fcv(filepath, data=data, endianness=force_endian)
+
+def run_check(paths, force_endian=None, jobs=1, stream=None):
+    """
+    Structurally checks every file without decoding keyframe values and writes one JSON line per file
+    (see FCV.fcv_check.check_fcv) plus a final {"summary": ...} line, in input order.
+
+    Returns:
+        tuple: (number of files, number of invalid files)
+    """
+    stream = stream or sys.stdout
+    source_errors = []
+
+    def sources():
+        try:
+            yield from paths
+        except ArchiveError as e:
+            source_errors.append({
+                "file": e.path, "valid": False, "endianness": None, "size": None,
+                "errors": [{"check": "read", "message": str(e)}], "warnings": []
+            })
+
+    tasks = ((p, force_endian) for p in sources())
+    files = invalid = 0
+    start = time.perf_counter()
+    if jobs > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(check_source, tasks, chunksize=64)
+    else:
+        pool = None
+        results = map(check_source, tasks)
+    try:
+        for result in results:
+            files += 1
+            invalid += not result["valid"]
+            stream.write(json.dumps(result, separators=(",", ":")) + "\n")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    for result in source_errors:
+        files += 1
+        invalid += 1
+        stream.write(json.dumps(result, separators=(",", ":")) + "\n")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    stream.write(json.dumps({"summary": {
+        "files": files, "invalid": invalid, "seconds": round(elapsed, 3), "files_per_sec": round(files / elapsed, 1)
+    }}) + "\n")
+    return files, invalid
+
+def write_profile_report(path, profiles, elapsed, jobs):
+    """
+    Writes the per-file profiles of a run plus their totals as one JSON report.
+
+    Args:
+        path (str): Output JSON file.
+        profiles (list): Profile dicts collected by process_file (in processing order).
+        elapsed (float): Wall time of the whole run in seconds.
+        jobs (int): Worker processes used (stage times are summed across workers).
+    """
+    report = {
+        "files": len(profiles),
+        "failed": sum(1 for p in profiles if p["error"]),
+        "jobs": jobs,
+        "wall_seconds": round(elapsed, 6),
+        "totals": aggregate_profiles(profiles),
+        "per_file": profiles,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[PROFILE] Report written to: {path}")
+
+def write_dedup_report(path, file_refs):
+    """
+    Writes how many axis blocks, bytes and keys of the run are duplicates (see FCV.fcv_dedup.dedup_report).
+    """
+    report = dedup_report(file_refs)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"=== Duplicate Blocks ===")
+    print(f"Axis Blocks : {report['axis_blocks']} ({report['unique_blocks']} unique)")
+    print(f"Duplicated  : {report['duplicated_bytes']} of {report['total_bytes']} bytes, "
+          f"{report['duplicated_keys']} keys ({report['cross_file_bytes']} bytes shared across files)")
+    print(f"[DEDUP] Report written to: {path}")
 
 def main():
     """
@@ -132,36 +593,208 @@ def main():
 
     # Check if user provided at least one argument
     if len(sys.argv) < 2:
-        print("Usage: python run_fcv.py <file_or_folder_path> [-little|-big] [-json] [-verbose] ")
+        print(USAGE)
         print("If no endian is specified, it will try to detect the endian. ")
-        return
+        return 2
 
     path = sys.argv[1]  # First argument is the file or folder path
     endian_arg = None   # Optional override for file endianness ('<' or '>')
     verbose = False     # Verbose flag for dumping log to terminal
 
-    for arg in sys.argv[2:]:
-        if arg.lower() in ["-little", "-big"]:
-            endian_arg = "<" if arg.lower() == "little" else ">"
-        elif arg.lower() == "-json":
-            export_json = True  # Enable JSON export
-        elif arg.lower() == "-verbose":
-            verbose = True
+    jobs = 1            # Worker processes for folder runs
+    options = {}        # Extra features passed through to process_file
+    include = []        # Folder scan: glob patterns to include (default *.fcv)
+    exclude = []        # Folder scan: glob patterns to skip
+    max_depth = 0       # Folder scan: subfolder depth (0 = only the given folder)
+    profile_path = None # Profile report output file
+    npz_stack_path = None  # Stacked NPZ archive output file
+    dedup_path = None   # Duplicate block report output file
+    watch = False       # Keep polling the folder and re-parse changed files
+    check = False       # Only validate the file structure (JSON lines output)
+    watch_options = {}  # interval / debounce / manifest_path for watch_folder
+
+    args = sys.argv[2:]
+    i = 0
+    try:
+        while i < len(args):
+            arg = args[i]
+            if arg.lower() in ["-little", "-big"]:
+                endian_arg = "<" if arg.lower() == "-little" else ">"
+            elif arg.lower() == "-json":
+                export_json = True  # Enable JSON export
+            elif arg.lower() == "-verbose":
+                verbose = True
+            elif arg.lower() == "-jobs" and i + 1 < len(args):
+                i += 1
+                jobs = max(1, int(args[i]))  # Parallel worker count
+            elif arg.lower() == "-write" and i + 1 < len(args):
+                i += 1
+                options["write_dir"] = args[i]  # Write files back out into this folder
+                os.makedirs(args[i], exist_ok=True)
+            elif arg.lower() == "-cache" and i + 1 < len(args):
+                i += 1
+                options["cache_dir"] = args[i]  # Persistent parse cache folder
+            elif arg.lower() == "-cachesize" and i + 1 < len(args):
+                i += 1
+                options["cache_bytes"] = int(float(args[i]) * 1024 * 1024)  # Given in MB
+            elif arg.lower() == "-recursive":
+                max_depth = None  # Walk every subfolder
+            elif arg.lower() == "-depth" and i + 1 < len(args):
+                i += 1
+                max_depth = int(args[i])
+            elif arg.lower() == "-include" and i + 1 < len(args):
+                i += 1
+                include.append(args[i])
+            elif arg.lower() == "-exclude" and i + 1 < len(args):
+                i += 1
+                exclude.append(args[i])
+            elif arg.lower() == "-log" and i + 1 < len(args):
+                i += 1
+                options["log_level"] = args[i].lower()  # none / error / info / debug
+            elif arg.lower() == "-nolog":
+                options["log_level"] = "none"
+            elif arg.lower() == "-logdir" and i + 1 < len(args):
+                i += 1
+                options["log_dir"] = args[i]  # Put .log files in this folder
+                os.makedirs(args[i], exist_ok=True)
+            elif arg.lower() == "-logfile" and i + 1 < len(args):
+                i += 1
+                options["log_file"] = args[i]  # One combined log for a folder run
+            elif arg.lower() == "-jsonmode" and i + 1 < len(args):
+                i += 1
+                options["json_mode"] = args[i].lower()  # pretty / compact / ndjson
+            elif arg.lower() == "-ndjson" and i + 1 < len(args):
+                i += 1
+                options["ndjson_file"] = args[i]  # One combined NDJSON file for the whole run
+            elif arg.lower() == "-jsonrecords" and i + 1 < len(args):
+                i += 1
+                options["ndjson_records"] = args[i].lower()  # joint / axis
+            elif arg.lower() == "-npz":
+                options["npz"] = True  # Per-file .npz export
+            elif arg.lower() == "-npzstack" and i + 1 < len(args):
+                i += 1
+                npz_stack_path = args[i]  # One stacked .npz archive for the whole run
+                options["npz_results"] = []
+            elif arg.lower() == "-profile" and i + 1 < len(args):
+                i += 1
+                profile_path = args[i]  # Write a JSON timing/counter report here
+                options["profile_results"] = []
+            elif arg.lower() == "-dedup" and i + 1 < len(args):
+                i += 1
+                dedup_path = args[i]  # Decode shared axis blocks once and report duplication here
+                options["dedup_results"] = []
+            elif arg.lower() == "-check":
+                check = True
+            elif arg.lower() == "-watch":
+                watch = True
+            elif arg.lower() == "-interval" and i + 1 < len(args):
+                i += 1
+                watch_options["interval"] = float(args[i])  # Seconds between polls
+            elif arg.lower() == "-debounce" and i + 1 < len(args):
+                i += 1
+                watch_options["debounce"] = float(args[i])  # Seconds a changed file must stay unchanged
+            elif arg.lower() == "-manifest" and i + 1 < len(args):
+                i += 1
+                watch_options["manifest_path"] = args[i]  # Watch manifest file
+            elif arg.lower() == "-transform" and i + 1 < len(args):
+                i += 1
+                options["transform"] = TrackTransform.from_spec(args[i])  # JSON file or inline JSON, reused for every file
+            elif arg.lower() == "-frames" and i + 1 < len(args):
+                i += 1
+                start, _, end = args[i].partition("-")  # e.g. 600-720
+                options["frame_window"] = (int(start), int(end or start))
+            elif arg.lower() == "-reduce":
+                options["reduce"] = True
+            elif arg.lower() == "-reducetol" and i + 1 < len(args):
+                i += 1
+                # e.g. root_position=0.01,rotation=0.0005,camera_fov=0.05,default=0.0001
+                options["reduce_tolerances"] = {
+                    name.strip().lower(): float(value) for name, value in (item.split("=") for item in args[i].split(","))
+                }
+            elif arg.lower() == "-optimize":
+                options["optimize"] = True
+            elif arg.lower() == "-tolerance" and i + 1 < len(args):
+                i += 1
+                options["tolerance"] = float(args[i])
+            i += 1
+    except (ValueError, TypeError, OSError) as e:
+        # Bad flag value (e.g. "-jobs two", a -transform file that cannot be read): report it like the other argument errors
+        print(f"[ERROR] Invalid value for {arg}: {args[i]} ({e})")
+        print(USAGE)
+        return 2
+
+    if check:
+        # Structure only: no parse, no log/JSON output, exit code 1 if any file is invalid
+        if os.path.isdir(path):
+            paths = (
+                p for p, _ in scan_fcv(path, include=include or ("*.fcv",), exclude=exclude, max_depth=max_depth)
+            )
+        elif os.path.isfile(path) and is_archive(path):
+            paths = archive_members(path, include=include or ("*.fcv",), exclude=exclude)
+        elif os.path.isfile(path):
+            paths = [path]
+        else:
+            print("Invalid path or no .FCV files found.")
+            return 2
+        _, invalid = run_check(paths, force_endian=endian_arg, jobs=jobs)
+        return 1 if invalid else 0
 
+    start = time.perf_counter()
     if os.path.isfile(path) and path.lower().endswith(".fcv"):
-        err = process_file(path, verbose, force_endian=endian_arg, export_json=export_json)
+        ndjson_stream = None
+        if options.get("ndjson_file"):
+            ndjson_stream = options["ndjson_stream"] = open(options["ndjson_file"], "w", encoding="utf-8")
+        try:
+            err = process_file(path, verbose, force_endian=endian_arg, export_json=export_json, options=options)
+        finally:
+            if ndjson_stream is not None:
+                ndjson_stream.close()
         if err:
             error_files.append((path, err))
-    elif os.path.isdir(path):
-        for fname in os.listdir(path):
-            if fname.lower().endswith(".fcv"):
-                full_path = os.path.join(path, fname)
-                err = process_file(full_path, verbose, force_endian=endian_arg, export_json=export_json)
-                if err:
-                    error_files.append((full_path, err))
+    elif watch and os.path.isdir(path):
+        error_files = watch_folder(
+            path, verbose, force_endian=endian_arg, export_json=export_json, jobs=jobs, options=options,
+            scan_options={"include": include or ("*.fcv",), "exclude": exclude, "max_depth": max_depth},
+            **watch_options
+        )
+    elif os.path.isdir(path) or (os.path.isfile(path) and is_archive(path)):
+        if os.path.isdir(path):
+            # Stream matching files out of the tree (largest first per folder when running in parallel).
+            paths = (
+                p for p, _ in scan_fcv(
+                    path, include=include or ("*.fcv",), exclude=exclude,
+                    max_depth=max_depth, largest_first=jobs > 1
+                )
+            )
+        else:
+            # Parse .fcv members straight out of the zip/tar archive, nothing is extracted.
+            paths = archive_members(path, include=include or ("*.fcv",), exclude=exclude)
+        error_files, total_bytes, file_count = run_batch(
+            paths, verbose, force_endian=endian_arg, export_json=export_json, jobs=jobs, options=options
+        )
+        elapsed = max(time.perf_counter() - start, 1e-9)
+
+        # Print throughput for the whole folder run
+        print(f"=== Batch Summary ===")
+        print(f"Files       : {file_count} ({len(error_files)} failed) using {jobs} job(s)")
+        print(f"Elapsed     : {elapsed:.2f} s")
+        print(f"Throughput  : {file_count / elapsed:.1f} files/sec, {total_bytes / elapsed / (1024 * 1024):.2f} MB/sec")
     else:
         print("Invalid path or no .FCV files found.")
 
+    if npz_stack_path:
+        archive = NPZArchive()
+        for filepath, columns in options["npz_results"]:
+            archive.add_columns(filepath, columns)
+        npz_stack_path = archive.save(npz_stack_path)
+        print(f"[NPZ] {len(archive.files)} file(s) stacked into: {npz_stack_path}")
+
+    if dedup_path:
+        write_dedup_report(dedup_path, options["dedup_results"])
+
+    if profile_path:
+        write_profile_report(profile_path, options["profile_results"], time.perf_counter() - start, jobs)
+
     # Print error report if any files failed to parse
     if error_files:
         print("\n" + Fore.RED + "=== FCV FILES FAILED TO PARSE ===" + Style.RESET_ALL)
@@ -169,4 +802,4 @@ def main():
             print(Fore.RED + f"[ERROR] {f}" + Style.RESET_ALL + f": {msg}")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import sys
+import json
+
+from FCV.fcv_server import DEFAULT_ADDRESS, DEFAULT_MEMORY_FILES, FCVServer, send_request
+
+USAGE = f"""Usage:
+  python serve_fcv.py serve [ADDRESS] [-jobs N] [-cache DIR] [-memory N] [-outdir DIR]
+  python serve_fcv.py request [ADDRESS] '<JSON request>'
+ADDRESS is host:port (default {DEFAULT_ADDRESS}) or unix:/path/to.sock
+"""
+
+
+def serve(args):
+    """
+    Runs the resident parse server until a "shutdown" request or Ctrl+C.
+    """
+    address = DEFAULT_ADDRESS
+    jobs = 1
+    cache_dir = None
+    memory_files = DEFAULT_MEMORY_FILES
+    output_dir = None
+    i = 0
+    while i < len(args):
+        arg = args[i].lower()
+        if arg == "-jobs" and i + 1 < len(args):
+            i += 1
+            jobs = max(1, int(args[i]))
+        elif arg == "-cache" and i + 1 < len(args):
+            i += 1
+            cache_dir = args[i]
+        elif arg == "-memory" and i + 1 < len(args):
+            i += 1
+            memory_files = max(1, int(args[i]))
+        elif arg == "-outdir" and i + 1 < len(args):
+            i += 1
+            output_dir = args[i]  # Export requests may only write here
+        elif not arg.startswith("-"):
+            address = args[i]
+        else:
+            print(USAGE)
+            return 2
+        i += 1
+
+    server = FCVServer(address, jobs=jobs, cache_dir=cache_dir, memory_files=memory_files, output_dir=output_dir)
+    print(f"[SERVE] Listening on {server.bound_address} with {jobs} worker(s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print("[SERVE] Stopped")
+    return 0
+
+
+def request(args):
+    """
+    Sends one request to a running server and prints the reply (exit code 1 when it is an error).
+    """
+    if len(args) == 1:
+        address, text = DEFAULT_ADDRESS, args[0]
+    elif len(args) == 2:
+        address, text = args
+    else:
+        print(USAGE)
+        return 2
+    reply = send_request(address, json.loads(text))
+    print(json.dumps(reply, indent=2))
+    return 0 if reply.get("ok") else 1
+
+
+def main():
+    """
+    Parse server entry point: 'serve' starts the server, 'request' is a small client for scripts and testing.
+    """
+    args = sys.argv[1:]
+    if args and args[0].lower() == "serve":
+        return serve(args[1:])
+    if args and args[0].lower() == "request":
+        return request(args[1:])
+    print(USAGE)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import run_fcv
+from FCV.fcv_synth import generate_fcv
+
+
+def _fcv_bytes(seed):
+    return generate_fcv(seed, keys_per_axis=4).to_bytes()
+
+
+def test_corrupt_zip_is_reported_as_a_failed_file(tmp_path):
+    path = tmp_path / "bad.zip"
+    path.write_bytes(b"PK\x03\x04 this is not a zip archive")
+
+    error_files, _, file_count = run_fcv.run_batch(
+        run_fcv.archive_members(str(path)), False, options={"log_level": "none"}
+    )
+
+    assert file_count == 1
+    [(failed, message)] = error_files
+    assert failed == str(path)
+    assert "BadZipFile" in message
+
+
+def test_damaged_zip_member_keeps_the_members_before_it(tmp_path):
+    path = tmp_path / "mods.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("a.fcv", _fcv_bytes(1))
+        archive.writestr("b.fcv", _fcv_bytes(2))
+    # Corrupt the compressed data of the second member (its CRC no longer matches)
+    data = bytearray(path.read_bytes())
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo("b.fcv")
+    start = info.header_offset + 30 + len(info.filename) + len(info.extra)
+    for i in range(start, start + info.compress_size):
+        data[i] ^= 0x5A
+    path.write_bytes(bytes(data))
+
+    error_files, _, file_count = run_fcv.run_batch(
+        run_fcv.archive_members(str(path)), False, options={"log_level": "none", "log_dir": str(tmp_path)}
+    )
+
+    assert file_count == 2
+    assert [f for f, _ in error_files] == [os.path.join(str(path), "b.fcv")]
+
+
+def test_truncated_tar_stream_is_reported(tmp_path):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, seed in (("a.fcv", 1), ("b.fcv", 2)):
+            data = _fcv_bytes(seed)
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    path = tmp_path / "mods.tar.gz"
+    path.write_bytes(buffer.getvalue()[:len(buffer.getvalue()) // 2])
+
+    error_files, _, _ = run_fcv.run_batch(
+        run_fcv.archive_members(str(path)), False, options={"log_level": "none", "log_dir": str(tmp_path)}
+    )
+
+    assert len(error_files) == 1
+    assert error_files[0][0].startswith(str(path))
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from FCV.fcv_cache import ParseCache
+from FCV.fcv_dedup import BlockStore
+from FCV.fcv_parser import FCVParser
+from FCV.fcv_synth import generate_fcv
+
+
+@pytest.fixture
+def fcv_path(tmp_path):
+    path = tmp_path / "a.fcv"
+    path.write_bytes(generate_fcv(5, keys_per_axis=12).to_bytes())
+    return str(path)
+
+
+def _parse(path, cache, **kwargs):
+    parser = FCVParser(path, log_level="none", cache=cache, **kwargs)
+    parser.parse()
+    return parser
+
+
+def _entries(cache):
+    return [os.path.join(cache.directory, "entries", n) for n in os.listdir(os.path.join(cache.directory, "entries"))]
+
+
+@pytest.mark.parametrize("payload", [b"", b"\x80\x05\x95", b"\x80\x04cno_such_module\nThing\n."])
+def test_unreadable_entry_is_dropped_and_reparsed(tmp_path, fcv_path, payload):
+    cache = ParseCache(str(tmp_path / "cache"))
+    expected = _parse(fcv_path, cache).to_dict()
+    [entry] = _entries(cache)
+    with open(entry, "wb") as f:
+        f.write(payload)
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    assert _parse(fcv_path, cache).to_dict() == expected
+    assert cache.hits == 0 and cache.misses == 1
+    # The bad entry was replaced by a fresh one
+    assert ParseCache(str(tmp_path / "cache")).load(fcv_path, "<") is not None
+
+
+def test_cache_hit_keeps_dedup_block_refs(tmp_path, fcv_path):
+    _parse(fcv_path, ParseCache(str(tmp_path / "cache")))  # Entry without block references
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    fresh = _parse(fcv_path, cache, block_store=BlockStore())
+    assert cache.hits == 0 and fresh.block_refs
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    cached = _parse(fcv_path, cache, block_store=BlockStore())
+    assert cache.hits == 1
+    assert cached.block_refs == fresh.block_refs
+
+
+def test_cache_hit_matches_a_fresh_parse(tmp_path, fcv_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    missed = _parse(fcv_path, cache)
+    assert cache.misses == 1
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    hit = _parse(fcv_path, cache)
+    assert cache.hits == 1
+    assert hit.to_dict() == missed.to_dict()
+    assert hit.get_summary() == missed.get_summary()
+
+
+def test_decoder_fingerprint_change_invalidates_entries(tmp_path, fcv_path, monkeypatch):
+    _parse(fcv_path, ParseCache(str(tmp_path / "cache")))
+    [old_entry] = _entries(ParseCache(str(tmp_path / "cache")))
+
+    monkeypatch.setattr("FCV.fcv_cache.decoder_fingerprint", lambda: "0123456789abcdef")
+    cache = ParseCache(str(tmp_path / "cache"))
+    _parse(fcv_path, cache)
+
+    assert cache.hits == 0 and cache.misses == 1
+    # The entry of the old decoder was evicted when the new one was stored
+    assert not os.path.exists(old_entry)
+    assert [os.path.basename(e) for e in _entries(cache)][0].endswith("_0123456789abcdef.pkl")
@@ -0,0 +1,16 @@
+import sys
+
+import pytest
+
+import run_fcv
+
+
+@pytest.mark.parametrize("flags", [["-jobs", "two"], ["-transform", "missing_transform.json"]])
+def test_bad_flag_values_print_usage(tmp_path, monkeypatch, capsys, flags):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["run_fcv.py", str(tmp_path / "a.fcv"), *flags])
+
+    assert run_fcv.main() == 2
+    out = capsys.readouterr().out
+    assert f"[ERROR] Invalid value for {flags[0]}" in out
+    assert run_fcv.USAGE in out
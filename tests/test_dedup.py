@@ -0,0 +1,32 @@
+import numpy as np
+
+from FCV.fcv_dedup import BlockStore, parse_corpus
+from FCV.fcv_encoding_types import convert_degrees_to_radians, convert_radians_to_degrees
+from FCV.fcv_synth import generate_fcv
+
+
+def _shared_pair(tmp_path):
+    # Two copies of one file: every axis block of the second is shared with the first.
+    data = generate_fcv(7, keys_per_axis=16).to_bytes()
+    paths = [tmp_path / "a.fcv", tmp_path / "b.fcv"]
+    for path in paths:
+        path.write_bytes(data)
+    parsers, store, errors = parse_corpus([str(p) for p in paths], BlockStore(), keep_raw=True)
+    assert not errors and store.hits
+    return parsers
+
+
+def test_unit_conversion_leaves_shared_blocks_alone(tmp_path):
+    for convert in (convert_degrees_to_radians, convert_radians_to_degrees):
+        a, b = _shared_pair(tmp_path)
+        shared = b.keyframe_blocks[0].axis("X")
+        assert a.keyframe_blocks[0].axis("X") is shared
+        values = shared.values.copy()
+
+        convert(a.keyframe_blocks[0])
+
+        assert a.keyframe_blocks[0].axis("X") is not shared
+        assert a.keyframe_blocks[0].axis("X").raw is None
+        assert b.keyframe_blocks[0].axis("X") is shared
+        assert np.array_equal(shared.values, values)
+        assert shared.raw is not None
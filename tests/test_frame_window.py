@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from FCV.fcv_curves import CurveEvaluator
+from FCV.fcv_parser import FCVParser
+from FCV.fcv_synth import generate_fcv
+from FCV.fcv_tracks import AXES
+
+
+def _parse(path, endianness, **kwargs):
+    parser = FCVParser(str(path), endianness=endianness, log_level="none", **kwargs)
+    parser.parse()
+    return parser
+
+
+@pytest.mark.parametrize("endianness", ["<", ">"])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_windowed_decode_keeps_one_key_on_each_side(tmp_path, endianness, lazy):
+    path = tmp_path / "a.fcv"
+    path.write_bytes(generate_fcv(11, endianness=endianness, keys_per_axis=40).to_bytes())
+    full = _parse(path, endianness)
+    start, end = full.max_time // 3, 2 * full.max_time // 3
+    windowed = _parse(path, endianness, frame_window=(start, end), lazy=lazy)
+
+    full_curves, window_curves = CurveEvaluator(full), CurveEvaluator(windowed)
+    times = np.linspace(start, end, 97)
+    for joint in range(full.node_count):
+        for axis in AXES:
+            frames = full.keyframe_blocks[joint].axis(axis).frames
+            kept = windowed.keyframe_blocks[joint].axis(axis).frames
+            # Every key inside the window, plus the last key at or before 'start' and the first at or after 'end'
+            before = frames[frames <= start]
+            after = frames[frames >= end]
+            expected = frames[(frames > start) & (frames < end)]
+            expected = np.concatenate((before[-1:], expected, after[:1]))
+            assert np.array_equal(kept, np.unique(expected))
+            assert len(kept) < len(frames)
+
+            np.testing.assert_array_equal(
+                window_curves.sample_many(joint, axis, times), full_curves.sample_many(joint, axis, times)
+            )
+    if lazy:
+        windowed.close()
@@ -0,0 +1,35 @@
+import run_fcv
+from FCV.fcv_parser import FCVParser, LazyKeyframeBlocks
+from FCV.fcv_synth import generate_fcv
+
+
+def test_default_json_export_streams_joints(tmp_path, monkeypatch):
+    path = tmp_path / "big.fcv"
+    path.write_bytes(generate_fcv(3, keys_per_axis=64, body_joints=40).to_bytes())
+
+    parsers = []
+
+    class RecordingParser(FCVParser):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            parsers.append(self)
+
+    monkeypatch.setattr(run_fcv, "FCVParser", RecordingParser)
+    streamed_dir = tmp_path / "streamed"
+    streamed_dir.mkdir()
+    err = run_fcv.process_file(str(path), False, None, True, {"log_dir": str(streamed_dir)})
+    assert err is None
+
+    # Default options (debug log included): lazy parse, and no joint was kept after the export pass
+    [parser] = parsers
+    assert parser.lazy
+    assert isinstance(parser.keyframe_blocks, LazyKeyframeBlocks)
+    assert parser.keyframe_blocks.decoded() == []
+
+    # The debug log written during the pass matches the one of an eager parse
+    eager_log = tmp_path / "eager.log"
+    eager = FCVParser(str(path), log_path=str(eager_log), log_level="debug")
+    eager.parse()
+    eager.close()
+    eager.log.close()
+    assert (streamed_dir / "big.fcv.log").read_text() == eager_log.read_text()
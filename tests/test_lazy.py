@@ -0,0 +1,36 @@
+import pytest
+
+from FCV.fcv_parser import FCVParser
+from FCV.fcv_synth import generate_fcv
+
+
+@pytest.mark.parametrize("endianness", ["<", ">"])
+def test_lazy_parse_matches_eager_parse(tmp_path, endianness):
+    path = tmp_path / "a.fcv"
+    path.write_bytes(generate_fcv(8, endianness=endianness, keys_per_axis=20).to_bytes())
+
+    eager = FCVParser(str(path), endianness=endianness, log_level="none")
+    eager.parse()
+    lazy = FCVParser(str(path), endianness=endianness, log_level="none", lazy=True)
+    lazy.parse()
+    try:
+        assert lazy.keyframe_blocks.decoded() == []
+        assert lazy.to_dict() == eager.to_dict()
+    finally:
+        lazy.close()
+
+
+def test_iter_joints_does_not_memoize(tmp_path):
+    path = tmp_path / "a.fcv"
+    path.write_bytes(generate_fcv(9, keys_per_axis=8).to_bytes())
+
+    eager = FCVParser(str(path), log_level="none")
+    eager.parse()
+    lazy = FCVParser(str(path), log_level="none", lazy=True)
+    lazy.parse()
+    try:
+        for i, block in lazy.iter_joints():
+            assert block.as_dict() == eager.keyframe_blocks[i].as_dict()
+        assert lazy.keyframe_blocks.decoded() == []
+    finally:
+        lazy.close()
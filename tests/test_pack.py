@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pytest
+
+from FCV.fcv_npz import file_columns
+from FCV.fcv_pack import PackedCorpus, pack_corpus
+from FCV.fcv_parser import FCVParser
+from FCV.fcv_synth import generate_fcv
+from FCV.fcv_tracks import AXES
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    paths = []
+    for seed, endianness in ((1, "<"), (2, ">"), (3, "<")):
+        path = tmp_path / f"f{seed}.fcv"
+        path.write_bytes(generate_fcv(seed, endianness=endianness, keys_per_axis=6 * seed).to_bytes())
+        paths.append((str(path), endianness))
+    pack_path = str(tmp_path / "corpus.fcvpack")
+    result = pack_corpus([p for p, _ in paths], pack_path, names=os.path.basename)
+    assert result["files"] == 3 and not result["failed"]
+    return paths, pack_path
+
+
+def _columns(path, endianness):
+    parser = FCVParser(path, endianness=endianness, log_level="none")
+    parser.parse()
+    return parser, file_columns(parser)
+
+
+def test_packed_axes_match_file_columns(corpus):
+    paths, pack_path = corpus
+    with PackedCorpus(pack_path) as packed:
+        assert sorted(packed.names()) == ["f1.fcv", "f2.fcv", "f3.fcv"]
+        for path, endianness in paths:
+            name = os.path.basename(path)
+            parser, columns = _columns(path, endianness)
+            assert packed.header(name)["node_count"] == parser.node_count
+            assert packed.header(name)["endianness"] == parser.endianness
+            for axis in AXES:
+                cols = columns["axes"][axis]
+                offsets = np.concatenate(([0], np.cumsum(cols["counts"])))
+                for joint in range(parser.node_count):
+                    track = packed.axis(name, joint, axis)
+                    keys = slice(int(offsets[joint]), int(offsets[joint + 1]))
+                    assert np.array_equal(track.frames, cols["frames"][keys])
+                    for component in ("values", "ins", "outs"):
+                        np.testing.assert_array_equal(getattr(track, component), cols[component][keys])
+
+
+def test_find_rejects_unknown_names(corpus):
+    _, pack_path = corpus
+    with PackedCorpus(pack_path) as packed:
+        assert packed.name(packed.find("f2.fcv")) == "f2.fcv"
+        with pytest.raises(KeyError):
+            packed.find("missing.fcv")
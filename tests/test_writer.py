@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from FCV.fcv_parser import FCVParser
+from FCV.fcv_synth import generate_fcv
+from FCV.fcv_tracks import AXES
+from FCV.fcv_writer import FCVWriter
+
+
+def _parse(data, endianness):
+    parser = FCVParser(data, endianness=endianness, log_level="none")
+    parser.parse()
+    return parser
+
+
+@pytest.mark.parametrize("endianness", ["<", ">"])
+@pytest.mark.parametrize("seed, keys", [(1, 2), (2, 16), (3, 200)])
+def test_unchanged_model_round_trips_byte_identical(endianness, seed, keys):
+    data = generate_fcv(seed, endianness=endianness, keys_per_axis=keys).to_bytes()
+    assert FCVWriter(_parse(data, endianness)).encode() == data
+
+
+@pytest.mark.parametrize("endianness", ["<", ">"])
+@pytest.mark.parametrize("tolerance", [0.0001, 1.0])
+def test_optimize_stays_within_tolerance_and_keeps_role_bits(endianness, tolerance):
+    data = generate_fcv(4, endianness=endianness, keys_per_axis=16).to_bytes()
+    before = _parse(data, endianness)
+    writer = FCVWriter(before)
+    out = writer.encode(optimize=True, tolerance=tolerance)
+    after = _parse(out, endianness)
+
+    assert len(out) < len(data)
+    assert any(r["data_type_before"] != r["data_type_after"] for r in writer.report)
+    for joint in range(before.node_count):
+        assert after.data_types[joint] & 0x0F == before.data_types[joint] & 0x0F
+        for axis in AXES:
+            old, new = before.keyframe_blocks[joint].axis(axis), after.keyframe_blocks[joint].axis(axis)
+            assert np.array_equal(old.frames, new.frames)
+            for a, b in ((old.values, new.values), (old.ins, new.ins), (old.outs, new.outs)):
+                # Parsed values are rounded to 6 decimals on top of the re-encoding error
+                np.testing.assert_allclose(b, a, rtol=0, atol=tolerance + 1e-6, equal_nan=True)
+
+
+@pytest.mark.parametrize("endianness", ["<", ">"])
+def test_repacked_file_parses_to_the_same_keys(endianness):
+    data = generate_fcv(5, endianness=endianness, keys_per_axis=24).to_bytes()
+    model = _parse(data, endianness)
+    model.keyframe_blocks[0] = model.keyframe_blocks[0].window(0, 1)  # Shrink one block, as -reduce would
+    out = FCVWriter(model).encode(repack=True)
+    after = _parse(out, endianness)
+
+    assert len(out) < len(data)
+    assert after.data_types == model.data_types
+    assert after.node_ids == model.node_ids
+    for joint in range(model.node_count):
+        for axis in AXES:
+            old, new = model.keyframe_blocks[joint].axis(axis), after.keyframe_blocks[joint].axis(axis)
+            assert np.array_equal(old.frames, new.frames)
+            assert np.array_equal(old.raw, new.raw)